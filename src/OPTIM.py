@@ -14,10 +14,16 @@ import copy
 import re as _re
 from datetime import datetime
 from pathlib import Path
+from typing import Optional, List
 
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6 import QtCore, QtGui, QtWidgets
 
+from modules.organizador.archivo_resultados import (es_puntero, contar_conflictos, guardar_resultados,
+                                                     cargar_resultados, guardar_configuracion_atomica,
+                                                     podar_resultados)
+from modules.organizador.almacen_sqlite import AlmacenSQLite, es_ruta_sqlite
+
 
 def center_window_on_screen_immediate(window, width, height) -> None:
     """Centrar ventana a la pantalla"""
@@ -47,6 +53,29 @@ def center_window_on_screen_immediate(window, width, height) -> None:
         window.setGeometry(100, 100, width, height)
 
 
+# ========= Hilo del motor de organización =========
+class MotorOrganizacionWorker(QtCore.QThread):
+    """Ejecuta el motor de organización fuera del hilo de la GUI y emite su progreso"""
+
+    progreso = QtCore.pyqtSignal(object)    # EventoProgreso
+    finalizado = QtCore.pyqtSignal(object)  # ResultadoMotor
+    fallo = QtCore.pyqtSignal(str)          # Excepción inesperada
+
+    def __init__(self, configuracion: dict, cache=None, parent=None):
+        super().__init__(parent)
+        self.configuracion = configuracion
+        self.cache = cache  # CacheFases de la ejecución anterior (reorganización incremental)
+
+    def run(self) -> None:
+        """Ejecutar el motor (en el hilo secundario)"""
+        try:
+            from modules.organizador.motor_organizacion import organizar
+            resultado = organizar(self.configuracion, progreso=self.progreso.emit, cache=self.cache)
+            self.finalizado.emit(resultado)
+        except Exception as e:
+            self.fallo.emit(f"{type(e).__name__}: {e}")
+
+
 # ========= Ventana principal =========
 class OptimLabsGUI(QtWidgets.QMainWindow):
 
@@ -55,6 +84,9 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
         """Inicializar ventana principal de OPTIM con configuración y componentes"""
         super().__init__()
         self.config_file = "configuracion_labs.json"
+        # Almacén SQLite opcional: si existe se usa en lugar del JSON (ver almacen_sqlite para convertirlo)
+        if os.path.exists("configuracion_labs.db"):
+            self.config_file = "configuracion_labs.db"
 
         # Ventanas de configuración (se abren bajo demanda)
         self.ventana_horarios = None
@@ -64,6 +96,13 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
         self.ventana_aulas = None
         self.ventana_resultados = None
 
+        # Hilo del motor de organización (solo existe mientras se organiza)
+        self.motor_worker = None
+        # Salidas de las fases de la última organización: al repetirla solo se recalcula lo que cambió
+        self.cache_motor = None
+        # Resultados completos de la última organización (la configuración solo guarda un puntero)
+        self.resultados_cache = None  # (sha256, resultados_organizacion)
+
         self.setup_ui()
         self.conectar_signals()
 
@@ -1169,8 +1208,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
 
             resumen += f"  • Estado: Completada\n"
             # Conflictos detectados en motor de organización
-            conflictos_data = resultados.get("conflictos", {})
-            total_conflictos = sum(len(v) if isinstance(v, list) else 0 for v in conflictos_data.values())
+            total_conflictos = sum(contar_conflictos(resultados).values())
             resumen += f"  • Conflictos: {total_conflictos}\n"
 
             if fecha_actualizacion:
@@ -1221,7 +1259,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             grupos_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # Persistir configuración en archivo JSON
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/grupos"])
 
             # Log apropiado según el tipo de actualización
             total = len(datos_grupos)
@@ -1285,7 +1323,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             calendario_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # Guardar configuración
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/calendario"])
 
             # Log apropiado según el tipo de actualización
             if isinstance(calendario_data, dict) and calendario_data.get("metadata", {}).get(
@@ -1360,7 +1398,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             }
 
             self.configuracion["metadata"]["timestamp"] = datetime.now().isoformat()
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/horarios"])
             self.actualizar_estado_visual()
 
             semestre = datos_horarios.get("semestre_actual", "?")
@@ -1417,7 +1455,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             aulas_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # Guardar configuración
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/aulas"])
 
             # Log apropiado según el tipo de actualización
             if isinstance(aulas_data, dict) and aulas_data.get("metadata", {}).get("accion") == "CANCELAR_CAMBIOS":
@@ -1472,7 +1510,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             profesores_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # Guardar configuración
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/profesores"])
 
             # Log apropiado según el tipo de actualización
             total = len(datos_profesores)
@@ -1529,7 +1567,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             alumnos_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # Guardar configuración
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/alumnos"])
 
             # Log apropiado según el tipo de actualización
             total = len(datos_alumnos)
@@ -1584,7 +1622,7 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             asignaturas_config["fecha_actualizacion"] = datetime.now().isoformat()
 
             # IMPORTANTE: Guardar configuración en JSON
-            self.guardar_configuracion()
+            self.guardar_configuracion(secciones=["configuracion/asignaturas"])
 
             # Log apropiado según el tipo de actualización
             total = len(datos_asignaturas)
@@ -1618,13 +1656,18 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
 
     # ========= CARGA Y GUARDADO =========
     def cargar_configuracion(self) -> dict:
-        """ Cargar configuración desde archivo JSON """
+        """ Cargar configuración desde archivo JSON (o desde el almacén SQLite) """
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                self.log_mensaje(f"Configuración cargada desde {self.config_file}", "info")
-                return config
+                if es_ruta_sqlite(self.config_file):
+                    with AlmacenSQLite(Path(self.config_file)) as almacen:
+                        config = almacen.cargar()
+                else:
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
+                if config:
+                    self.log_mensaje(f"Configuración cargada desde {self.config_file}", "info")
+                    return config
             except Exception as e:
                 self.log_mensaje(f"Error cargando configuración: {e}", "error")
 
@@ -1680,16 +1723,57 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             }
         }
 
-    def guardar_configuracion(self) -> None:
-        """ Guardar configuración actual """
+    def guardar_configuracion(self, secciones: Optional[List[str]] = None) -> None:
+        """
+        Guardar configuración actual (en SQLite, por secciones; en JSON, los resultados van a su propio archivo y aquí solo un puntero)
+
+        Args:
+            secciones: Secciones modificadas (ej: ["configuracion/profesores"]); en SQLite solo se serializan
+                esas y metadata. None = comparar las huellas de todas (importación, primer guardado)
+        """
         try:
             self.configuracion["metadata"]["timestamp"] = datetime.now().isoformat()
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.configuracion, f, indent=2, ensure_ascii=False)
+            config_path = Path(self.config_file)
+
+            # Almacén SQLite: solo se reescriben las secciones que han cambiado, cada una en su transacción
+            if es_ruta_sqlite(config_path):
+                cambiadas = None if secciones is None else ["metadata", *secciones]
+                with AlmacenSQLite(config_path) as almacen:
+                    reescritas = almacen.guardar(self.configuracion, secciones=cambiadas)
+                self.log_mensaje(f"Configuración guardada en {self.config_file} "
+                                 f"({', '.join(reescritas) or 'sin cambios'})", "success")
+                return
+
+            resultados = self.configuracion.get("resultados_organizacion") or {}
+            if resultados.get("datos_disponibles", False) and not es_puntero(resultados):
+                puntero = guardar_resultados(resultados, config_path)
+                self.configuracion["resultados_organizacion"] = puntero
+                self.resultados_cache = (puntero["sha256"], resultados)
+
+            guardar_configuracion_atomica(self.configuracion, config_path)
+
+            # Con la configuración ya apuntando al archivo vigente, borrar los anteriores
+            resultados = self.configuracion.get("resultados_organizacion") or {}
+            podar_resultados(config_path, resultados.get("archivo") if es_puntero(resultados) else None)
             self.log_mensaje(f"Configuración guardada en {self.config_file}", "success")
         except Exception as e:
             self.log_mensaje(f"Error guardando configuración: {e}", "error")
 
+    def obtener_resultados(self) -> dict:
+        """ Resultados completos de la organización, cargados bajo demanda desde su archivo """
+        resultados = self.configuracion.get("resultados_organizacion") or {}
+        if not es_puntero(resultados):
+            return resultados
+
+        if self.resultados_cache is None or self.resultados_cache[0] != resultados["sha256"]:
+            try:
+                self.resultados_cache = (resultados["sha256"],
+                                         cargar_resultados(self.configuracion, Path(self.config_file)))
+            except Exception as e:
+                self.log_mensaje(f"Error cargando resultados de {resultados.get('archivo')}: {e}", "error")
+                return {}
+        return self.resultados_cache[1]
+
     # ========= IMPORTAR/EXPORTAR =========
     def dir_downloads(self) -> str:
         """ Obtener ruta del directorio de Descargas del usuario """
@@ -1743,8 +1827,10 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
                 return
 
             # 3. PREPARAR DATOS DE EXPORTACIÓN CON METADATA COMPLETA
-            # Hacer copia profunda de la configuración actual
+            # Hacer copia profunda de la configuración actual (con los resultados completos, no el puntero)
             datos_export = copy.deepcopy(self.configuracion)
+            if es_puntero(datos_export.get("resultados_organizacion")):
+                datos_export["resultados_organizacion"] = copy.deepcopy(self.obtener_resultados())
 
             # Asegurar que existe la sección metadata
             if "metadata" not in datos_export:
@@ -1912,6 +1998,10 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             if "configuracion" not in datos_importados:
                 raise ValueError("El archivo no es una configuración OPTIM válida")
 
+            # Si trae un puntero a resultados (configuracion_labs.json copiado tal cual), traer los resultados
+            if es_puntero(datos_importados.get("resultados_organizacion")):
+                datos_importados["resultados_organizacion"] = cargar_resultados(datos_importados, Path(archivo))
+
             # Respaldar configuración actual
             configuracion_backup = self.configuracion.copy()
 
@@ -2042,11 +2132,11 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
 
     # ========= MOTOR ORGANIZACIÓN =========
     def ejecutar_motor_organizacion(self) -> None:
-        """ Ejecuta el motor que vuelca resultados en el JSON """
+        """ Lanza el motor en un hilo aparte; los resultados se vuelcan al terminar """
         try:
             # 1) Importar el motor
             try:
-                from modules.organizador.motor_organizacion import main as ejecutar_motor
+                from modules.organizador.motor_organizacion import organizar, CacheFases
                 MOTOR_DISPONIBLE = True
             except ImportError as e:
                 self.log_mensaje(f"Motor de organización no disponible: {e}", "error")
@@ -2061,33 +2151,67 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
             if not self.verificar_configuracion_completa():
                 return
 
+            if self.motor_worker is not None and self.motor_worker.isRunning():
+                return
+
             self.log_mensaje("Ejecutando motor de organización (JSON)...", "info")
 
-            # 3) Deshabilitar interfaz y mostrar progreso indeterminado
+            # 3) Deshabilitar interfaz y mostrar progreso por fases
             self.deshabilitar_interfaz_organizacion()
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(0)
+            self.progress_bar.setFormat("Preparando organización... %p%")
             self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)  # indeterminado
 
-            # 4) Ejecutar el motor (bloqueante). Le pasamos la ruta del JSON.
-            ejecutar_motor()
+            # 4) Ejecutar el motor en segundo plano sobre una copia de la configuración
+            #    (la GUI sigue respondiendo y no puede modificar los datos a mitad de ejecución)
+            if self.cache_motor is None:
+                self.cache_motor = CacheFases()
+            self.motor_worker = MotorOrganizacionWorker(copy.deepcopy(self.configuracion), self.cache_motor, self)
+            self.motor_worker.progreso.connect(self.actualizar_progreso_motor)
+            self.motor_worker.finalizado.connect(self.finalizar_motor_organizacion)
+            self.motor_worker.fallo.connect(self.error_motor_organizacion)
+            self.motor_worker.start()
+
+        except Exception as e:
+            self.error_motor_organizacion(f"{type(e).__name__}: {e}")
+
+    def actualizar_progreso_motor(self, evento) -> None:
+        """ Refleja en la barra de progreso un EventoProgreso del motor """
+        if evento.paso == 0:
+            self.log_mensaje(f"Fase {evento.fase}/8: {evento.nombre}...", "info")
+
+        detalle = f" · {evento.mensaje}" if evento.mensaje else ""
+        self.progress_bar.setFormat(f"Fase {evento.fase}/8 · {evento.nombre}{detalle} · %p%")
+        self.progress_bar.setValue(evento.porcentaje)
+
+    def finalizar_motor_organizacion(self, resultado) -> None:
+        """ Recoge el ResultadoMotor del hilo, guarda y ofrece abrir los resultados """
+        try:
+            from modules.organizador.motor_organizacion import MENSAJES_ERROR_FASE
 
             # 5) Ocultar barra y restaurar interfaz
-            self.progress_bar.setRange(0, 100)
-            self.progress_bar.setVisible(False)
-            self.restaurar_interfaz_organizacion()
+            self.ocultar_progreso_motor()
+
+            if not resultado.exito:
+                titulo, mensaje = MENSAJES_ERROR_FASE[resultado.fase_fallida]
+                self.log_mensaje(f"Motor de organización detenido en la fase {resultado.fase_fallida}", "error")
+                QtWidgets.QMessageBox.critical(self, titulo, mensaje)
+                return
 
-            # 6) Recargar config desde disco, refrescar estado y ofrecer abrir resultados
-            self.configuracion = self.cargar_configuracion()
+            # 6) Volcar resultados, guardar una sola vez, refrescar estado y ofrecer abrir resultados
+            self.configuracion["resultados_organizacion"] = resultado.resultados
+            self.guardar_configuracion(secciones=["resultados_organizacion"])
             self.actualizar_estado_visual()
             self.actualizar_resumen_configuracion()
             self.log_mensaje("Organización completada y guardada en el JSON", "success")
 
             # Preguntar si quiere ver los resultados
-            conflictos = self.configuracion.get("resultados_organizacion", {}).get("conflictos", {})
+            conflictos = resultado.resultados.get("conflictos", {})
             hay_conflictos = any(len(v) > 0 for v in conflictos.values())
 
             # 1) Aviso Popup de alertas semana_inicio (si existe)
-            alertas_semana = self.configuracion.get("resultados_organizacion",{}).get("alertas_semana_inicio",[]) or []
+            alertas_semana = resultado.resultados.get("alertas_semana_inicio", []) or []
             if alertas_semana:
                 mb = QMessageBox(self)
                 mb.setIcon(QMessageBox.Icon.Warning)
@@ -2132,17 +2256,37 @@ class OptimLabsGUI(QtWidgets.QMainWindow):
                 self.abrir_ver_resultados()
 
         except Exception as e:
-            # Recuperación en caso de error
-            self.progress_bar.setRange(0, 100)
-            self.progress_bar.setVisible(False)
-            self.restaurar_interfaz_organizacion()
+            self.error_motor_organizacion(f"{type(e).__name__}: {e}")
 
-            error_msg = f"Error ejecutando motor de organización: {str(e)}"
-            self.log_mensaje(f"{error_msg}", "error")
-            QtWidgets.QMessageBox.critical(
-                self, "Error de Ejecución",
-                f"{error_msg}\n\nDetalles técnicos:\n{type(e).__name__}: {e}"
+    def error_motor_organizacion(self, detalle: str) -> None:
+        """ Recuperación en caso de excepción durante la organización """
+        self.ocultar_progreso_motor()
+
+        error_msg = "Error ejecutando motor de organización"
+        self.log_mensaje(f"{error_msg}: {detalle}", "error")
+        QtWidgets.QMessageBox.critical(
+            self, "Error de Ejecución",
+            f"{error_msg}\n\nDetalles técnicos:\n{detalle}"
+        )
+
+    def ocultar_progreso_motor(self) -> None:
+        """ Ocultar barra de progreso y restaurar interfaz tras la organización """
+        self.progress_bar.setFormat("%p%")
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(False)
+        self.restaurar_interfaz_organizacion()
+
+    def closeEvent(self, event) -> None:
+        """ No cerrar la ventana mientras el motor sigue organizando en segundo plano """
+        if self.motor_worker is not None and self.motor_worker.isRunning():
+            QtWidgets.QMessageBox.warning(
+                self, "Organización en curso",
+                "El motor de organización todavía se está ejecutando.\n"
+                "Espera a que termine antes de cerrar OPTIM."
             )
+            event.ignore()
+            return
+        super().closeEvent(event)
 
     # ========= LOG =========
     def log_mensaje(self, mensaje, tipo="info") -> None:
@@ -0,0 +1,198 @@
+"""
+Benchmark del Motor de Organización - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Genera configuraciones sintéticas a 1x, 5x y 20x el tamaño actual (generador_configuracion),
+ejecuta el motor en memoria y mide el tiempo de cada fase (métricas de MedidorFases).
+
+Uso (desde src/):
+    python -m benchmarks.ejecutar_benchmark                       # 1x, 5x, 20x y comparar con baseline.json
+    python -m benchmarks.ejecutar_benchmark --escalas 1 5         # solo algunas escalas
+    python -m benchmarks.ejecutar_benchmark --guardar-baseline    # actualizar baseline.json
+    python -m benchmarks.ejecutar_benchmark --modo-asignacion flujo   # medir la asignación por flujo
+    python -m benchmarks.ejecutar_benchmark --busqueda-local 5        # añadir 5 s de búsqueda local
+    python -m benchmarks.ejecutar_benchmark --procesos 2              # Fases 5 y 7 en paralelo
+    python -m benchmarks.ejecutar_benchmark --arranques 4 --procesos 4   # mejor de 4 ejecuciones de las Fases 5-7
+
+La baseline solo es comparable en la misma máquina: se guarda junto con la versión de Python y la plataforma.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from benchmarks.generador_configuracion import ParametrosGenerador, generar_configuracion
+from modules.organizador.motor_organizacion import (organizar, NOMBRES_FASES, OpcionesMotor,
+                                                    MODOS_ASIGNACION, MODO_ASIGNACION_VORAZ,
+                                                    FASE_BUSQUEDA_LOCAL, NOMBRE_BUSQUEDA_LOCAL,
+                                                    FASE_MULTIARRANQUE, NOMBRE_MULTIARRANQUE)
+
+# ========= CONSTANTES =========
+ESCALAS_POR_DEFECTO = [1, 5, 20]
+RUTA_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+NOMBRES_ETAPAS = {**{str(num): nombre for num, nombre in NOMBRES_FASES.items()},
+                  FASE_BUSQUEDA_LOCAL: NOMBRE_BUSQUEDA_LOCAL, FASE_MULTIARRANQUE: NOMBRE_MULTIARRANQUE}
+
+
+# ========= EJECUCIÓN =========
+def medir_escala(escala: int, repeticiones: int = 1, opciones: Optional[OpcionesMotor] = None) -> Dict[str, Any]:
+    """
+    Generar la configuración de una escala y ejecutar el motor (mejor tiempo de N repeticiones).
+
+    Args:
+        escala: Multiplicador de tamaño sobre ParametrosGenerador()
+        repeticiones: Número de ejecuciones; se conserva la más rápida
+        opciones: Opciones del motor (modo de asignación, ...)
+
+    Returns:
+        Diccionario con parámetros, tiempos por fase, contadores y estadísticas finales
+    """
+    parametros = ParametrosGenerador().escalar(escala)
+    cfg = generar_configuracion(parametros)
+
+    mejor = None
+    for _ in range(max(1, repeticiones)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = organizar(cfg, opciones=opciones)
+        if not resultado.exito:
+            raise RuntimeError(f"El motor falló en la fase {resultado.fase_fallida} con escala {escala}x")
+        if mejor is None or resultado.metricas["tiempo_total_s"] < mejor.metricas["tiempo_total_s"]:
+            mejor = resultado
+
+    fases = mejor.metricas["fases"]
+    return {
+        "escala": escala,
+        "parametros": {
+            "alumnos": parametros.alumnos,
+            "asignaturas": parametros.asignaturas,
+            "grupos_simples": parametros.grupos_simples,
+            "grupos_dobles": parametros.grupos_dobles,
+            "aulas": parametros.aulas,
+            "profesores": parametros.profesores
+        },
+        "tiempo_total_s": mejor.metricas["tiempo_total_s"],
+        "tiempos_fase_s": {num: datos["tiempo_s"] for num, datos in fases.items()},
+        "memoria_pico_mb": max((d["memoria_pico_mb"] or 0) for d in fases.values()),
+        "contadores": {num: datos["contadores"] for num, datos in fases.items()},
+        "estadisticas": mejor.estadisticas,
+        "calidad": mejor.metricas.get("calidad", {}).get("criterios", {})
+    }
+
+
+def ejecutar_benchmark(escalas: List[int], repeticiones: int = 1,
+                       opciones: Optional[OpcionesMotor] = None) -> Dict[str, Any]:
+    """Medir todas las escalas pedidas"""
+    opciones = opciones or OpcionesMotor()
+    informe: Dict[str, Any] = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": repeticiones,
+        "modo_asignacion": opciones.modo_asignacion,
+        "presupuesto_busqueda_s": opciones.presupuesto_busqueda_s,
+        "procesos": opciones.procesos,
+        "arranques": opciones.arranques,
+        "escalas": {}
+    }
+
+    for escala in escalas:
+        print(f"  • Escala {escala}x...", file=sys.stderr, flush=True)
+        informe["escalas"][str(escala)] = medir_escala(escala, repeticiones, opciones)
+
+    return informe
+
+
+# ========= INFORME =========
+def _formato_ratio(actual: float, base: Optional[float]) -> str:
+    """Ratio actual/baseline (x0.50 = el doble de rápido)"""
+    if not base:
+        return ""
+    return f" (x{actual / base:.2f})"
+
+
+def mostrar_informe(informe: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Imprimir una tabla de tiempos por fase y escala, comparada con la baseline si existe"""
+    escalas_base = (baseline or {}).get("escalas", {})
+
+    for escala, datos in informe["escalas"].items():
+        base = escalas_base.get(escala)
+        p = datos["parametros"]
+
+        print("\n" + "=" * 70)
+        print(f"ESCALA {escala}x: {p['alumnos']} alumnos, {p['asignaturas']} asignaturas, "
+              f"{p['grupos_simples']}+{p['grupos_dobles']} grupos, {p['aulas']} aulas, {p['profesores']} profesores")
+        print("=" * 70)
+
+        for num, tiempo in datos["tiempos_fase_s"].items():
+            tiempo_base = base["tiempos_fase_s"].get(num) if base else None
+            nombre = NOMBRES_ETAPAS.get(num, "")
+            etiqueta = f"FASE {num} {nombre}"
+            print(f"  {etiqueta:<33} {tiempo:>9.3f} s{_formato_ratio(tiempo, tiempo_base)}")
+
+        total_base = base["tiempo_total_s"] if base else None
+        print(f"  {'TOTAL':<33} {datos['tiempo_total_s']:>9.3f} s{_formato_ratio(datos['tiempo_total_s'], total_base)}")
+        print(f"  Pico de memoria: {datos['memoria_pico_mb']} MB")
+
+    if baseline:
+        print(f"\n  Baseline: {baseline.get('fecha')} (Python {baseline.get('python')}, {baseline.get('plataforma')})")
+
+
+# ========= CLI =========
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ejecutar el benchmark desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark del motor de organización de OPTIM")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_POR_DEFECTO,
+                        help="multiplicadores de tamaño a medir (por defecto: 1 5 20)")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="ejecuciones por escala; se conserva la más rápida")
+    parser.add_argument("--baseline", type=Path, default=RUTA_BASELINE,
+                        help="baseline con la que comparar / que actualizar")
+    parser.add_argument("--guardar-baseline", action="store_true",
+                        help="guardar este resultado como nueva baseline")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="guardar además el informe completo en este JSON")
+    parser.add_argument("--modo-asignacion", choices=MODOS_ASIGNACION, default=MODO_ASIGNACION_VORAZ,
+                        help="algoritmo de asignación de alumnos de grado simple")
+    parser.add_argument("--busqueda-local", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="segundos de búsqueda local tras la Fase 7 (por defecto: 0, desactivada)")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos para las Fases 5 y 7 en paralelo (por defecto: 1, secuencial)")
+    parser.add_argument("--arranques", type=int, default=1,
+                        help="ejecuciones de las Fases 5-7 de las que se conserva la mejor (por defecto: 1)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline.exists() and not args.guardar_baseline:
+        with args.baseline.open("r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    opciones = OpcionesMotor(modo_asignacion=args.modo_asignacion, presupuesto_busqueda_s=args.busqueda_local,
+                             procesos=args.procesos, arranques=args.arranques)
+    informe = ejecutar_benchmark(args.escalas, args.repeticiones, opciones)
+    mostrar_informe(informe, baseline)
+
+    destinos = [args.out] if args.out else []
+    if args.guardar_baseline:
+        destinos.append(args.baseline)
+
+    for destino in destinos:
+        with destino.open("w", encoding="utf-8") as fh:
+            json.dump(informe, fh, ensure_ascii=False, indent=2)
+        print(f"\n✓ Informe guardado en {destino}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,394 @@
+"""
+Generador de Configuraciones Sintéticas - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Construye documentos configuracion_labs.json válidos (pasan la Fase 1 del motor) con el
+tamaño y la densidad que se indiquen, para medir el rendimiento del motor de forma
+reproducible sin depender de datos reales de alumnos.
+
+Uso (desde src/):
+    python -m benchmarks.generador_configuracion --escala 5 --out /tmp/config_x5.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple, Any
+
+# ========= CONSTANTES =========
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
+FRANJAS = ["09:30-11:30", "11:30-13:30", "15:30-17:30", "17:30-19:30"]
+GRUPOS_SIMPLES_POR_CURSO = 3
+CURSOS_POR_TITULACION = 4
+SEMANA_INICIO = 3
+
+# Inicio de cada semestre (siempre lunes)
+INICIO_SEMESTRE = {
+    "semestre_1": date(2025, 9, 8),
+    "semestre_2": date(2026, 2, 2),
+}
+
+
+# ========= PARÁMETROS =========
+@dataclass
+class ParametrosGenerador:
+    """
+    Parámetros de tamaño y densidad de la configuración sintética.
+
+    Attributes:
+        alumnos: Número total de alumnos
+        asignaturas: Número total de asignaturas (repartidas entre cursos y semestres)
+        grupos_simples: Número total de grupos de grado simple (ej: A102)
+        grupos_dobles: Número total de grupos de doble grado (ej: AD102)
+        letras: Letras de laboratorio por franja (A, B, C...)
+        aulas: Número de laboratorios
+        profesores: Número de profesores
+        semanas: Semanas lectivas por semestre (limite_semanas)
+        densidad_mixta: Probabilidad de que una franja sea mixta (simple + doble)
+        densidad_bloqueos: Fracción de franjas (día, hora) bloqueadas por profesor
+        semilla: Semilla del generador aleatorio
+    """
+    alumnos: int = 1200
+    asignaturas: int = 24
+    grupos_simples: int = 12
+    grupos_dobles: int = 4
+    letras: int = 4
+    aulas: int = 12
+    profesores: int = 40
+    semanas: int = 14
+    densidad_mixta: float = 0.3
+    densidad_bloqueos: float = 0.1
+    semilla: int = 2025
+
+    def escalar(self, factor: int) -> "ParametrosGenerador":
+        """Multiplicar el tamaño (no la densidad ni el calendario) por un factor"""
+        return ParametrosGenerador(
+            alumnos=self.alumnos * factor,
+            asignaturas=self.asignaturas * factor,
+            grupos_simples=self.grupos_simples * factor,
+            grupos_dobles=self.grupos_dobles * factor,
+            letras=self.letras,
+            aulas=self.aulas * factor,
+            profesores=self.profesores * factor,
+            semanas=self.semanas,
+            densidad_mixta=self.densidad_mixta,
+            densidad_bloqueos=self.densidad_bloqueos,
+            semilla=self.semilla
+        )
+
+
+# ========= GENERADOR =========
+class GeneradorConfiguracion:
+    """
+    Genera un configuracion_labs.json sintético a partir de ParametrosGenerador.
+
+    Estructura generada:
+        - Cursos: bloques de GRUPOS_SIMPLES_POR_CURSO grupos simples (A101, A102...)
+        - Asignaturas: repartidas por curso y alternando semestre, asociadas a todos los grupos del curso
+        - Horarios: cada (asignatura, grupo) ocupa una franja distinta de las del resto de
+          asignaturas del curso, con todas las letras; algunas franjas son mixtas con un grupo doble
+        - Alumnos: repartidos uniformemente entre grupos, matriculados en las asignaturas de su curso
+    """
+
+    def __init__(self, parametros: ParametrosGenerador):
+        self.p = parametros
+        self.rng = random.Random(parametros.semilla)
+
+        self.cursos: List[Dict[str, Any]] = []
+        self.asignaturas: Dict[str, Dict[str, Any]] = {}
+
+    def generar(self) -> Dict[str, Any]:
+        """Construir el documento completo"""
+        self._crear_cursos()
+        calendario = self._generar_calendario()
+        asignaturas, horarios = self._generar_asignaturas_y_horarios()
+        alumnos = self._generar_alumnos()
+        aulas = self._generar_aulas()
+        profesores = self._generar_profesores(calendario)
+        grupos = self._generar_grupos()
+
+        return {
+            "metadata": {
+                "version": "1.0",
+                "timestamp": "2025-09-01T00:00:00",
+                "semestre_actual": 1,
+                "generador": asdict(self.p)
+            },
+            "configuracion": {
+                "horarios": {"configurado": True, "datos": horarios, "total": len(self.asignaturas)},
+                "calendario": {"configurado": True, "datos": calendario},
+                "aulas": {"configurado": True, "datos": aulas, "total": len(aulas)},
+                "profesores": {"configurado": True, "datos": profesores, "total": len(profesores)},
+                "alumnos": {"configurado": True, "datos": alumnos, "total": len(alumnos)},
+                "asignaturas": {"configurado": True, "datos": asignaturas, "total": len(asignaturas)},
+                "grupos": {"configurado": True, "datos": grupos, "total": len(grupos)},
+            },
+            "resultados_organizacion": {
+                "datos_disponibles": False,
+                "fecha_actualizacion": None
+            }
+        }
+
+    # ========= ESTRUCTURA ACADÉMICA =========
+    def _crear_cursos(self) -> None:
+        """Repartir grupos simples y dobles en cursos (titulación = letra, curso = dígito)"""
+        num_cursos = max(1, -(-self.p.grupos_simples // GRUPOS_SIMPLES_POR_CURSO))
+
+        for c in range(num_cursos):
+            titulacion = chr(65 + (c // CURSOS_POR_TITULACION) % 26)
+            numero = c % CURSOS_POR_TITULACION + 1
+            self.cursos.append({
+                "titulacion": titulacion,
+                "numero": numero,
+                "simples": [],
+                "dobles": [],
+                "asignaturas": []
+            })
+
+        for i in range(self.p.grupos_simples):
+            curso = self.cursos[i % num_cursos]
+            curso["simples"].append(f"{curso['titulacion']}{curso['numero']}{len(curso['simples']) + 1:02d}")
+
+        for i in range(self.p.grupos_dobles):
+            curso = self.cursos[i % num_cursos]
+            curso["dobles"].append(f"{curso['titulacion']}D{curso['numero']}{len(curso['dobles']) + 1:02d}")
+
+    def _num_sesiones(self) -> int:
+        """Mayor número de sesiones que deja sitio a todas las letras (fórmula de la Fase 1)"""
+        disponibles = self.p.semanas - SEMANA_INICIO + 1
+        for sesiones in range(disponibles, 0, -1):
+            if disponibles % sesiones == 0 and disponibles // sesiones >= self.p.letras:
+                return sesiones
+        raise ValueError(f"No caben {self.p.letras} letras en {disponibles} semanas")
+
+    def _generar_asignaturas_y_horarios(self) -> Tuple[Dict, Dict]:
+        """Crear asignaturas (con grupos_asociados) y su horarios_grid"""
+        num_sesiones = self._num_sesiones()
+        letras = [chr(65 + i) for i in range(self.p.letras)]
+        slots = [(dia, franja) for franja in FRANJAS for dia in DIAS]
+
+        asignaturas: Dict[str, Dict] = {}
+        horarios: Dict[str, Dict] = {"1": {}, "2": {}}
+
+        for i in range(self.p.asignaturas):
+            curso = self.cursos[i % len(self.cursos)]
+            sem = "1" if (i // len(self.cursos)) % 2 == 0 else "2"
+            codigo = f"S{i + 1:03d}"
+            indice_en_curso = sum(1 for a in curso["asignaturas"] if a[1] == sem)
+            curso["asignaturas"].append((codigo, sem))
+
+            grupos_asociados = {}
+            for grupo in curso["simples"] + curso["dobles"]:
+                grupos_asociados[grupo] = {
+                    "configuracion_laboratorio": {
+                        "horas_por_sesion": 2,
+                        "minutos_por_sesion": 0,
+                        "semana_inicio": SEMANA_INICIO,
+                        "num_sesiones": num_sesiones
+                    }
+                }
+
+            asignaturas[codigo] = {
+                "codigo": codigo,
+                "nombre": f"Asignatura {codigo}",
+                "semestre": f"{sem}º Semestre",
+                "curso": f"{curso['numero']}º Curso",
+                "tipo": "Obligatoria",
+                "grupos_asociados": grupos_asociados
+            }
+
+            # Una franja distinta por grupo y asignatura dentro del curso/semestre
+            # (cada curso empieza en una franja distinta para repartir la ocupación de aulas)
+            horarios_grid: Dict[str, Dict[str, Dict]] = {}
+            num_simples = len(curso["simples"])
+            desplazamiento = (self.cursos.index(curso) * 7) % len(slots)
+            for j, grupo in enumerate(curso["simples"]):
+                dia, franja = slots[(desplazamiento + indice_en_curso * num_simples + j) % len(slots)]
+                grupos_slot = [grupo]
+                if curso["dobles"] and self.rng.random() < self.p.densidad_mixta:
+                    grupos_slot.append(curso["dobles"][j % len(curso["dobles"])])
+                horarios_grid.setdefault(franja, {})[dia] = {
+                    "grupos": grupos_slot,
+                    "letras": list(letras),
+                    "mixta": len(grupos_slot) > 1
+                }
+
+            horarios[sem][codigo] = {
+                "grupos": json.loads(json.dumps(grupos_asociados)),
+                "horarios_grid": horarios_grid
+            }
+
+        self.asignaturas = asignaturas
+        return asignaturas, horarios
+
+    # ========= CALENDARIO =========
+    def _generar_calendario(self) -> Dict[str, Any]:
+        """Calendario lectivo de lunes a viernes con limite_semanas semanas por semestre"""
+        calendario: Dict[str, Any] = {"anio_academico": "2025-2026", "metadata": {"limite_semanas": self.p.semanas}}
+
+        for sem_key, inicio in INICIO_SEMESTRE.items():
+            dias_sem: Dict[str, Dict] = {}
+            for semana in range(self.p.semanas):
+                for d, dia in enumerate(DIAS):
+                    fecha = inicio + timedelta(days=semana * 7 + d)
+                    iso = fecha.isoformat()
+                    dias_sem[iso] = {
+                        "fecha": iso,
+                        "dia_real": dia,
+                        "horario_asignado": dia,
+                        "motivo": "",
+                        "es_especial": False,
+                        "es_fin_semana": False
+                    }
+            calendario[sem_key] = dias_sem
+
+        return calendario
+
+    # ========= PERSONAS Y RECURSOS =========
+    def _generar_alumnos(self) -> Dict[str, Dict]:
+        """Alumnos repartidos entre todos los grupos, matriculados en las asignaturas de su curso"""
+        plazas = [(curso, g) for curso in self.cursos for g in curso["simples"] + curso["dobles"]]
+        alumnos: Dict[str, Dict] = {}
+
+        for i in range(self.p.alumnos):
+            curso, grupo = plazas[i % len(plazas)]
+            matriculas = {}
+            for codigo, _ in curso["asignaturas"]:
+                if self.rng.random() < 0.9:
+                    matriculas[codigo] = {
+                        "matriculado": True,
+                        "lab_aprobado": self.rng.random() < 0.05,
+                        "grupo": grupo
+                    }
+
+            alumno_id = f"ALU{i + 1:06d}"
+            alumnos[alumno_id] = {
+                "dni": f"{10000000 + i}X",
+                "nombre": f"Nombre{i + 1}",
+                "apellidos": f"Apellido{i % 97} Apellido{i % 89}",
+                "email": f"alumno{i + 1}@alumnos.upm.es",
+                "grupos_matriculado": [grupo],
+                "asignaturas_matriculadas": matriculas,
+                "exp_centro": f"{50000 + i}",
+                "exp_agora": f"{900000 + i}"
+            }
+
+        return alumnos
+
+    def _generar_aulas(self) -> Dict[str, Dict]:
+        """Laboratorios asociados cada uno a un subconjunto de asignaturas (todas cubiertas)"""
+        codigos = list(self.asignaturas.keys())
+        aulas: Dict[str, Dict] = {}
+
+        for i in range(self.p.aulas):
+            nombre = f"Lab_{i + 1:03d}"
+            aulas[nombre] = {
+                "nombre": nombre,
+                "capacidad": self.rng.choice([18, 20, 24, 28, 32]),
+                "equipamiento": "",
+                "edificio": "A",
+                "planta": str(i % 4),
+                "disponible": True,
+                "asignaturas_asociadas": [],
+                "fechas_no_disponibles": []
+            }
+
+        nombres = list(aulas.keys())
+        for k, codigo in enumerate(codigos):
+            for nombre in {nombres[k % len(nombres)], self.rng.choice(nombres)}:
+                aulas[nombre]["asignaturas_asociadas"].append(codigo)
+
+        return aulas
+
+    def _generar_profesores(self, calendario: Dict[str, Any]) -> Dict[str, Dict]:
+        """Profesores con 2-4 asignaturas, 3-5 días de trabajo y franjas/fechas bloqueadas"""
+        codigos = list(self.asignaturas.keys())
+        fechas_lectivas = [
+            info["fecha"] for sem_key in INICIO_SEMESTRE for info in calendario[sem_key].values()
+        ]
+        profesores: Dict[str, Dict] = {}
+
+        for i in range(self.p.profesores):
+            prof_id = f"PROF{i + 1:04d}"
+            imparte = {codigos[i % len(codigos)]}
+            imparte.update(self.rng.sample(codigos, min(len(codigos), self.rng.randint(1, 3))))
+            dias_trabajo = sorted(self.rng.sample(DIAS, self.rng.randint(3, 5)), key=DIAS.index)
+
+            bloqueados: Dict[str, Dict[str, str]] = {}
+            for dia in DIAS:
+                for franja in FRANJAS:
+                    if self.rng.random() < self.p.densidad_bloqueos:
+                        bloqueados.setdefault(dia, {})[franja] = "no disponible"
+
+            num_fechas = int(len(fechas_lectivas) * self.p.densidad_bloqueos / 4)
+            fechas_no_disp = sorted(self.rng.sample(fechas_lectivas, num_fechas))
+
+            profesores[prof_id] = {
+                "id": prof_id,
+                "nombre": f"Profesor{i + 1}",
+                "apellidos": f"Apellido{i % 53}",
+                "asignaturas_imparte": sorted(imparte),
+                "dias_trabajo": dias_trabajo,
+                "horarios_bloqueados": bloqueados,
+                "fechas_no_disponibles": [
+                    f"{f[8:10]}/{f[5:7]}/{f[0:4]}" for f in fechas_no_disp
+                ]
+            }
+
+        return profesores
+
+    def _generar_grupos(self) -> Dict[str, Dict]:
+        """Sección 'grupos' (solo la usa la GUI; el motor trabaja con asignaturas y horarios)"""
+        grupos: Dict[str, Dict] = {}
+        for curso in self.cursos:
+            for codigo in curso["simples"] + curso["dobles"]:
+                grupos[codigo] = {
+                    "codigo": codigo,
+                    "nombre": f"Grupo {codigo}",
+                    "curso": f"{curso['numero']}º Curso",
+                    "tipo_grado": "Doble Grado" if codigo in curso["dobles"] else "Grado",
+                    "asignaturas_asociadas": [c for c, _ in curso["asignaturas"]]
+                }
+        return grupos
+
+
+def generar_configuracion(parametros: ParametrosGenerador) -> Dict[str, Any]:
+    """Atajo: generar un documento completo a partir de unos parámetros"""
+    return GeneradorConfiguracion(parametros).generar()
+
+
+# ========= CLI =========
+def main(argv: List[str] = None) -> int:
+    """Generar un configuracion_labs.json sintético y guardarlo en disco"""
+    base = ParametrosGenerador()
+    parser = argparse.ArgumentParser(description="Generador de configuraciones sintéticas de OPTIM")
+    parser.add_argument("--out", type=Path, required=True, help="ruta del JSON a generar")
+    parser.add_argument("--escala", type=int, default=1, help="multiplicador de tamaño (1x, 5x, 20x...)")
+    for nombre, valor in asdict(base).items():
+        parser.add_argument(f"--{nombre.replace('_', '-')}", type=type(valor), default=valor)
+    args = parser.parse_args(argv)
+
+    parametros = ParametrosGenerador(**{k: getattr(args, k) for k in asdict(base)}).escalar(args.escala)
+    cfg = generar_configuracion(parametros)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with args.out.open("w", encoding="utf-8") as fh:
+        json.dump(cfg, fh, ensure_ascii=False)
+
+    print(f"✓ Configuración generada: {args.out}")
+    print(f"  • {parametros.alumnos} alumnos, {parametros.asignaturas} asignaturas, "
+          f"{parametros.grupos_simples}+{parametros.grupos_dobles} grupos, {parametros.aulas} aulas, "
+          f"{parametros.profesores} profesores")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3285,7 +3285,10 @@ class ConfigurarAlumnosWindow(QMainWindow):
             if not self.parent_window or not hasattr(self.parent_window, 'configuracion'):
                 return laboratorios
 
-            resultados = self.parent_window.configuracion.get("resultados_organizacion", {})
+            if hasattr(self.parent_window, 'obtener_resultados'):
+                resultados = self.parent_window.obtener_resultados()
+            else:
+                resultados = self.parent_window.configuracion.get("resultados_organizacion", {})
             if not resultados.get("datos_disponibles", False):
                 return laboratorios
 
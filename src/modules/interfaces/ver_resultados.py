@@ -31,6 +31,9 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet
 
+from modules.organizador.archivo_resultados import cargar_resultados
+from modules.organizador.almacen_sqlite import AlmacenSQLite, es_ruta_sqlite
+
 
 # ========= Utilidades de Ordenación y Normalización =========
 DAY_ORDER = {
@@ -156,7 +159,12 @@ def default_config_path() -> Path:
 
 
 def load_config(path: Path) -> Dict[str, Any]:
-    """Carga y parsea el archivo JSON de configuración"""
+    """Carga y parsea el archivo JSON de configuración (o el almacén SQLite si es .db/.sqlite)"""
+    if es_ruta_sqlite(path):
+        if not path.exists():
+            raise FileNotFoundError(path)
+        with AlmacenSQLite(path) as almacen:
+            return almacen.cargar()
     with path.open("r", encoding="utf-8") as fh:
         return json.load(fh)
 
@@ -529,11 +537,12 @@ class VerResultadosWindow(QMainWindow):
 
         try:
             self.cfg = load_config(self.cfg_path)
+            # En línea (formato antiguo) o en su archivo aparte (la configuración solo guarda un puntero)
+            self.res = cargar_resultados(self.cfg, self.cfg_path)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo cargar el JSON:\n{self.cfg_path}\n\n{e}")
             return
 
-        self.res = self.cfg.get("resultados_organizacion", {}) or {}
         self.alumnos = (self.cfg.get("configuracion", {})
                            .get("alumnos", {})
                            .get("datos", {}) or {})
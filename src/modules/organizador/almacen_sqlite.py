@@ -0,0 +1,440 @@
+"""
+Almacén SQLite - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Alternativa opcional a configuracion_labs.json (se elige con una ruta .db/.sqlite): la
+configuración se guarda por secciones en SQLite (stdlib sqlite3), así que cambiar una sección
+(ej: profesores) escribe solo esa sección en una transacción en vez de todo el documento.
+
+Cada registro (alumno, profesor, aula, asignatura, grupo, horario de una asignatura, día del
+calendario y grupo de los resultados) es una fila con su JSON, en su orden original, más unas
+columnas indexadas para consultarlo. Matrículas y celdas de horarios se guardan además en tablas
+derivadas indexadas. Lo que no son registros (totales, flags, conflictos, ...) va en la cabecera
+de la sección, con los contenedores de registros vacíos para conservar el orden de las claves:
+
+    secciones:            nombre, orden, huella, cabecera
+    alumnos:              dni, email                  -> matriculas: alumno, asignatura, grupo
+    profesores:           nombre, apellidos
+    aulas:                capacidad
+    asignaturas:          semestre, curso
+    grupos:               curso
+    horarios:             semestre, asignatura        -> horarios_celdas: franja, dia, grupo
+    calendario_dias:      semestre, fecha, dia_real, horario_asignado
+    resultados_grupos:    semestre, asignatura, label, profesor_id, aula
+
+cargar() devuelve exactamente el mismo documento que se guardó (mismas claves y mismo orden,
+que también cambian el resultado del motor), y el JSON sigue siendo el formato de intercambio:
+importar_json/exportar_json o, desde src/:
+
+    python -m modules.organizador.almacen_sqlite importar configuracion_labs.json configuracion_labs.db
+    python -m modules.organizador.almacen_sqlite exportar configuracion_labs.db copia.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Any, Iterable, Iterator
+
+from modules.organizador.archivo_resultados import guardar_configuracion_atomica, es_puntero, cargar_resultados
+
+# ========= CONSTANTES =========
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")
+VERSION_ESQUEMA = 1
+
+SECCION_CONFIGURACION = "configuracion"
+SECCION_RESULTADOS = "resultados_organizacion"
+SEPARADOR_SECCION = "/"  # "configuracion/alumnos"
+
+# Sección -> (tabla de registros, columnas indexadas además de contenedor y clave)
+TABLAS_SECCIONES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "configuracion/alumnos": ("alumnos", ("dni", "email")),
+    "configuracion/profesores": ("profesores", ("nombre", "apellidos")),
+    "configuracion/aulas": ("aulas", ("capacidad",)),
+    "configuracion/asignaturas": ("asignaturas", ("semestre", "curso")),
+    "configuracion/grupos": ("grupos", ("curso",)),
+    "configuracion/horarios": ("horarios", ("semestre", "asignatura")),
+    "configuracion/calendario": ("calendario_dias", ("semestre", "fecha", "dia_real", "horario_asignado")),
+    SECCION_RESULTADOS: ("resultados_grupos", ("semestre", "asignatura", "label", "profesor_id", "aula")),
+}
+
+# Tablas derivadas (solo para consultas; se regeneran con su sección)
+TABLAS_DERIVADAS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "configuracion/alumnos": ("matriculas", ("alumno", "asignatura", "grupo", "matriculado", "lab_aprobado")),
+    "configuracion/horarios": ("horarios_celdas", ("semestre", "asignatura", "franja", "dia", "grupo")),
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS info (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS secciones (nombre TEXT PRIMARY KEY, orden INTEGER, huella TEXT, cabecera TEXT);
+
+CREATE TABLE IF NOT EXISTS alumnos (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    dni TEXT, email TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_alumnos_clave ON alumnos (clave);
+CREATE INDEX IF NOT EXISTS ix_alumnos_dni ON alumnos (dni);
+
+CREATE TABLE IF NOT EXISTS matriculas (alumno TEXT, asignatura TEXT, grupo TEXT,
+    matriculado INTEGER, lab_aprobado INTEGER);
+CREATE INDEX IF NOT EXISTS ix_matriculas_asignatura ON matriculas (asignatura, grupo);
+CREATE INDEX IF NOT EXISTS ix_matriculas_alumno ON matriculas (alumno);
+
+CREATE TABLE IF NOT EXISTS profesores (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    nombre TEXT, apellidos TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_profesores_clave ON profesores (clave);
+
+CREATE TABLE IF NOT EXISTS aulas (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    capacidad INTEGER, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_aulas_clave ON aulas (clave);
+
+CREATE TABLE IF NOT EXISTS asignaturas (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    semestre TEXT, curso TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_asignaturas_clave ON asignaturas (clave);
+CREATE INDEX IF NOT EXISTS ix_asignaturas_semestre ON asignaturas (semestre);
+
+CREATE TABLE IF NOT EXISTS grupos (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    curso TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_grupos_clave ON grupos (clave);
+
+CREATE TABLE IF NOT EXISTS horarios (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    semestre TEXT, asignatura TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_horarios_asignatura ON horarios (semestre, asignatura);
+
+CREATE TABLE IF NOT EXISTS horarios_celdas (semestre TEXT, asignatura TEXT, franja TEXT, dia TEXT, grupo TEXT);
+CREATE INDEX IF NOT EXISTS ix_horarios_celdas_asignatura ON horarios_celdas (semestre, asignatura);
+CREATE INDEX IF NOT EXISTS ix_horarios_celdas_franja ON horarios_celdas (dia, franja);
+
+CREATE TABLE IF NOT EXISTS calendario_dias (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    semestre TEXT, fecha TEXT, dia_real TEXT, horario_asignado TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_calendario_dias_fecha ON calendario_dias (fecha);
+
+CREATE TABLE IF NOT EXISTS resultados_grupos (orden INTEGER PRIMARY KEY, contenedor TEXT, clave TEXT,
+    semestre TEXT, asignatura TEXT, label TEXT, profesor_id TEXT, aula TEXT, datos TEXT);
+CREATE INDEX IF NOT EXISTS ix_resultados_grupos_asignatura ON resultados_grupos (semestre, asignatura);
+CREATE INDEX IF NOT EXISTS ix_resultados_grupos_profesor ON resultados_grupos (profesor_id);
+CREATE INDEX IF NOT EXISTS ix_resultados_grupos_aula ON resultados_grupos (aula);
+"""
+
+
+def es_ruta_sqlite(path: Path) -> bool:
+    """True si la ruta de configuración corresponde al almacén SQLite (por su extensión)"""
+    return Path(path).suffix.lower() in EXTENSIONES_SQLITE
+
+
+def _json(valor: Any) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _huella(texto: str) -> str:
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+# ========= DESCOMPOSICIÓN EN REGISTROS =========
+def _contenedores(nombre: str, seccion: Dict) -> Iterator[Tuple[Tuple[str, ...], Dict]]:
+    """
+    Diccionarios de registros de una sección: (ruta desde la raíz de la sección, contenedor).
+
+    Cada entrada de un contenedor (clave -> registro) se guarda como una fila.
+    """
+    datos = seccion.get("datos")
+    if nombre in ("configuracion/alumnos", "configuracion/profesores", "configuracion/aulas",
+                  "configuracion/asignaturas", "configuracion/grupos"):
+        if isinstance(datos, dict):
+            yield ("datos",), datos
+    elif nombre == "configuracion/horarios":
+        if isinstance(datos, dict):
+            for semestre, asignaturas in datos.items():
+                if isinstance(asignaturas, dict):
+                    yield ("datos", semestre), asignaturas
+    elif nombre == "configuracion/calendario":
+        if isinstance(datos, dict):
+            for clave, dias in datos.items():
+                if clave.startswith("semestre_") and isinstance(dias, dict):
+                    yield ("datos", clave), dias
+    elif nombre == SECCION_RESULTADOS:
+        for semestre, asignaturas in seccion.items():
+            if semestre.startswith("semestre_") and isinstance(asignaturas, dict):
+                for asignatura, contenido in asignaturas.items():
+                    if isinstance(contenido, dict) and isinstance(contenido.get("grupos"), dict):
+                        yield (semestre, asignatura, "grupos"), contenido["grupos"]
+
+
+def _columnas(nombre: str, ruta: Tuple[str, ...], clave: str, registro: Any) -> Tuple:
+    """Valores de las columnas indexadas de un registro (en el orden de TABLAS_SECCIONES)"""
+    r = registro if isinstance(registro, dict) else {}
+    if nombre == "configuracion/alumnos":
+        return r.get("dni"), r.get("email")
+    if nombre == "configuracion/profesores":
+        return r.get("nombre"), r.get("apellidos")
+    if nombre == "configuracion/aulas":
+        return (r.get("capacidad"),)
+    if nombre == "configuracion/asignaturas":
+        return r.get("semestre"), r.get("curso")
+    if nombre == "configuracion/grupos":
+        return (r.get("curso"),)
+    if nombre == "configuracion/horarios":
+        return ruta[1], clave
+    if nombre == "configuracion/calendario":
+        return ruta[1], r.get("fecha", clave), r.get("dia_real"), r.get("horario_asignado")
+    if nombre == SECCION_RESULTADOS:
+        return ruta[0], ruta[1], clave, r.get("profesor_id"), r.get("aula")
+    return ()
+
+
+def _derivadas(nombre: str, ruta: Tuple[str, ...], clave: str, registro: Any) -> Iterator[Tuple]:
+    """Filas de la tabla derivada de un registro (matrículas de un alumno, celdas de un horario)"""
+    if not isinstance(registro, dict):
+        return
+    if nombre == "configuracion/alumnos":
+        for asignatura, matricula in (registro.get("asignaturas_matriculadas") or {}).items():
+            m = matricula if isinstance(matricula, dict) else {}
+            yield (clave, asignatura, m.get("grupo"), int(bool(m.get("matriculado"))),
+                   int(bool(m.get("lab_aprobado"))))
+    elif nombre == "configuracion/horarios":
+        for franja, dias in (registro.get("horarios_grid") or {}).items():
+            for dia, celda in (dias or {}).items():
+                grupos = celda.get("grupos", []) if isinstance(celda, dict) else celda
+                for grupo in grupos if isinstance(grupos, list) else []:
+                    yield ruta[1], clave, franja, dia, grupo
+
+
+def _cabecera(seccion: Any, rutas: Iterable[Tuple[str, ...]]) -> Any:
+    """Copia de la sección con los contenedores de registros vacíos (solo copia el camino hasta ellos)"""
+    cabecera = dict(seccion)
+    for ruta in rutas:
+        nodo = cabecera
+        for clave in ruta[:-1]:
+            nodo[clave] = dict(nodo[clave])
+            nodo = nodo[clave]
+        nodo[ruta[-1]] = {}
+    return cabecera
+
+
+# ========= ALMACÉN =========
+class AlmacenSQLite:
+    """
+    Configuración completa de OPTIM guardada por secciones en una base de datos SQLite.
+
+    Secciones: cada clave de primer nivel del documento ("metadata", "resultados_organizacion", ...)
+    y cada sección de 'configuracion' ("configuracion/alumnos", ...). guardar() solo reescribe
+    las secciones cuya huella cambió (o las indicadas), cada una en su propia transacción.
+
+    Uso:
+        with AlmacenSQLite(ruta) as almacen:
+            cfg = almacen.cargar()
+            almacen.guardar(cfg, secciones=["configuracion/profesores"])
+
+    Attributes:
+        ruta: Archivo de la base de datos (se crea si no existe)
+        conexion: Conexión sqlite3 abierta
+    """
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.conexion = sqlite3.connect(str(self.ruta))
+        self.conexion.executescript(ESQUEMA)
+        with self.conexion:
+            self.conexion.execute("INSERT OR IGNORE INTO info VALUES ('version_esquema', ?)",
+                                  (str(VERSION_ESQUEMA),))
+
+    def __enter__(self) -> "AlmacenSQLite":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+    def cerrar(self) -> None:
+        """Cerrar la conexión"""
+        self.conexion.close()
+
+    # ========= LECTURA =========
+    def cargar(self) -> Dict[str, Any]:
+        """
+        Reconstruir el documento completo (mismo formato y orden que configuracion_labs.json).
+
+        Returns:
+            Configuración completa ({} si la base de datos está vacía)
+        """
+        documento: Dict[str, Any] = {}
+        filas = self.conexion.execute("SELECT nombre, cabecera FROM secciones ORDER BY orden").fetchall()
+        for nombre, cabecera in filas:
+            seccion = json.loads(cabecera)
+            if nombre in TABLAS_SECCIONES:
+                self._rellenar(nombre, seccion)
+
+            padre, _, hija = nombre.partition(SEPARADOR_SECCION)
+            if hija:
+                documento.setdefault(padre, {})[hija] = seccion
+            else:
+                documento[nombre] = seccion
+        return documento
+
+    def _rellenar(self, nombre: str, seccion: Dict) -> None:
+        """Volver a poner los registros de la tabla de la sección en sus contenedores, en orden"""
+        tabla, _ = TABLAS_SECCIONES[nombre]
+        contenedores: Dict[str, Dict] = {}
+        for contenedor, clave, datos in self.conexion.execute(
+                f"SELECT contenedor, clave, datos FROM {tabla} ORDER BY orden"):
+            destino = contenedores.get(contenedor)
+            if destino is None:
+                destino = seccion
+                for parte in json.loads(contenedor):
+                    destino = destino[parte]
+                contenedores[contenedor] = destino
+            destino[clave] = json.loads(datos)
+
+    def huellas(self) -> Dict[str, str]:
+        """Huella guardada de cada sección"""
+        return dict(self.conexion.execute("SELECT nombre, huella FROM secciones"))
+
+    # ========= ESCRITURA =========
+    @staticmethod
+    def secciones_documento(cfg: Dict) -> List[Tuple[str, Any]]:
+        """Secciones de un documento en su orden: (nombre, contenido)"""
+        secciones: List[Tuple[str, Any]] = []
+        for clave, valor in cfg.items():
+            if clave == SECCION_CONFIGURACION and isinstance(valor, dict) and valor:
+                secciones.extend((f"{clave}{SEPARADOR_SECCION}{hija}", contenido) for hija, contenido in valor.items())
+            else:
+                secciones.append((clave, valor))
+        return secciones
+
+    def guardar(self, cfg: Dict, secciones: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Guardar un documento completo reescribiendo solo lo necesario.
+
+        Args:
+            cfg: Configuración completa
+            secciones: Secciones que se sabe que han cambiado (None = comparar las huellas de todas,
+                lo que obliga a serializar cada sección para calcularla)
+
+        Returns:
+            Nombres de las secciones reescritas
+        """
+        actuales = self.secciones_documento(cfg)
+        guardadas = self.huellas()
+        forzadas = set(secciones) if secciones is not None else None
+        reescritas: List[str] = []
+
+        for orden, (nombre, contenido) in enumerate(actuales):
+            if forzadas is not None and nombre not in forzadas and nombre in guardadas:
+                continue
+            if self._guardar_seccion(nombre, contenido, orden, guardadas.get(nombre)):
+                reescritas.append(nombre)
+
+        # Orden de las secciones y secciones que ya no existen
+        with self.conexion:
+            self.conexion.executemany("UPDATE secciones SET orden = ? WHERE nombre = ?",
+                                      [(orden, nombre) for orden, (nombre, _) in enumerate(actuales)])
+            for nombre in set(guardadas) - {nombre for nombre, _ in actuales}:
+                self._borrar_registros(nombre)
+                self.conexion.execute("DELETE FROM secciones WHERE nombre = ?", (nombre,))
+        return reescritas
+
+    def guardar_seccion(self, nombre: str, contenido: Any) -> bool:
+        """
+        Guardar una sola sección (ej: "configuracion/alumnos") en su propia transacción.
+
+        Returns:
+            True si se reescribió (False si no había cambiado)
+        """
+        fila = self.conexion.execute("SELECT orden, huella FROM secciones WHERE nombre = ?", (nombre,)).fetchone()
+        if fila is None:
+            orden = self.conexion.execute("SELECT COALESCE(MAX(orden) + 1, 0) FROM secciones").fetchone()[0]
+            return self._guardar_seccion(nombre, contenido, orden, None)
+        return self._guardar_seccion(nombre, contenido, fila[0], fila[1])
+
+    def _guardar_seccion(self, nombre: str, contenido: Any, orden: int, huella_anterior: Optional[str]) -> bool:
+        """Reescribir la sección si su huella cambió: cabecera, registros y derivadas en una transacción"""
+        texto = _json(contenido)
+        huella = _huella(texto)
+        if huella == huella_anterior:
+            return False
+
+        if nombre not in TABLAS_SECCIONES or not isinstance(contenido, dict):
+            with self.conexion:
+                self._borrar_registros(nombre)
+                self._escribir_cabecera(nombre, orden, huella, texto)
+            return True
+
+        tabla, columnas = TABLAS_SECCIONES[nombre]
+        rutas: List[Tuple[str, ...]] = []
+        filas: List[Tuple] = []
+        derivadas: List[Tuple] = []
+        for ruta, registros in _contenedores(nombre, contenido):
+            rutas.append(ruta)
+            contenedor = _json(list(ruta))
+            for clave, registro in registros.items():
+                filas.append((len(filas), contenedor, clave, *_columnas(nombre, ruta, clave, registro),
+                              _json(registro)))
+                derivadas.extend(_derivadas(nombre, ruta, clave, registro))
+
+        marcadores = ", ".join("?" * (len(columnas) + 4))
+        with self.conexion:
+            self._borrar_registros(nombre)
+            self.conexion.executemany(
+                f"INSERT INTO {tabla} (orden, contenedor, clave, {', '.join(columnas)}, datos) VALUES ({marcadores})",
+                filas)
+            if nombre in TABLAS_DERIVADAS:
+                tabla_derivada, columnas_derivadas = TABLAS_DERIVADAS[nombre]
+                self.conexion.executemany(
+                    f"INSERT INTO {tabla_derivada} VALUES ({', '.join('?' * len(columnas_derivadas))})",
+                    derivadas)
+            self._escribir_cabecera(nombre, orden, huella, _json(_cabecera(contenido, rutas)))
+        return True
+
+    def _escribir_cabecera(self, nombre: str, orden: int, huella: str, cabecera: str) -> None:
+        self.conexion.execute("INSERT OR REPLACE INTO secciones VALUES (?, ?, ?, ?)", (nombre, orden, huella, cabecera))
+
+    def _borrar_registros(self, nombre: str) -> None:
+        if nombre in TABLAS_SECCIONES:
+            self.conexion.execute(f"DELETE FROM {TABLAS_SECCIONES[nombre][0]}")
+        if nombre in TABLAS_DERIVADAS:
+            self.conexion.execute(f"DELETE FROM {TABLAS_DERIVADAS[nombre][0]}")
+
+    # ========= INTERCAMBIO JSON =========
+    def importar_json(self, path: Path) -> List[str]:
+        """Guardar en el almacén un configuracion_labs.json (solo se reescribe lo que cambió)"""
+        with Path(path).open("r", encoding="utf-8") as fh:
+            cfg = json.load(fh)
+        # Los resultados guardados aparte (archivo_resultados) se traen al almacén
+        if es_puntero(cfg.get(SECCION_RESULTADOS)):
+            cfg[SECCION_RESULTADOS] = cargar_resultados(cfg, Path(path))
+        return self.guardar(cfg)
+
+    def exportar_json(self, path: Path) -> None:
+        """Escribir el documento completo como configuracion_labs.json"""
+        guardar_configuracion_atomica(self.cargar(), Path(path))
+
+
+# ========= CLI =========
+def main(argv: Optional[List[str]] = None) -> int:
+    """Convertir entre configuracion_labs.json y el almacén SQLite"""
+    parser = argparse.ArgumentParser(prog="almacen_sqlite",
+                                     description="OPTIM - Conversión entre configuracion_labs.json y SQLite")
+    parser.add_argument("accion", choices=("importar", "exportar"),
+                        help="importar: JSON -> base de datos; exportar: base de datos -> JSON")
+    parser.add_argument("origen", type=Path)
+    parser.add_argument("destino", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.accion == "importar":
+        with AlmacenSQLite(args.destino) as almacen:
+            reescritas = almacen.importar_json(args.origen)
+        print(f"✓ {args.origen} -> {args.destino} ({len(reescritas)} secciones escritas)")
+    else:
+        with AlmacenSQLite(args.origen) as almacen:
+            almacen.exportar_json(args.destino)
+        print(f"✓ {args.origen} -> {args.destino}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
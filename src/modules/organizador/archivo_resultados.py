@@ -0,0 +1,200 @@
+"""
+Archivo de Resultados - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Guarda 'resultados_organizacion' en un archivo aparte, junto a configuracion_labs.json, en vez
+de reescribir toda la configuración (con todos los alumnos) en cada ejecución:
+
+    configuracion_labs.json                          -> solo un puntero a los resultados
+    configuracion_labs.resultados.<sha256[:12]>.json -> resultados en JSON compacto
+
+El JSON se escribe por trozos en un temporal del mismo directorio calculando el sha256 a la vez,
+y se renombra con os.replace cuando está completo. El nombre incluye el hash, así que la
+configuración anterior sigue apuntando a su archivo hasta que se guarda la nueva: un fallo en
+cualquier punto deja siempre una pareja configuración/resultados coherente. Los archivos que ya
+no apunta nadie se borran después de guardar la configuración (podar_resultados).
+
+El puntero conserva los campos pequeños que la GUI consulta sin abrir los resultados
+(datos_disponibles, fecha_actualizacion, número de conflictos); el resto se carga bajo demanda
+con cargar_resultados, que también acepta el formato antiguo con los resultados en línea.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+from modules.organizador.reorganizacion_incremental import escribir_atomico
+
+# ========= CONSTANTES =========
+FORMATO_RESULTADOS = "json-compacto-v1"
+SUFIJO_RESULTADOS = ".resultados."
+TAMANO_BLOQUE_ESCRITURA = 1 << 16  # bytes que se acumulan antes de cada write
+PERMISOS_POR_DEFECTO = 0o644  # mkstemp crea el temporal con 0600
+
+
+# ========= PUNTERO =========
+def es_puntero(seccion: Optional[Dict]) -> bool:
+    """True si 'resultados_organizacion' apunta a un archivo aparte en vez de contener los resultados"""
+    return isinstance(seccion, dict) and "archivo" in seccion and "sha256" in seccion
+
+
+def contar_conflictos(seccion: Optional[Dict]) -> Dict[str, int]:
+    """
+    Número de conflictos por tipo, tanto de un puntero como de unos resultados completos.
+
+    Args:
+        seccion: Sección 'resultados_organizacion' (puntero o en línea)
+
+    Returns:
+        Diccionario tipo -> número de conflictos
+    """
+    if not isinstance(seccion, dict):
+        return {}
+    if es_puntero(seccion):
+        return dict(seccion.get("num_conflictos", {}))
+    return {tipo: len(lista) for tipo, lista in (seccion.get("conflictos") or {}).items()
+            if isinstance(lista, list)}
+
+
+def ruta_resultados(config_path: Path, sha256: str) -> Path:
+    """Ruta del archivo de resultados de una configuración para un contenido dado"""
+    return config_path.with_name(f"{config_path.stem}{SUFIJO_RESULTADOS}{sha256[:12]}.json")
+
+
+# ========= ESCRITURA =========
+def _permisos(ruta: Path) -> int:
+    """Permisos del archivo que se va a sustituir (o los de por defecto si no existe)"""
+    try:
+        return ruta.stat().st_mode & 0o777
+    except OSError:
+        return PERMISOS_POR_DEFECTO
+
+
+def guardar_resultados(resultados: Dict, config_path: Path) -> Dict[str, Any]:
+    """
+    Escribir los resultados junto a la configuración y devolver el puntero que la sustituye.
+
+    Args:
+        resultados: Sección 'resultados_organizacion' completa (Fase 8)
+        config_path: Ruta del configuracion_labs.json al que pertenecen
+
+    Returns:
+        Puntero para guardar en cfg["resultados_organizacion"]
+    """
+    directorio = config_path.parent
+    directorio.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(prefix=f".{config_path.stem}{SUFIJO_RESULTADOS}", suffix=".tmp",
+                                    dir=directorio)
+    h = hashlib.sha256()
+    tamano = 0
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            codificador = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+            bloque = []
+            pendiente = 0
+            for trozo in codificador.iterencode(resultados):
+                bloque.append(trozo)
+                pendiente += len(trozo)
+                if pendiente >= TAMANO_BLOQUE_ESCRITURA:
+                    datos = "".join(bloque).encode("utf-8")
+                    fh.write(datos)
+                    h.update(datos)
+                    tamano += len(datos)
+                    bloque, pendiente = [], 0
+            datos = "".join(bloque).encode("utf-8")
+            fh.write(datos)
+            h.update(datos)
+            tamano += len(datos)
+            fh.flush()
+            os.fchmod(fh.fileno(), _permisos(config_path))
+            os.fsync(fh.fileno())
+
+        sha256 = h.hexdigest()
+        destino = ruta_resultados(config_path, sha256)
+        os.replace(temporal, destino)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporal)
+        raise
+
+    return {
+        "datos_disponibles": resultados.get("datos_disponibles", False),
+        "fecha_actualizacion": resultados.get("fecha_actualizacion"),
+        "archivo": destino.name,
+        "formato": FORMATO_RESULTADOS,
+        "sha256": sha256,
+        "tamano_bytes": tamano,
+        "num_conflictos": contar_conflictos(resultados)
+    }
+
+
+def guardar_configuracion_atomica(cfg: Dict, path: Path, indent: Optional[int] = 2) -> None:
+    """
+    Guardar la configuración completa en JSON sin dejar nunca un archivo a medias.
+
+    Args:
+        cfg: Diccionario con la configuración completa
+        path: Ruta del archivo JSON
+        indent: Sangrado del JSON (None = compacto)
+    """
+    texto = json.dumps(cfg, ensure_ascii=False, indent=indent)
+    path = Path(path)
+    escribir_atomico(path, texto.encode("utf-8"), _permisos(path))
+
+
+def podar_resultados(config_path: Path, vigente: Optional[str] = None) -> int:
+    """
+    Borrar los archivos de resultados de una configuración distintos del vigente.
+
+    Llamar solo después de guardar la configuración que apunta a 'vigente'.
+
+    Args:
+        config_path: Ruta del configuracion_labs.json
+        vigente: Nombre del archivo de resultados al que apunta (None = borrar todos)
+
+    Returns:
+        Número de archivos borrados
+    """
+    borrados = 0
+    for ruta in config_path.parent.glob(f"{config_path.stem}{SUFIJO_RESULTADOS}*.json"):
+        if ruta.name != vigente:
+            with contextlib.suppress(OSError):
+                ruta.unlink()
+                borrados += 1
+    return borrados
+
+
+# ========= LECTURA =========
+def cargar_resultados(cfg: Dict, config_path: Path) -> Dict[str, Any]:
+    """
+    Resultados completos de una configuración, estén en línea o en su archivo aparte.
+
+    Args:
+        cfg: Configuración completa ya cargada
+        config_path: Ruta del configuracion_labs.json (para resolver el archivo del puntero)
+
+    Returns:
+        Sección 'resultados_organizacion' completa ({} si no hay)
+
+    Raises:
+        OSError: Si el archivo de resultados no existe o no se puede leer
+        ValueError: Si el contenido no coincide con el sha256 del puntero o no es JSON válido
+    """
+    seccion = cfg.get("resultados_organizacion") or {}
+    if not es_puntero(seccion):
+        return seccion
+
+    ruta = Path(config_path).parent / seccion["archivo"]
+    datos = ruta.read_bytes()
+    if hashlib.sha256(datos).hexdigest() != seccion["sha256"]:
+        raise ValueError(f"El archivo de resultados no coincide con la configuración: {ruta.name}")
+    return json.loads(datos.decode("utf-8"))
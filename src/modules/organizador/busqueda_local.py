@@ -0,0 +1,577 @@
+"""
+Búsqueda Local - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Mejora opcional tras la Fase 7: recocido simulado con presupuesto de tiempo sobre la
+solución de las Fases 5-7 (voraz, o por flujo en la Fase 5).
+
+Movimientos:
+    - mover: cambiar un alumno a otro grupo de la misma asignatura que acepte su código
+    - intercambiar: intercambiar dos alumnos entre grupos de la misma asignatura
+    - colocar: meter en un grupo a un alumno que quedó sin asignar
+    - profesor: reasignar el profesor de un grupo a otro elegible para su asignatura, día y franja
+    - fecha: mover una sesión de un grupo a otra fecha del mismo día de la semana, desde su semana_inicio
+
+Objetivo (menor es mejor), actualizado por deltas en cada movimiento:
+    PESO_CONFLICTO   * (choques de alumno + dobles reservas de profesor + dobles reservas de aula)
+    PESO_SIN_ASIGNAR * alumnos sin asignar
+    PESO_IMPAR       * grupos impares
+    PESO_EQUILIBRIO  * suma, en cada (asignatura, código simple), de los cuadrados de la desviación
+                       del tamaño de cada grupo respecto a la media del contexto
+    PESO_CARGA       * suma de cuadrados de los grupos de cada profesor
+    PESO_DESPLAZAMIENTO * semanas entre cada sesión y la fecha de la Fase 2 del grupo más cercana
+
+El término de equilibrio conserva el reparto de la Fase 5 (al grupo menos cargado): sin él los
+movimientos de alumnos solo verían la capacidad y desharían ese equilibrio. Con los pesos
+elegidos, arreglar dos grupos impares (-2 * PESO_IMPAR) compensa separar dos grupos iguales en
+dos alumnos (+2 * PESO_EQUILIBRIO), como hace _balancear_paridad_global, pero no abrir
+diferencias de más de cuatro. Los impares se cuentan todos (no solo los que sobran respecto al
+total del contexto): un alumno que pasa a un grupo de otro código cambia los totales de dos
+contextos y no debe poder crear así impares "inevitables" gratis.
+
+El término de desplazamiento hace lo mismo con el calendario: sin él un cambio de fecha que no
+crea choques tiene delta 0, se acepta siempre y las sesiones acaban repartidas al azar por todo
+el pool, perdiendo el reparto por letras y semanas de la Fase 2. Con él mover una sesión cuesta
+PESO_DESPLAZAMIENTO por semana y solo compensa si arregla un choque (o la acerca a su fecha
+prevista).
+
+Las restricciones de la configuración (capacidad del aula, código aceptado, profesor elegible,
+fechas no disponibles) no se penalizan: los movimientos que las incumplen no se proponen.
+Cada movimiento se aplica sobre el estado y, si no se acepta, se aplica su inverso. Al terminar
+se deshacen los movimientos aceptados después del mejor estado visto, así que el resultado
+nunca es peor que la solución de partida según este objetivo.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from typing import Dict, List, Tuple, Optional, Any, Callable, Set
+
+# ========= CONSTANTES =========
+PESO_CONFLICTO = 1000
+PESO_SIN_ASIGNAR = 100
+PESO_IMPAR = 10
+PESO_EQUILIBRIO = 2
+PESO_CARGA = 1
+PESO_DESPLAZAMIENTO = 20  # por semana
+
+TEMPERATURA_INICIAL = 20.0
+TEMPERATURA_FINAL = 0.05
+
+# Frecuencia relativa de cada tipo de movimiento
+PESOS_MOVIMIENTOS = {"mover": 35, "intercambiar": 35, "colocar": 10, "profesor": 10, "fecha": 10}
+
+# Cada cuántas iteraciones se consulta el reloj
+ITERACIONES_POR_CONSULTA_RELOJ = 256
+
+# Movimiento: (tipo, argumentos...)
+Movimiento = Tuple[Any, ...]
+
+
+# ========= BÚSQUEDA LOCAL =========
+class BusquedaLocal:
+    """
+    Recocido simulado sobre los grupos ya programados (modifica los GrupoLab en su sitio).
+
+    Attributes:
+        grupos: Grupos de laboratorio con alumnos, profesor y fechas (salida de la Fase 7)
+        matriculas: asignatura -> {alumno_id: (código, es_doble)}
+        objetivo: Valor actual de la función objetivo
+        colocados: (asignatura, alumno_id) de los alumnos sin asignar que han acabado en un grupo
+        reservas_creadas: Reservas dobles de profesor o aula que no estaban antes de la búsqueda
+                          (ver reservas_dobles)
+        contadores: Métricas de la búsqueda
+    """
+
+    def __init__(
+            self,
+            grupos: List[Any],
+            matriculas: Dict[str, Dict[str, Tuple[str, bool]]],
+            grupo_acepta: Callable[[Any, str, bool], bool],
+            profesor_elegible: Callable[[str, str, str, str], bool],
+            nombre_profesor: Callable[[str], str],
+            profesores: List[str],
+            pool_fechas: Callable[[Any], List[int]],
+            fechas_previstas: Callable[[Any], List[int]],
+            fechas_bloqueadas_prof: Dict[str, Set[int]],
+            fechas_bloqueadas_aula: Dict[str, Set[int]],
+            presupuesto_s: float,
+            iteraciones_max: Optional[int] = None,
+            semilla: int = 0
+    ):
+        """
+        Construir el estado incremental a partir de los grupos.
+
+        Args:
+            grupos: Grupos de laboratorio (GrupoLab) tras la Fase 7
+            matriculas: asignatura -> {alumno_id: (código de grupo, es_doble)}
+            grupo_acepta: Regla de la Fase 5 (grupo, código, es_doble) -> bool
+            profesor_elegible: Regla de la Fase 6 (prof_id, asignatura, dia, franja) -> bool
+            nombre_profesor: prof_id -> nombre para mostrar
+            profesores: IDs de todos los profesores configurados
+            pool_fechas: grupo -> fechas posibles (ordinales) de su semestre y día desde su semana_inicio
+            fechas_previstas: grupo -> fechas calculadas para él en la Fase 2
+            fechas_bloqueadas_prof: prof_id -> ordinales no disponibles
+            fechas_bloqueadas_aula: aula -> ordinales no disponibles
+            presupuesto_s: Tiempo de reloj máximo de la búsqueda
+            iteraciones_max: Límite de iteraciones (con él y la misma semilla el resultado es reproducible)
+            semilla: Semilla del generador aleatorio
+        """
+        self.grupos = grupos
+        self.matriculas = matriculas
+        self.grupo_acepta = grupo_acepta
+        self.profesor_elegible = profesor_elegible
+        self.nombre_profesor = nombre_profesor
+        self.profesores = list(profesores)
+        self.pool_fechas = pool_fechas
+        self.previstas: List[List[int]] = [sorted(fechas_previstas(g)) for g in grupos]
+        self.fechas_bloqueadas_prof = fechas_bloqueadas_prof
+        self.fechas_bloqueadas_aula = fechas_bloqueadas_aula
+        self.presupuesto_s = presupuesto_s
+        self.iteraciones_max = iteraciones_max
+        self.rng = random.Random(semilla)
+
+        self.contadores: Dict[str, Any] = {"iteraciones": 0, "movimientos_aceptados": 0,
+                                           "movimientos_rechazados": 0, "mejoras": 0,
+                                           "movimientos_revertidos": 0,
+                                           "objetivo_inicial": 0, "objetivo_final": 0}
+        self.colocados: Set[Tuple[str, str]] = set()
+
+        # Alumnos de cada grupo (dict: conserva el orden y permite borrar en O(1))
+        self.alumnos_grupo: List[Dict[str, bool]] = [dict.fromkeys(g.alumnos, True) for g in grupos]
+        self.grupos_asignatura: Dict[str, List[int]] = {}
+        for i, g in enumerate(grupos):
+            self.grupos_asignatura.setdefault(g.asignatura, []).append(i)
+
+        # Grupo actual de cada matrícula. Un alumno que aparezca en dos grupos de la misma
+        # asignatura (no debería ocurrir) se deja como está.
+        self.grupo_de: Dict[Tuple[str, str], int] = {}
+        repetidos: Set[Tuple[str, str]] = set()
+        for i, g in enumerate(grupos):
+            for alumno_id in g.alumnos:
+                clave = (g.asignatura, alumno_id)
+                if clave in self.grupo_de:
+                    repetidos.add(clave)
+                self.grupo_de.setdefault(clave, i)
+        for clave in repetidos:
+            del self.grupo_de[clave]
+
+        self.movibles: List[Tuple[str, str]] = [c for c in self.grupo_de if c[1] in matriculas.get(c[0], {})]
+        self.sin_asignar: List[Tuple[str, str]] = [
+            (asig, alumno_id) for asig, alumnos in matriculas.items() for alumno_id in alumnos
+            if (asig, alumno_id) not in self.grupo_de and (asig, alumno_id) not in repetidos
+        ]
+        self._sin_asignar_inicial = set(self.sin_asignar)
+        self.con_profesor: List[int] = [i for i, g in enumerate(grupos) if g.profesor_id]
+        self.con_fechas: List[int] = [i for i, g in enumerate(grupos) if g.fechas]
+
+        # Ocupación: sesiones (fecha, franja) por alumno; sesiones de grupo (asignatura, label) por
+        # profesor/aula, fecha y franja (los GrupoLab de un slot mixto comparten sesión)
+        self.sesiones_alumno: Dict[str, Dict[Tuple[int, str], int]] = {}
+        self.ocupacion_prof: Dict[Tuple[str, int, str], Dict[Tuple[str, str], int]] = {}
+        self.ocupacion_aula: Dict[Tuple[str, int, str], Dict[Tuple[str, str], int]] = {}
+        self.carga_prof: Dict[str, int] = {}
+        for g in grupos:
+            for alumno_id in g.alumnos:
+                sesiones = self.sesiones_alumno.setdefault(alumno_id, {})
+                for fecha in g.fechas:
+                    sesiones[(fecha, g.franja)] = sesiones.get((fecha, g.franja), 0) + 1
+            if g.profesor_id:
+                self.carga_prof[g.profesor_id] = self.carga_prof.get(g.profesor_id, 0) + 1
+            for fecha in g.fechas:
+                self._ocupar(g, fecha, 1)
+
+        # Paridad y equilibrio de tamaños por contexto (asignatura, código simple)
+        self.total_contexto: Dict[Tuple[str, str], int] = {}
+        self.impares_contexto: Dict[Tuple[str, str], int] = {}
+        self.cuadrados_contexto: Dict[Tuple[str, str], int] = {}
+        self.grupos_contexto: Dict[Tuple[str, str], int] = {}
+        for i, g in enumerate(grupos):
+            contexto = (g.asignatura, g.grupo_simple)
+            n = len(self.alumnos_grupo[i])
+            self.total_contexto[contexto] = self.total_contexto.get(contexto, 0) + n
+            self.impares_contexto[contexto] = self.impares_contexto.get(contexto, 0) + n % 2
+            self.cuadrados_contexto[contexto] = self.cuadrados_contexto.get(contexto, 0) + n * n
+            self.grupos_contexto[contexto] = self.grupos_contexto.get(contexto, 0) + 1
+
+        self._elegibles: Dict[Tuple[str, str, str], List[str]] = {}
+        self.objetivo = self._objetivo_completo()
+        self._reservas_iniciales = set(self.reservas_dobles())
+        self.reservas_creadas: Dict[Tuple[str, str, int, str], List[Tuple[str, str]]] = {}
+
+    # ========= EJECUCIÓN =========
+    def ejecutar(self) -> Tuple[bool, List[Any]]:
+        """
+        Ejecutar el recocido hasta agotar el presupuesto y dejar los grupos en el mejor estado visto.
+
+        Returns:
+            Tupla con:
+                - bool: True si el objetivo ha mejorado
+                - List[GrupoLab]: Los mismos grupos, modificados en su sitio
+        """
+        print("\n" + "=" * 70)
+        print("BÚSQUEDA LOCAL (RECOCIDO SIMULADO)")
+        print("=" * 70)
+
+        inicial = self.objetivo
+        self.contadores["objetivo_inicial"] = inicial
+        print(f"    Objetivo inicial: {inicial} ({len(self.sin_asignar)} alumnos sin asignar)")
+
+        tipos = list(PESOS_MOVIMIENTOS)
+        pesos = [PESOS_MOVIMIENTOS[t] for t in tipos]
+        proponer = {"mover": self._proponer_mover, "intercambiar": self._proponer_intercambiar,
+                    "colocar": self._proponer_colocar, "profesor": self._proponer_profesor,
+                    "fecha": self._proponer_fecha}
+
+        mejor = inicial
+        aceptados_desde_mejor: List[Movimiento] = []
+        inicio = time.perf_counter()
+        fraccion = 0.0
+        temperatura = TEMPERATURA_INICIAL
+        iteracion = 0
+
+        while True:
+            if self.iteraciones_max is not None:
+                if iteracion >= self.iteraciones_max:
+                    break
+                fraccion = iteracion / self.iteraciones_max
+                temperatura = TEMPERATURA_INICIAL * (TEMPERATURA_FINAL / TEMPERATURA_INICIAL) ** fraccion
+            if iteracion % ITERACIONES_POR_CONSULTA_RELOJ == 0:
+                transcurrido = time.perf_counter() - inicio
+                if transcurrido >= self.presupuesto_s:
+                    break
+                if self.iteraciones_max is None:
+                    fraccion = transcurrido / self.presupuesto_s
+                    temperatura = TEMPERATURA_INICIAL * (TEMPERATURA_FINAL / TEMPERATURA_INICIAL) ** fraccion
+            iteracion += 1
+
+            movimiento = proponer[self.rng.choices(tipos, pesos)[0]]()
+            if movimiento is None:
+                continue
+
+            delta = self._aplicar(movimiento)
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperatura):
+                self.objetivo += delta
+                self.contadores["movimientos_aceptados"] += 1
+                if self.objetivo < mejor:
+                    mejor = self.objetivo
+                    aceptados_desde_mejor.clear()
+                    self.contadores["mejoras"] += 1
+                else:
+                    aceptados_desde_mejor.append(movimiento)
+            else:
+                self._aplicar(self._inverso(movimiento))
+                self.contadores["movimientos_rechazados"] += 1
+
+        # Volver al mejor estado visto
+        for movimiento in reversed(aceptados_desde_mejor):
+            self.objetivo += self._aplicar(self._inverso(movimiento))
+        self.contadores["movimientos_revertidos"] = len(aceptados_desde_mejor)
+        self.contadores["iteraciones"] = iteracion
+        self.contadores["objetivo_final"] = self.objetivo
+
+        self._volcar_en_grupos()
+        self.reservas_creadas = {clave: sesiones for clave, sesiones in self.reservas_dobles().items()
+                                 if clave not in self._reservas_iniciales}
+
+        print(f"    ✓ Iteraciones: {iteracion} en {time.perf_counter() - inicio:.2f} s "
+              f"({self.contadores['movimientos_aceptados']} aceptadas, {self.contadores['mejoras']} mejoras)")
+        print(f"    ✓ Objetivo final: {self.objetivo} ({len(self.sin_asignar)} alumnos sin asignar, "
+              f"{len(self.colocados)} colocados)")
+        return self.objetivo < inicial, self.grupos
+
+    def _volcar_en_grupos(self) -> None:
+        """Copiar el estado final a los GrupoLab (alumnos en su orden original, fechas ordenadas)"""
+        for i, grupo in enumerate(self.grupos):
+            alumnos = list(self.alumnos_grupo[i])
+            if alumnos != grupo.alumnos:
+                grupo.alumnos = alumnos
+            grupo.fechas = sorted(grupo.fechas)
+
+        self.colocados = {clave for clave in self._sin_asignar_inicial if clave in self.grupo_de}
+
+    def reservas_dobles(self) -> Dict[Tuple[str, str, int, str], List[Tuple[str, str]]]:
+        """
+        Profesores y aulas con más de una sesión de grupo en la misma fecha y franja.
+
+        Returns:
+            ("profesor" | "aula", id, fecha, franja) -> sesiones (asignatura, label) ordenadas
+        """
+        reservas = {}
+        for tipo, ocupacion in (("profesor", self.ocupacion_prof), ("aula", self.ocupacion_aula)):
+            for (recurso, fecha, franja), sesiones in ocupacion.items():
+                if len(sesiones) > 1:
+                    reservas[(tipo, recurso, fecha, franja)] = sorted(sesiones)
+        return reservas
+
+    # ========= OBJETIVO =========
+    def _objetivo_completo(self) -> int:
+        """Calcular el objetivo desde cero (solo al inicio; después se actualiza por deltas)"""
+        choques = sum(c - 1 for s in self.sesiones_alumno.values() for c in s.values() if c > 1)
+        choques += sum(len(g) - 1 for g in self.ocupacion_prof.values() if len(g) > 1)
+        choques += sum(len(g) - 1 for g in self.ocupacion_aula.values() if len(g) > 1)
+        impares = sum(self._penalizacion_paridad(c) for c in self.total_contexto)
+        desequilibrio = sum(self._penalizacion_equilibrio(c) for c in self.total_contexto)
+        carga = sum(c * c for c in self.carga_prof.values())
+        desplazamiento = sum(self._semanas_desplazada(i, fecha) for i in self.con_fechas
+                             for fecha in self.grupos[i].fechas)
+        return (PESO_CONFLICTO * choques + PESO_SIN_ASIGNAR * len(self.sin_asignar)
+                + PESO_IMPAR * impares + PESO_EQUILIBRIO * desequilibrio + PESO_CARGA * carga
+                + PESO_DESPLAZAMIENTO * desplazamiento)
+
+    def _penalizacion_paridad(self, contexto: Tuple[str, str]) -> int:
+        """Grupos impares del contexto"""
+        return self.impares_contexto[contexto]
+
+    def _penalizacion_equilibrio(self, contexto: Tuple[str, str]) -> int:
+        """
+        Suma de cuadrados de las desviaciones de tamaño respecto a la media del contexto.
+
+        Σ (n - media)² = Σ n² - T² / k; con división entera para que los deltas sean exactos
+        (se deshacen sin acumular errores de redondeo).
+        """
+        total = self.total_contexto[contexto]
+        return self.cuadrados_contexto[contexto] - total * total // self.grupos_contexto[contexto]
+
+    def _semanas_desplazada(self, indice: int, fecha: int) -> int:
+        """Semanas entre una sesión y la fecha de la Fase 2 del grupo más cercana (0 si no tiene)"""
+        previstas = self.previstas[indice]
+        if not previstas:
+            return 0
+        return min(abs(fecha - prevista) for prevista in previstas) // 7
+
+    # ========= CAMBIOS ELEMENTALES (devuelven el delta del objetivo) =========
+    @staticmethod
+    def _sumar_sesion(sesiones: Dict[Tuple[int, str], int], clave: Tuple[int, str], incremento: int) -> int:
+        """Sumar una sesión de un alumno y devolver la variación de choques"""
+        antes = sesiones.get(clave, 0)
+        despues = antes + incremento
+        if despues:
+            sesiones[clave] = despues
+        else:
+            del sesiones[clave]
+        return max(0, despues - 1) - max(0, antes - 1)
+
+    @staticmethod
+    def _sumar_sesion_grupo(indice: Dict, clave: Tuple, sesion: Tuple[str, str], incremento: int) -> int:
+        """Sumar una sesión de grupo a un profesor/aula y devolver la variación de dobles reservas"""
+        sesiones = indice.setdefault(clave, {})
+        antes = len(sesiones)
+        cuenta = sesiones.get(sesion, 0) + incremento
+        if cuenta:
+            sesiones[sesion] = cuenta
+        else:
+            del sesiones[sesion]
+        despues = len(sesiones)
+        if not sesiones:
+            del indice[clave]
+        return max(0, despues - 1) - max(0, antes - 1)
+
+    def _ocupar(self, grupo: Any, fecha: int, incremento: int) -> int:
+        """Ocupar (o liberar) profesor y aula del grupo en una fecha; devuelve la variación de choques"""
+        choques = 0
+        sesion = (grupo.asignatura, grupo.label)
+        if grupo.profesor_id:
+            choques += self._sumar_sesion_grupo(self.ocupacion_prof, (grupo.profesor_id, fecha, grupo.franja),
+                                                sesion, incremento)
+        if grupo.aula and grupo.aula != "—":
+            choques += self._sumar_sesion_grupo(self.ocupacion_aula, (grupo.aula, fecha, grupo.franja),
+                                                sesion, incremento)
+        return choques
+
+    def _cambiar_miembro(self, asignatura: str, alumno_id: str, indice: int, entra: bool) -> int:
+        """Meter o sacar un alumno de un grupo"""
+        grupo = self.grupos[indice]
+        if entra:
+            self.alumnos_grupo[indice][alumno_id] = True
+            self.grupo_de[(asignatura, alumno_id)] = indice
+        else:
+            del self.alumnos_grupo[indice][alumno_id]
+            del self.grupo_de[(asignatura, alumno_id)]
+        incremento = 1 if entra else -1
+
+        sesiones = self.sesiones_alumno.setdefault(alumno_id, {})
+        choques = sum(self._sumar_sesion(sesiones, (fecha, grupo.franja), incremento) for fecha in grupo.fechas)
+
+        # Cualquier cambio de tamaño invierte la paridad del grupo y cambia el equilibrio del contexto
+        contexto = (grupo.asignatura, grupo.grupo_simple)
+        paridad_antes = self._penalizacion_paridad(contexto)
+        equilibrio_antes = self._penalizacion_equilibrio(contexto)
+        n = len(self.alumnos_grupo[indice])
+        self.total_contexto[contexto] += incremento
+        self.impares_contexto[contexto] += 1 if n % 2 else -1
+        self.cuadrados_contexto[contexto] += n * n - (n - incremento) ** 2
+        return (PESO_CONFLICTO * choques
+                + PESO_IMPAR * (self._penalizacion_paridad(contexto) - paridad_antes)
+                + PESO_EQUILIBRIO * (self._penalizacion_equilibrio(contexto) - equilibrio_antes))
+
+    def _cambiar_profesor(self, indice: int, nuevo: str) -> int:
+        """Sustituir el profesor de un grupo"""
+        grupo = self.grupos[indice]
+        anterior = grupo.profesor_id
+        sesion = (grupo.asignatura, grupo.label)
+        choques = 0
+        for fecha in grupo.fechas:
+            choques += self._sumar_sesion_grupo(self.ocupacion_prof, (anterior, fecha, grupo.franja), sesion, -1)
+            choques += self._sumar_sesion_grupo(self.ocupacion_prof, (nuevo, fecha, grupo.franja), sesion, 1)
+
+        carga_anterior = self.carga_prof[anterior]
+        carga_nuevo = self.carga_prof.get(nuevo, 0)
+        self.carga_prof[anterior] = carga_anterior - 1
+        self.carga_prof[nuevo] = carga_nuevo + 1
+        delta_carga = (1 - 2 * carga_anterior) + (2 * carga_nuevo + 1)
+
+        grupo.profesor_id = nuevo
+        grupo.profesor = self.nombre_profesor(nuevo)
+        return PESO_CONFLICTO * choques + PESO_CARGA * delta_carga
+
+    def _cambiar_fecha(self, indice: int, posicion: int, nueva: int) -> int:
+        """Mover una sesión del grupo a otra fecha"""
+        grupo = self.grupos[indice]
+        anterior = grupo.fechas[posicion]
+        choques = self._ocupar(grupo, anterior, -1) + self._ocupar(grupo, nueva, 1)
+        for alumno_id in self.alumnos_grupo[indice]:
+            sesiones = self.sesiones_alumno[alumno_id]
+            choques += self._sumar_sesion(sesiones, (anterior, grupo.franja), -1)
+            choques += self._sumar_sesion(sesiones, (nueva, grupo.franja), 1)
+        grupo.fechas[posicion] = nueva
+        return (PESO_CONFLICTO * choques
+                + PESO_DESPLAZAMIENTO * (self._semanas_desplazada(indice, nueva)
+                                         - self._semanas_desplazada(indice, anterior)))
+
+    # ========= MOVIMIENTOS =========
+    def _aplicar(self, movimiento: Movimiento) -> int:
+        """Aplicar un movimiento y devolver el delta del objetivo"""
+        tipo = movimiento[0]
+        if tipo == "mover":
+            _, asig, alumno_id, origen, destino = movimiento
+            return (self._cambiar_miembro(asig, alumno_id, origen, False)
+                    + self._cambiar_miembro(asig, alumno_id, destino, True))
+        if tipo == "intercambiar":
+            _, asig, alumno_a, grupo_a, alumno_b, grupo_b = movimiento
+            return (self._cambiar_miembro(asig, alumno_a, grupo_a, False)
+                    + self._cambiar_miembro(asig, alumno_b, grupo_b, False)
+                    + self._cambiar_miembro(asig, alumno_a, grupo_b, True)
+                    + self._cambiar_miembro(asig, alumno_b, grupo_a, True))
+        if tipo == "colocar":
+            _, asig, alumno_id, destino = movimiento
+            self.sin_asignar.remove((asig, alumno_id))
+            return self._cambiar_miembro(asig, alumno_id, destino, True) - PESO_SIN_ASIGNAR
+        if tipo == "descolocar":
+            _, asig, alumno_id, origen = movimiento
+            self.sin_asignar.append((asig, alumno_id))
+            return self._cambiar_miembro(asig, alumno_id, origen, False) + PESO_SIN_ASIGNAR
+        if tipo == "profesor":
+            _, indice, _, nuevo = movimiento
+            return self._cambiar_profesor(indice, nuevo)
+        # "fecha"
+        _, indice, posicion, _, nueva = movimiento
+        return self._cambiar_fecha(indice, posicion, nueva)
+
+    @staticmethod
+    def _inverso(movimiento: Movimiento) -> Movimiento:
+        """Movimiento que deshace otro"""
+        tipo = movimiento[0]
+        if tipo == "mover":
+            _, asig, alumno_id, origen, destino = movimiento
+            return "mover", asig, alumno_id, destino, origen
+        if tipo == "intercambiar":
+            _, asig, alumno_a, grupo_a, alumno_b, grupo_b = movimiento
+            return "intercambiar", asig, alumno_a, grupo_b, alumno_b, grupo_a
+        if tipo == "colocar":
+            return ("descolocar",) + movimiento[1:]
+        if tipo == "descolocar":
+            return ("colocar",) + movimiento[1:]
+        if tipo == "profesor":
+            _, indice, anterior, nuevo = movimiento
+            return "profesor", indice, nuevo, anterior
+        _, indice, posicion, anterior, nueva = movimiento
+        return "fecha", indice, posicion, nueva, anterior
+
+    def _tiene_plaza(self, indice: int) -> bool:
+        return len(self.alumnos_grupo[indice]) < self.grupos[indice].capacidad
+
+    def _proponer_mover(self) -> Optional[Movimiento]:
+        """Alumno asignado -> otro grupo compatible con plaza"""
+        if not self.movibles:
+            return None
+        asig, alumno_id = self.rng.choice(self.movibles)
+        origen = self.grupo_de[(asig, alumno_id)]
+        codigo, es_doble = self.matriculas[asig][alumno_id]
+        destinos = [i for i in self.grupos_asignatura[asig]
+                    if i != origen and self._tiene_plaza(i) and self.grupo_acepta(self.grupos[i], codigo, es_doble)]
+        if not destinos:
+            return None
+        return "mover", asig, alumno_id, origen, self.rng.choice(destinos)
+
+    def _proponer_intercambiar(self) -> Optional[Movimiento]:
+        """Dos alumnos de la misma asignatura en grupos distintos que aceptan el código del otro"""
+        if not self.movibles:
+            return None
+        asig, alumno_a = self.rng.choice(self.movibles)
+        grupo_a = self.grupo_de[(asig, alumno_a)]
+        codigo_a, doble_a = self.matriculas[asig][alumno_a]
+        destinos = [i for i in self.grupos_asignatura[asig]
+                    if i != grupo_a and self.alumnos_grupo[i]
+                    and self.grupo_acepta(self.grupos[i], codigo_a, doble_a)]
+        if not destinos:
+            return None
+        grupo_b = self.rng.choice(destinos)
+        alumno_b = self.rng.choice(list(self.alumnos_grupo[grupo_b]))
+        datos_b = self.matriculas[asig].get(alumno_b)
+        if (datos_b is None or self.grupo_de.get((asig, alumno_b)) != grupo_b
+                or not self.grupo_acepta(self.grupos[grupo_a], *datos_b)):
+            return None
+        return "intercambiar", asig, alumno_a, grupo_a, alumno_b, grupo_b
+
+    def _proponer_colocar(self) -> Optional[Movimiento]:
+        """Alumno sin asignar -> grupo compatible con plaza"""
+        if not self.sin_asignar:
+            return None
+        asig, alumno_id = self.rng.choice(self.sin_asignar)
+        codigo, es_doble = self.matriculas[asig][alumno_id]
+        destinos = [i for i in self.grupos_asignatura.get(asig, [])
+                    if self._tiene_plaza(i) and self.grupo_acepta(self.grupos[i], codigo, es_doble)]
+        if not destinos:
+            return None
+        return "colocar", asig, alumno_id, self.rng.choice(destinos)
+
+    def _proponer_profesor(self) -> Optional[Movimiento]:
+        """Grupo con profesor -> otro profesor elegible y sin fechas bloqueadas en sus sesiones"""
+        if not self.con_profesor:
+            return None
+        indice = self.rng.choice(self.con_profesor)
+        grupo = self.grupos[indice]
+        clave = (grupo.asignatura, grupo.dia, grupo.franja)
+        if clave not in self._elegibles:
+            self._elegibles[clave] = [p for p in self.profesores if self.profesor_elegible(p, *clave)]
+        candidatos = [p for p in self._elegibles[clave] if p != grupo.profesor_id]
+        if not candidatos:
+            return None
+        nuevo = self.rng.choice(candidatos)
+        bloqueadas = self.fechas_bloqueadas_prof.get(nuevo, ())
+        if any(fecha in bloqueadas for fecha in grupo.fechas):
+            return None
+        return "profesor", indice, grupo.profesor_id, nuevo
+
+    def _proponer_fecha(self) -> Optional[Movimiento]:
+        """Sesión de un grupo -> otra fecha del pool no usada por el grupo ni bloqueada"""
+        if not self.con_fechas:
+            return None
+        indice = self.rng.choice(self.con_fechas)
+        grupo = self.grupos[indice]
+        pool = self.pool_fechas(grupo)
+        if not pool:
+            return None
+        nueva = self.rng.choice(pool)
+        if (nueva in grupo.fechas
+                or (grupo.profesor_id and nueva in self.fechas_bloqueadas_prof.get(grupo.profesor_id, ()))
+                or nueva in self.fechas_bloqueadas_aula.get(grupo.aula, ())):
+            return None
+        posicion = self.rng.randrange(len(grupo.fechas))
+        return "fecha", indice, posicion, grupo.fechas[posicion], nueva
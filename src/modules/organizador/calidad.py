@@ -0,0 +1,226 @@
+"""
+Calidad del Horario - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Mide en una sola pasada sobre los grupos finales (y las listas de conflictos) lo bueno que es un
+horario, para comparar ejecuciones entre sí:
+
+    - violaciones duras por tipo (conflictos de las fases y reservas dobles en los grupos)
+    - alumnos sin asignar por asignatura
+    - varianza del tamaño de los grupos de cada (asignatura, código simple)
+    - grupos con número impar de alumnos
+    - carga de los profesores (mínimo, máximo, media y desviación típica)
+    - ocupación de las aulas (plazas ocupadas / plazas ofrecidas en todas las sesiones)
+    - sesiones que la Fase 7 movió de la fecha calculada en la Fase 2
+
+La puntuación (menor es mejor) combina los criterios con PESOS_PUNTUACION y es la que usa el
+multiarranque para elegir la mejor ejecución.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Tuple, Optional, Any, Iterable, Set
+
+# ========= CONSTANTES =========
+# Pesos de la puntuación (menor es mejor): un alumno sin asignar pesa más que una violación dura,
+# esta más que un grupo impar y este más que un grupo de diferencia entre el profesor más cargado
+# y el menos cargado
+PESOS_PUNTUACION = {"alumnos_sin_asignar": 1000, "conflictos_sin_resolver": 100,
+                    "grupos_impares": 10, "dispersion_carga": 1}
+
+# Tipos de violación dura
+VIOLACION_SIN_ASIGNAR = "alumno_sin_asignar"
+VIOLACION_SIN_PROFESOR = "grupo_sin_profesor"
+VIOLACION_SIN_FECHAS = "grupo_sin_fechas"
+VIOLACION_SESION_SIN_RESOLVER = "sesion_sin_resolver"
+VIOLACION_SIN_AULA = "sin_aula"
+VIOLACION_CAPACIDAD = "capacidad_superada"
+VIOLACION_ALUMNO_DOBLE = "alumno_doble_reserva"
+VIOLACION_PROFESOR_DOBLE = "profesor_doble_reserva"
+VIOLACION_AULA_DOBLE = "aula_doble_reserva"
+
+# Tipo de los conflictos de profesores/aulas que listan una reserva doble de los grupos (los añade
+# la búsqueda local); no se anotan desde la lista porque la pasada sobre los grupos ya los cuenta
+CONFLICTO_DOBLE_RESERVA = "DOBLE_RESERVA"
+
+
+# ========= MODELO =========
+@dataclass
+class MetricasCalidad:
+    """
+    Métricas de calidad de un horario.
+
+    Attributes:
+        violaciones: Tipo de violación dura -> número
+        sin_asignar_por_asignatura: Asignatura -> alumnos sin asignar
+        varianza_tamano_por_codigo: "asignatura:código" -> varianza del número de alumnos de sus grupos
+        grupos_impares: Grupos con número impar de alumnos
+        carga_profesores: "min", "max", "media" y "desviacion" de grupos por profesor (profesores con grupos)
+        utilizacion_aulas: Plazas ocupadas / plazas ofrecidas, sumadas sobre todas las sesiones
+        fechas_desplazadas: Sesiones cuya fecha no es la calculada en la Fase 2
+        dias_desplazados: Suma de los días que se ha movido cada sesión desplazada
+    """
+    violaciones: Dict[str, int] = field(default_factory=dict)
+    sin_asignar_por_asignatura: Dict[str, int] = field(default_factory=dict)
+    varianza_tamano_por_codigo: Dict[str, float] = field(default_factory=dict)
+    grupos_impares: int = 0
+    carga_profesores: Dict[str, float] = field(default_factory=dict)
+    utilizacion_aulas: float = 0.0
+    fechas_desplazadas: int = 0
+    dias_desplazados: int = 0
+
+    def criterios(self) -> Dict[str, int]:
+        """Valor de cada criterio de PESOS_PUNTUACION"""
+        return {
+            "alumnos_sin_asignar": sum(self.sin_asignar_por_asignatura.values()),
+            "conflictos_sin_resolver": sum(n for tipo, n in self.violaciones.items()
+                                           if tipo != VIOLACION_SIN_ASIGNAR),
+            "grupos_impares": self.grupos_impares,
+            "dispersion_carga": int(self.carga_profesores.get("max", 0) - self.carga_profesores.get("min", 0))
+        }
+
+    @property
+    def puntuacion(self) -> int:
+        """Puntuación del horario (menor es mejor)"""
+        return sum(PESOS_PUNTUACION[c] * v for c, v in self.criterios().items())
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Versión serializable a JSON (se guarda en resultados_organizacion._metadata)"""
+        return {**asdict(self), "criterios": self.criterios(), "puntuacion": self.puntuacion}
+
+
+# ========= MEDICIÓN =========
+def _tipo_conflicto_profesor(conflicto: Dict) -> str:
+    """Clasificar un conflicto de profesores de las Fases 6 y 7"""
+    if conflicto.get("profesor") == "SIN ASIGNAR":
+        return VIOLACION_SIN_PROFESOR
+    if not conflicto.get("fecha"):
+        return VIOLACION_SIN_FECHAS
+    return VIOLACION_SESION_SIN_RESOLVER
+
+
+def _estadisticas(valores: List[int]) -> Dict[str, float]:
+    """Mínimo, máximo, media y desviación típica (poblacional) de una lista de enteros"""
+    if not valores:
+        return {"min": 0, "max": 0, "media": 0.0, "desviacion": 0.0}
+    media = sum(valores) / len(valores)
+    varianza = sum((v - media) ** 2 for v in valores) / len(valores)
+    return {"min": min(valores), "max": max(valores), "media": round(media, 4),
+            "desviacion": round(math.sqrt(varianza), 4)}
+
+
+def medir_calidad(
+        grupos: Iterable[Any],
+        conflictos_alumnos: Iterable[Dict] = (),
+        conflictos_profesores: Iterable[Dict] = (),
+        conflictos_aulas: Iterable[Dict] = (),
+        mapeo_fechas: Optional[Dict[Tuple[str, str, str, str, str], List[int]]] = None
+) -> MetricasCalidad:
+    """
+    Calcular las métricas de calidad de un horario.
+
+    Los grupos se recorren una sola vez: cada sesión (fecha, franja) se anota en índices de
+    profesor y aula, y cada alumno acumula una máscara de bits de sus sesiones (como en la
+    Fase 5) para contar las reservas dobles; a la vez se acumulan los tamaños por código, las
+    cargas y las plazas. Los GrupoLab de una asignatura con el mismo label son la misma sesión
+    (slots mixtos), así que solo cuenta como reserva doble otro grupo distinto.
+
+    Args:
+        grupos: GrupoLab finales (con alumnos, profesor y fechas)
+        conflictos_alumnos: Conflictos de alumnos (Fase 5)
+        conflictos_profesores: Conflictos de profesores (Fases 6 y 7)
+        conflictos_aulas: Conflictos de aulas (Fases 3, 4 y 7)
+        mapeo_fechas: Fechas calculadas en la Fase 2 (sin él no se miden los desplazamientos)
+
+    Returns:
+        MetricasCalidad del horario
+    """
+    metricas = MetricasCalidad()
+    violaciones: Dict[str, int] = {}
+
+    def anotar(tipo: str, n: int = 1) -> None:
+        if n:
+            violaciones[tipo] = violaciones.get(tipo, 0) + n
+
+    # Conflictos registrados por las fases
+    for conflicto in conflictos_alumnos:
+        if conflicto.get("tipo") == "SIN_ASIGNAR":
+            asignatura = conflicto.get("asignatura", "")
+            metricas.sin_asignar_por_asignatura[asignatura] = (
+                metricas.sin_asignar_por_asignatura.get(asignatura, 0) + 1)
+            anotar(VIOLACION_SIN_ASIGNAR)
+        else:
+            anotar(str(conflicto.get("tipo", "alumno")).lower())
+    for conflicto in conflictos_profesores:
+        if conflicto.get("tipo") != CONFLICTO_DOBLE_RESERVA:
+            anotar(_tipo_conflicto_profesor(conflicto))
+    for conflicto in conflictos_aulas:
+        if conflicto.get("tipo") != CONFLICTO_DOBLE_RESERVA:
+            anotar(VIOLACION_SIN_AULA)
+
+    # Pasada única sobre los grupos
+    sesiones_profesor: Dict[Tuple[str, int, str], Set[Tuple[str, str]]] = {}
+    sesiones_aula: Dict[Tuple[str, int, str], Set[Tuple[str, str]]] = {}
+    bits_sesion: Dict[Tuple[int, str], int] = {}
+    mascaras_alumno: Dict[str, int] = {}
+    reservas_dobles_alumno = 0
+    tamanos: Dict[str, List[int]] = {}  # código -> [n, suma, suma de cuadrados]
+    cargas: Dict[str, int] = {}
+    plazas_ocupadas = plazas_ofrecidas = 0
+
+    for grupo in grupos:
+        n = len(grupo.alumnos)
+        if n % 2:
+            metricas.grupos_impares += 1
+        if grupo.capacidad and n > grupo.capacidad:
+            anotar(VIOLACION_CAPACIDAD)
+
+        acumulado = tamanos.setdefault(f"{grupo.asignatura}:{grupo.grupo_simple}", [0, 0, 0])
+        acumulado[0] += 1
+        acumulado[1] += n
+        acumulado[2] += n * n
+
+        if grupo.profesor_id:
+            cargas[grupo.profesor_id] = cargas.get(grupo.profesor_id, 0) + 1
+        if grupo.capacidad:
+            plazas_ocupadas += n * len(grupo.fechas)
+            plazas_ofrecidas += grupo.capacidad * len(grupo.fechas)
+
+        sesion = (grupo.asignatura, grupo.label)
+        mascara = 0
+        for fecha in grupo.fechas:
+            if grupo.profesor_id:
+                sesiones_profesor.setdefault((grupo.profesor_id, fecha, grupo.franja), set()).add(sesion)
+            if grupo.aula:
+                sesiones_aula.setdefault((grupo.aula, fecha, grupo.franja), set()).add(sesion)
+            mascara |= 1 << bits_sesion.setdefault((fecha, grupo.franja), len(bits_sesion))
+        for alumno_id in grupo.alumnos:
+            previa = mascaras_alumno.get(alumno_id, 0)
+            if previa & mascara:
+                reservas_dobles_alumno += bin(previa & mascara).count("1")
+            mascaras_alumno[alumno_id] = previa | mascara
+
+        if mapeo_fechas is not None:
+            previstas = mapeo_fechas.get((grupo.semestre, grupo.asignatura, grupo.grupo_simple,
+                                          grupo.dia, grupo.letra), [])
+            movidas_desde = sorted(set(previstas) - set(grupo.fechas))
+            movidas_a = sorted(set(grupo.fechas) - set(previstas))
+            metricas.fechas_desplazadas += len(movidas_a)
+            metricas.dias_desplazados += sum(abs(a - b) for a, b in zip(movidas_a, movidas_desde))
+
+    anotar(VIOLACION_PROFESOR_DOBLE, sum(len(s) - 1 for s in sesiones_profesor.values()))
+    anotar(VIOLACION_AULA_DOBLE, sum(len(s) - 1 for s in sesiones_aula.values()))
+    anotar(VIOLACION_ALUMNO_DOBLE, reservas_dobles_alumno)
+
+    metricas.violaciones = dict(sorted(violaciones.items()))
+    metricas.varianza_tamano_por_codigo = {
+        codigo: round(s2 / n - (s / n) ** 2, 4) for codigo, (n, s, s2) in sorted(tamanos.items())
+    }
+    metricas.carga_profesores = _estadisticas(list(cargas.values()))
+    metricas.utilizacion_aulas = round(plazas_ocupadas / plazas_ofrecidas, 4) if plazas_ofrecidas else 0.0
+    return metricas
@@ -0,0 +1,191 @@
+"""
+Flujo de Coste Mínimo - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Asignación exacta alumnos -> grupos de laboratorio como problema de flujo máximo de
+coste mínimo (caminos más cortos sucesivos con potenciales + Dijkstra), en Python puro.
+
+Red para un (asignatura, código):
+    origen -> clase             capacidad = alumnos de la clase, coste 0
+    clase  -> grupo             capacidad = alumnos de la clase, coste 0 (solo grupos compatibles)
+    grupo  -> destino (k-ésima) capacidad 1, coste = carga del grupo tras la plaza k
+
+Una "clase" agrupa a los alumnos con exactamente los mismos grupos compatibles: son
+intercambiables, así que basta con un nodo por clase y la red no crece con el número de alumnos.
+
+El coste de cada plaza crece con la carga del grupo (coste convexo), así que entre todas las
+asignaciones de tamaño máximo se elige la de cargas más equilibradas.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Tuple, Hashable
+
+INFINITO = float("inf")
+
+
+# ========= RED DE FLUJO =========
+class FlujoCosteMinimo:
+    """
+    Red de flujo con aristas residuales en listas de adyacencia.
+
+    Attributes:
+        num_nodos: Número de nodos (0..num_nodos-1)
+        grafo: Por nodo, índices de sus aristas en las listas paralelas
+        destino, capacidad, coste: Listas paralelas de aristas (la arista i^1 es la inversa de i)
+    """
+
+    def __init__(self, num_nodos: int):
+        """Crear una red vacía con num_nodos nodos."""
+        self.num_nodos = num_nodos
+        self.grafo: List[List[int]] = [[] for _ in range(num_nodos)]
+        self.destino: List[int] = []
+        self.capacidad: List[int] = []
+        self.coste: List[int] = []
+
+    def agregar_arista(self, u: int, v: int, capacidad: int, coste: int) -> int:
+        """
+        Añadir la arista u -> v y su inversa residual.
+
+        Returns:
+            Índice de la arista directa (para consultar su flujo con flujo_arista)
+        """
+        indice = len(self.destino)
+        self.grafo[u].append(indice)
+        self.destino.append(v)
+        self.capacidad.append(capacidad)
+        self.coste.append(coste)
+
+        self.grafo[v].append(indice + 1)
+        self.destino.append(u)
+        self.capacidad.append(0)
+        self.coste.append(-coste)
+        return indice
+
+    def flujo_arista(self, indice: int) -> int:
+        """Flujo que circula por una arista directa (capacidad de su inversa)"""
+        return self.capacidad[indice ^ 1]
+
+    def resolver(self, origen: int, sumidero: int) -> Tuple[int, int]:
+        """
+        Calcular el flujo máximo de coste mínimo de origen a sumidero.
+
+        Todos los costes iniciales son >= 0, así que los potenciales arrancan a 0 y Dijkstra
+        sirve desde la primera iteración. Cada iteración aumenta por un camino más corto.
+
+        Returns:
+            Tupla (flujo, coste total)
+        """
+        n = self.num_nodos
+        potencial = [0] * n
+        flujo_total = 0
+        coste_total = 0
+
+        while True:
+            distancia = [INFINITO] * n
+            arista_previa = [-1] * n
+            distancia[origen] = 0
+            cola = [(0, origen)]
+
+            while cola:
+                d, u = heapq.heappop(cola)
+                if d > distancia[u]:
+                    continue
+                for indice in self.grafo[u]:
+                    if self.capacidad[indice] <= 0:
+                        continue
+                    v = self.destino[indice]
+                    nd = d + self.coste[indice] + potencial[u] - potencial[v]
+                    if nd < distancia[v]:
+                        distancia[v] = nd
+                        arista_previa[v] = indice
+                        heapq.heappush(cola, (nd, v))
+
+            if distancia[sumidero] == INFINITO:
+                break
+
+            for v in range(n):
+                if distancia[v] < INFINITO:
+                    potencial[v] += distancia[v]
+
+            # Cuello de botella del camino y aumento
+            aumento = INFINITO
+            v = sumidero
+            while v != origen:
+                indice = arista_previa[v]
+                aumento = min(aumento, self.capacidad[indice])
+                v = self.destino[indice ^ 1]
+
+            v = sumidero
+            while v != origen:
+                indice = arista_previa[v]
+                self.capacidad[indice] -= aumento
+                self.capacidad[indice ^ 1] += aumento
+                coste_total += aumento * self.coste[indice]
+                v = self.destino[indice ^ 1]
+
+            flujo_total += aumento
+
+        return flujo_total, coste_total
+
+
+# ========= ASIGNACIÓN ALUMNOS -> GRUPOS =========
+def asignar_por_flujo(
+        candidatos: Dict[Hashable, List[int]],
+        cargas: List[int],
+        capacidades: List[int]
+) -> Dict[Hashable, int]:
+    """
+    Asignar el máximo número de alumnos a grupos con cargas lo más equilibradas posible.
+
+    Args:
+        candidatos: alumno -> índices de los grupos que puede ocupar (sin conflicto y que le aceptan)
+        cargas: Alumnos que ya tiene cada grupo
+        capacidades: Capacidad de cada grupo
+
+    Returns:
+        Diccionario alumno -> índice de grupo (los alumnos sin plaza no aparecen)
+    """
+    # Clases de alumnos intercambiables (mismos grupos compatibles), en orden de entrada
+    clases: Dict[Tuple[int, ...], List[Hashable]] = {}
+    for alumno, grupos in candidatos.items():
+        if grupos:
+            clases.setdefault(tuple(grupos), []).append(alumno)
+
+    num_alumnos = sum(len(miembros) for miembros in clases.values())
+    num_clases = len(clases)
+    num_grupos = len(cargas)
+
+    # Nodos: 0 = origen, 1..C = clases, C+1..C+G = grupos, C+G+1 = destino
+    origen = 0
+    destino = num_clases + num_grupos + 1
+    red = FlujoCosteMinimo(destino + 1)
+
+    aristas_clase: List[List[Tuple[int, int]]] = []
+    for i, (grupos, miembros) in enumerate(clases.items()):
+        red.agregar_arista(origen, 1 + i, len(miembros), 0)
+        aristas_clase.append([
+            (red.agregar_arista(1 + i, 1 + num_clases + g, len(miembros), 0), g) for g in grupos
+        ])
+
+    # Plazas libres de cada grupo con coste creciente (nunca más plazas que alumnos)
+    for g in range(num_grupos):
+        libres = min(capacidades[g] - cargas[g], num_alumnos)
+        for k in range(max(0, libres)):
+            red.agregar_arista(1 + num_clases + g, destino, 1, cargas[g] + k)
+
+    red.resolver(origen, destino)
+
+    # Repartir el flujo de cada clase entre sus alumnos, en orden de entrada
+    asignacion: Dict[Hashable, int] = {}
+    for miembros, aristas in zip(clases.values(), aristas_clase):
+        pendientes = iter(miembros)
+        for indice, g in aristas:
+            for _ in range(red.flujo_arista(indice)):
+                asignacion[next(pendientes)] = g
+
+    return asignacion
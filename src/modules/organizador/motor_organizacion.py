@@ -19,15 +19,32 @@ ESTRUCTURA DEL MOTOR:
 
 
 from __future__ import annotations
+import argparse
+import contextlib
+import heapq
+import io
 import json
+import pickle
+import random
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any, Set
+from typing import Dict, List, Tuple, Optional, Any, Set, Callable, Union
 
-from PyQt6.QtWidgets import QMessageBox, QApplication
+from modules.organizador.flujo_coste_minimo import asignar_por_flujo
+from modules.organizador.busqueda_local import BusquedaLocal
+from modules.organizador.calidad import medir_calidad, PESOS_PUNTUACION, CONFLICTO_DOBLE_RESERVA
+from modules.organizador.archivo_resultados import (guardar_resultados, guardar_configuracion_atomica,
+                                                     podar_resultados)
+from modules.organizador.almacen_sqlite import AlmacenSQLite, es_ruta_sqlite
+from modules.organizador.reorganizacion_incremental import (CacheFases, huellas_secciones, huellas_fases,
+                                                              fases_afectadas)
 
 # ========= CONSTANTES Y PATRONES =========
 # Patrones de grupos
@@ -40,6 +57,52 @@ DAY_ORDER = {
     "Jueves": 3, "Viernes": 4, "Sábado": 5, "Sabado": 5, "Domingo": 6
 }
 
+# Códigos de salida de la línea de comandos
+CODIGO_SALIDA_OK = 0
+CODIGO_SALIDA_ERROR_INESPERADO = 1
+CODIGO_SALIDA_BASE_FASE = 10  # 11 = falla Fase 1, ..., 18 = falla Fase 8
+
+# Nombres de las fases (para eventos de progreso)
+NOMBRES_FASES = {
+    1: "Carga y validación",
+    2: "Cálculo de fechas",
+    3: "Aula preferente",
+    4: "Creación de grupos",
+    5: "Asignación de alumnos",
+    6: "Asignación de profesores",
+    7: "Programación de fechas",
+    8: "Generación de resultados"
+}
+
+# Etapa opcional de búsqueda local tras la Fase 7 (clave en las métricas de MedidorFases)
+FASE_BUSQUEDA_LOCAL = "7.5"
+NOMBRE_BUSQUEDA_LOCAL = "Búsqueda local"
+
+# Multiarranque: varias ejecuciones de las Fases 5-7 con desempates aleatorios (clave en las métricas)
+FASE_MULTIARRANQUE = "5-7"
+NOMBRE_MULTIARRANQUE = "Multiarranque"
+
+# Paridad (Fase 5): por encima de este número de grupos impares en un código se empareja
+# cada impar con el más cercano en lugar de resolver el emparejamiento exacto
+MAX_IMPARES_EMPAREJAMIENTO_EXACTO = 14
+
+# Modos de asignación de alumnos (Fase 5)
+MODO_ASIGNACION_VORAZ = "voraz"  # Grupo menos cargado sin conflicto, alumno a alumno
+MODO_ASIGNACION_FLUJO = "flujo"  # Flujo máximo de coste mínimo por (asignatura, código)
+MODOS_ASIGNACION = (MODO_ASIGNACION_VORAZ, MODO_ASIGNACION_FLUJO)
+
+# Etapas de la Fase 5 en que se generan avisos y conflictos, en el orden en que se ejecutan
+ETAPA_DOBLES = 1  # 5.1, por asignatura
+ETAPA_SIMPLES = 2  # 5.2, por asignatura
+ETAPA_PARIDAD = 3  # 5.3, por (asignatura, código)
+ETAPA_CAPACIDAD = 4  # 5.4, por asignatura
+
+# Directorio de checkpoints de la línea de comandos (junto a la configuración) si no se indica otro
+DIRECTORIO_CACHE_POR_DEFECTO = "cache_motor"
+
+# Peso aproximado de cada fase en el tiempo total (suman 100, para la barra de progreso global)
+PESOS_FASES = {1: 4, 2: 4, 3: 1, 4: 4, 5: 50, 6: 8, 7: 25, 8: 4}
+
 
 # ========= MODELOS DE DATOS =========
 @dataclass
@@ -62,7 +125,7 @@ class GrupoLab:
         grupo_simple: Código del grupo simple (ej: "A404")
         grupo_doble: Código del grupo doble si aplica (ej: "EE403")
         alumnos: Lista de IDs de alumnos asignados
-        fechas: Lista de fechas programadas (formato dd/mm/yyyy)
+        fechas: Lista de fechas programadas (ordinal de día, date.toordinal(); se formatean en GeneradorOutputs)
     """
     semestre: str
     asignatura: str
@@ -78,7 +141,47 @@ class GrupoLab:
     grupo_simple: str = ""
     grupo_doble: Optional[str] = None
     alumnos: List[str] = field(default_factory=list)
-    fechas: List[str] = field(default_factory=list)
+    fechas: List[int] = field(default_factory=list)
+
+
+@dataclass
+class OpcionesMotor:
+    """
+    Opciones de una ejecución del motor.
+
+    Attributes:
+        modo_asignacion: Algoritmo de la Fase 5 para los alumnos de grado simple
+                         ("voraz" por defecto, o "flujo" para la asignación exacta por código)
+        presupuesto_busqueda_s: Segundos de búsqueda local tras la Fase 7 (0 = desactivada)
+        iteraciones_busqueda: Límite de iteraciones de la búsqueda local (reproducible con la misma semilla)
+        semilla: Semilla de la búsqueda local
+        desde_fase: Con cache, recalcular siempre desde esta fase (1-8) aunque su entrada no haya
+                    cambiado; las anteriores se reutilizan si hay checkpoint (None = solo lo que cambió)
+        procesos: Procesos para ejecutar en paralelo la Fase 5 (por componentes independientes de
+                  asignaturas) y la Fase 7 (por semestre); 1 = secuencial
+        arranques: Ejecuciones de las Fases 5-7 con desempates aleatorios (semilla + n) de las que
+                   se queda la de mejor puntuación; 1 = una sola ejecución sin perturbar
+    """
+    modo_asignacion: str = MODO_ASIGNACION_VORAZ
+    presupuesto_busqueda_s: float = 0.0
+    iteraciones_busqueda: Optional[int] = None
+    semilla: int = 2025
+    desde_fase: Optional[int] = None
+    procesos: int = 1
+    arranques: int = 1
+
+    def __post_init__(self):
+        if self.modo_asignacion not in MODOS_ASIGNACION:
+            raise ValueError(f"modo_asignacion desconocido: {self.modo_asignacion!r} "
+                             f"(válidos: {', '.join(MODOS_ASIGNACION)})")
+        if self.presupuesto_busqueda_s < 0:
+            raise ValueError(f"presupuesto_busqueda_s no puede ser negativo: {self.presupuesto_busqueda_s}")
+        if self.desde_fase is not None and self.desde_fase not in NOMBRES_FASES:
+            raise ValueError(f"desde_fase debe estar entre 1 y {len(NOMBRES_FASES)}: {self.desde_fase}")
+        if self.procesos < 1:
+            raise ValueError(f"procesos debe ser al menos 1: {self.procesos}")
+        if self.arranques < 1:
+            raise ValueError(f"arranques debe ser al menos 1: {self.arranques}")
 
 
 @dataclass
@@ -98,10 +201,213 @@ class ErrorValidacion:
     detalle: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ResultadoMotor:
+    """
+    Resultado de una ejecución completa del motor.
+
+    Attributes:
+        exito: True si las 8 fases terminaron correctamente
+        fase_fallida: Número de la fase que falló (1-8), o None si no falló ninguna
+        errores: Errores detectados durante la validación (Fase 1)
+        estadisticas: Contadores finales de la ejecución
+        resultados: Sección 'resultados_organizacion' generada en la Fase 8 (vacía si falla)
+        metricas: Tiempo, memoria y contadores de cada fase ejecutada (ver MedidorFases)
+        output_path: Ruta del archivo generado en la Fase 8 (si se llegó a guardar)
+        resultados_path: Archivo aparte con los resultados (solo con resultados_aparte)
+    """
+    exito: bool
+    fase_fallida: Optional[int] = None
+    errores: List[ErrorValidacion] = field(default_factory=list)
+    estadisticas: Dict[str, Any] = field(default_factory=dict)
+    resultados: Dict[str, Any] = field(default_factory=dict)
+    metricas: Dict[str, Any] = field(default_factory=dict)
+    output_path: Optional[Path] = None
+    resultados_path: Optional[Path] = None
+
+    @property
+    def conflictos(self) -> Dict[str, List[Dict]]:
+        """Conflictos de profesores, aulas y alumnos incluidos en los resultados"""
+        return self.resultados.get("conflictos", {"profesores": [], "aulas": [], "alumnos": []})
+
+    @property
+    def codigo_salida(self) -> int:
+        """Código de salida para la línea de comandos (0 = OK, 10 + fase si falla una fase)"""
+        if self.exito:
+            return CODIGO_SALIDA_OK
+        return CODIGO_SALIDA_BASE_FASE + (self.fase_fallida or 0)
+
+    def resumen(self) -> Dict[str, Any]:
+        """Resumen serializable a JSON (salida de la línea de comandos)"""
+        return {
+            "exito": self.exito,
+            "fase_fallida": self.fase_fallida,
+            "codigo_salida": self.codigo_salida,
+            "output_path": str(self.output_path) if self.output_path else None,
+            "resultados_path": str(self.resultados_path) if self.resultados_path else None,
+            "errores": [
+                {"fase": e.fase, "tipo": e.tipo, "mensaje": e.mensaje, "detalle": e.detalle}
+                for e in self.errores
+            ],
+            "estadisticas": self.estadisticas,
+            "metricas": self.metricas
+        }
+
+
+@dataclass
+class EventoProgreso:
+    """
+    Evento de progreso emitido por el motor durante la ejecución.
+
+    Attributes:
+        fase: Número de la fase (1-8)
+        nombre: Nombre de la fase
+        paso: Paso actual dentro de la fase
+        total: Total de pasos de la fase
+        mensaje: Descripción del paso actual
+    """
+    fase: int
+    nombre: str
+    paso: int
+    total: int
+    mensaje: str = ""
+
+    @property
+    def porcentaje(self) -> int:
+        """Porcentaje global (0-100) ponderando cada fase según PESOS_FASES"""
+        previo = sum(peso for fase, peso in PESOS_FASES.items() if fase < self.fase)
+        avance = self.paso / self.total if self.total else 1.0
+        return min(100, int(previo + PESOS_FASES.get(self.fase, 0) * avance))
+
+
+CallbackProgreso = Callable[[EventoProgreso], None]
+
+
+class NotificadorProgreso:
+    """
+    Emite los EventoProgreso de una fase hacia el callback del llamador.
+
+    Solo notifica cuando cambia el porcentaje de la fase, para no saturar la
+    GUI con miles de eventos (uno por alumno). Sin callback no hace nada.
+    """
+
+    def __init__(self, callback: Optional[CallbackProgreso] = None, fase: int = 0):
+        self.callback = callback
+        self.fase = fase
+        self.nombre = NOMBRES_FASES.get(fase, "")
+        self.paso = 0
+        self.total = 1
+        self._ultimo = -1
+
+    def iniciar(self, total: int, mensaje: str = "") -> None:
+        """Empezar (o reiniciar) la cuenta de pasos de la fase"""
+        self.paso = 0
+        self.total = max(1, total)
+        self._emitir(mensaje, forzar=True)
+
+    def avanzar(self, pasos: int = 1, mensaje: str = "") -> None:
+        """Avanzar uno o varios pasos"""
+        self.paso = min(self.total, self.paso + pasos)
+        self._emitir(mensaje)
+
+    def terminar(self, mensaje: str = "") -> None:
+        """Marcar la fase como completada"""
+        self.paso = self.total
+        self._emitir(mensaje, forzar=True)
+
+    def _emitir(self, mensaje: str, forzar: bool = False) -> None:
+        if self.callback is None:
+            return
+        actual = self.paso * 100 // self.total
+        if not forzar and actual == self._ultimo:
+            return
+        self._ultimo = actual
+        self.callback(EventoProgreso(self.fase, self.nombre, self.paso, self.total, mensaje))
+
+
+def memoria_pico_mb() -> Optional[float]:
+    """
+    Pico de memoria del proceso (RSS / working set) en MB, sin dependencias externas.
+
+    Returns:
+        MB usados como máximo hasta ahora, o None si la plataforma no lo permite
+    """
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KB, macOS en bytes
+        return round(pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024, 1)
+    except ImportError:
+        pass
+
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Contadores(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            contadores = _Contadores()
+            contadores.cb = ctypes.sizeof(_Contadores)
+            proceso = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+                return round(contadores.PeakWorkingSetSize / (1024 * 1024), 1)
+        except Exception:
+            pass
+
+    return None
+
+
+class MedidorFases:
+    """
+    Registra por fase el tiempo de reloj, el pico de memoria del proceso y los contadores de trabajo.
+
+    Se usa en producción (sin profiler): el coste es un perf_counter y una llamada al sistema por fase.
+    El pico de memoria es el del proceso acumulado hasta el final de la fase, así que la fase que lo
+    hace crecer es la que más memoria necesita.
+
+    Formato de metricas (se guarda en resultados_organizacion._metadata):
+        {"tiempo_total_s": 1.23, "fases": {"1": {"nombre", "tiempo_s", "memoria_pico_mb", "contadores"}, ...}}
+    """
+
+    def __init__(self):
+        self.fases: Dict[str, Dict[str, Any]] = {}
+        self._inicio_total = time.perf_counter()
+        self._inicio_fase = self._inicio_total
+
+    def iniciar(self, numero: Union[int, str]) -> None:
+        """Empezar a medir una fase"""
+        self._inicio_fase = time.perf_counter()
+
+    def terminar(self, numero: Union[int, str], contadores: Optional[Dict[str, int]] = None,
+                 nombre: Optional[str] = None) -> None:
+        """Cerrar la medición de una fase (haya terminado bien o no) y guardar sus contadores"""
+        self.fases[str(numero)] = {
+            "nombre": nombre if nombre is not None else NOMBRES_FASES.get(numero, ""),
+            "tiempo_s": round(time.perf_counter() - self._inicio_fase, 4),
+            "memoria_pico_mb": memoria_pico_mb(),
+            "contadores": dict(contadores or {})
+        }
+
+    def metricas(self) -> Dict[str, Any]:
+        """Métricas acumuladas hasta ahora"""
+        return {
+            "tiempo_total_s": round(time.perf_counter() - self._inicio_total, 4),
+            "fases": self.fases
+        }
+
+
 # ========= UTILIDADES GENERALES =========
 def load_configuration(path: Path) -> Dict:
     """
-    Cargar configuración desde archivo JSON.
+    Cargar configuración desde archivo JSON (o desde el almacén SQLite si la ruta es .db/.sqlite).
 
     Args:
         path: Ruta al archivo JSON
@@ -109,10 +415,33 @@ def load_configuration(path: Path) -> Dict:
     Returns:
         Diccionario con la configuración completa
     """
+    if es_ruta_sqlite(path):
+        if not path.exists():
+            raise FileNotFoundError(path)
+        with AlmacenSQLite(path) as almacen:
+            return almacen.cargar()
     with path.open("r", encoding="utf-8") as fh:
         return json.load(fh)
 
 
+def save_configuration(cfg: Dict, path: Path) -> None:
+    """
+    Guardar configuración completa en archivo JSON (temporal + renombrado, nunca a medias).
+
+    Con una ruta .db/.sqlite se guarda en el almacén SQLite, reescribiendo solo las secciones
+    que han cambiado (normalmente, resultados_organizacion).
+
+    Args:
+        cfg: Diccionario con la configuración completa
+        path: Ruta del archivo JSON
+    """
+    if es_ruta_sqlite(path):
+        with AlmacenSQLite(path) as almacen:
+            almacen.guardar(cfg)
+        return
+    guardar_configuracion_atomica(cfg, path)
+
+
 def normalize_time_range(rng: str) -> str:
     """
     Normalizar rango horario al formato HH:MM-HH:MM.
@@ -151,6 +480,58 @@ def normalizar_semestre(semestre) -> Optional[str]:
     return None
 
 
+def iso_a_ordinal(fecha: str) -> Optional[int]:
+    """Convertir fecha yyyy-mm-dd a ordinal de día (date.toordinal) o None si no es válida"""
+    m = re.match(r"^(\d{4})-(\d{2})-(\d{2})$", (fecha or "").strip())
+    if not m:
+        return None
+    try:
+        return date(*map(int, m.groups())).toordinal()
+    except ValueError:
+        return None
+
+
+def ddmmyyyy_a_ordinal(fecha: str) -> Optional[int]:
+    """Convertir fecha dd/mm/yyyy a ordinal de día (date.toordinal) o None si no es válida"""
+    m = re.match(r"^(\d{2})/(\d{2})/(\d{4})$", (fecha or "").strip())
+    if not m:
+        return None
+    d, mo, y = map(int, m.groups())
+    try:
+        return date(y, mo, d).toordinal()
+    except ValueError:
+        return None
+
+
+def ordinal_a_ddmmyyyy(ordinal: int) -> str:
+    """Formatear un ordinal de día como dd/mm/yyyy"""
+    return date.fromordinal(ordinal).strftime("%d/%m/%Y")
+
+
+def fechas_no_disponibles(datos: Dict) -> Set[int]:
+    """
+    Convertir las fechas_no_disponibles (dd/mm/yyyy) de un profesor o aula a ordinales.
+
+    Args:
+        datos: Datos del profesor o aula en la configuración
+
+    Returns:
+        Conjunto de ordinales bloqueados (se ignoran las fechas con otro formato)
+    """
+    fechas = set()
+    for f in (datos.get("fechas_no_disponibles") or []) if isinstance(datos, dict) else []:
+        ordinal = ddmmyyyy_a_ordinal(f)
+        if ordinal is not None:
+            fechas.add(ordinal)
+    return fechas
+
+
+def normalizar_dia(dia: str) -> str:
+    """Normalizar el nombre del día al formato del calendario (ej: "miercoles" -> "Miércoles")"""
+    dia_normalizado = dia.strip().capitalize()
+    return {"Miercoles": "Miércoles", "Sabado": "Sábado"}.get(dia_normalizado, dia_normalizado)
+
+
 def get_config_path() -> Path:
     """Devuelve ruta de configuracion_labs.json de forma compatible para .exe y para desarrollar"""
     if getattr(sys, "frozen", False):
@@ -163,47 +544,124 @@ def get_config_path() -> Path:
     return base_dir / "configuracion_labs.json"
 
 
-def detectar_grupos_antes_semana_inicio(cfg: Dict, grupos: List[GrupoLab]) -> List[Dict]:
+# ========= CALENDARIO =========
+class CalendarioFechas:
+    """
+    Pools de fechas del calendario construidos una vez por ejecución y compartidos entre fases.
+
+    Agrupa las entradas de calendario.datos por (clave de semestre, horario_asignado) en una
+    sola pasada y convierte cada fecha ISO a ordinal de día. El pool ordenado y la posición
+    de cada fecha se calculan la primera vez que se piden y quedan cacheados.
+
+    Attributes:
+        registros: (clave_semestre, dia) -> ordinales en el orden del calendario
+    """
+
+    def __init__(self, cfg: Dict):
+        """Recorrer calendario.datos una vez y agrupar las fechas por semestre y día."""
+        self.registros: Dict[Tuple[str, str], List[int]] = {}
+
+        self._pools: Dict[Tuple[str, str], List[int]] = {}
+        self._posiciones: Dict[Tuple[str, str], Dict[int, int]] = {}
+
+        calendario_datos = cfg.get("configuracion", {}).get("calendario", {}).get("datos", {}) or {}
+
+        for clave_semestre, semestre_datos in calendario_datos.items():
+            if not isinstance(semestre_datos, dict):
+                continue
+            for fecha_info in semestre_datos.values():
+                if isinstance(fecha_info, dict) and fecha_info.get("horario_asignado"):
+                    fecha = iso_a_ordinal(fecha_info.get("fecha", ""))
+                    if fecha is not None:
+                        clave = (clave_semestre, fecha_info.get("horario_asignado"))
+                        self.registros.setdefault(clave, []).append(fecha)
+
+    def fechas_calendario(self, clave_semestre: str, dia: str) -> List[int]:
+        """
+        Fechas de un día en el orden en que aparecen en el calendario (Fase 2).
+
+        Args:
+            clave_semestre: Clave del calendario (ej: "semestre_1")
+            dia: Día de la semana
+
+        Returns:
+            Lista cacheada de ordinales; no modificar
+        """
+        return self.registros.get((clave_semestre, normalizar_dia(dia)), [])
+
+    def pool(self, clave_semestre: str, dia: str) -> List[int]:
+        """
+        Pool ordenado cronológicamente de fechas de un día (Fase 7).
+
+        Args:
+            clave_semestre: Clave del calendario (ej: "semestre_1")
+            dia: Día de la semana
+
+        Returns:
+            Lista cacheada de ordinales; no modificar
+        """
+        clave = (clave_semestre, normalizar_dia(dia))
+        fechas = self._pools.get(clave)
+        if fechas is None:
+            fechas = sorted(self.registros.get(clave, []))
+            self._pools[clave] = fechas
+            posiciones: Dict[int, int] = {}
+            for i, fecha in enumerate(fechas):
+                posiciones.setdefault(fecha, i)
+            self._posiciones[clave] = posiciones
+        return fechas
+
+    def posicion(self, clave_semestre: str, dia: str, fecha: int) -> int:
+        """Índice de la fecha dentro de pool() o -1 si no está"""
+        self.pool(clave_semestre, dia)
+        return self._posiciones[(clave_semestre, normalizar_dia(dia))].get(fecha, -1)
+
+    def semana(self, clave_semestre: str, dia: str, fecha: int) -> Optional[int]:
+        """
+        Semana (1..N) de una fecha según su posición entre las fechas de ese día.
+
+        Args:
+            clave_semestre: Clave del calendario (ej: "semestre_1")
+            dia: Día de la semana
+            fecha: Ordinal de día
+
+        Returns:
+            Número de semana o None si la fecha no está en el calendario de ese día
+        """
+        indice = self.posicion(clave_semestre, dia, fecha)
+        return indice + 1 if indice >= 0 else None
+
+
+def semana_inicio_grupo(asignaturas_data: Dict, grupo: GrupoLab) -> Optional[int]:
+    """semana_inicio configurada para el código simple de un grupo (None si no hay)"""
+    cfg_lab = (asignaturas_data.get(grupo.asignatura, {})
+               .get("grupos_asociados", {})
+               .get(grupo.grupo_simple, {})
+               .get("configuracion_laboratorio", {}))
+    return cfg_lab.get("semana_inicio")
+
+
+def detectar_grupos_antes_semana_inicio(cfg: Dict, grupos: List[GrupoLab],
+                                        calendario: Optional[CalendarioFechas] = None) -> List[Dict]:
     """Detectar grupos cuya primera sesión es anterior a su semana_inicio."""
     alertas = []
     asignaturas_data = cfg.get("configuracion", {}).get("asignaturas", {}).get("datos", {})
-    calendario_data = cfg.get("configuracion", {}).get("calendario", {}).get("datos", {})
+    calendario = calendario or CalendarioFechas(cfg)
 
     for grupo in grupos:
         if not grupo.fechas:
             continue
 
         # Obtener semana_inicio del grupo
-        cfg_lab = (asignaturas_data.get(grupo.asignatura, {})
-                   .get("grupos_asociados", {})
-                   .get(grupo.grupo_simple, {})
-                   .get("configuracion_laboratorio", {}))
-        semana_inicio = cfg_lab.get("semana_inicio")
+        semana_inicio = semana_inicio_grupo(asignaturas_data, grupo)
         if not semana_inicio:
             continue
 
-        # Primera fecha asignada -> convertir a ISO
-        primera = grupo.fechas[0]
-        m = re.match(r"^(\d{2})/(\d{2})/(\d{4})$", primera)
-        if not m:
-            continue
-        d, mo, y = m.groups()
-        primera_iso = f"{y}-{mo}-{d}"
-
-        # Buscar semana real en calendario
+        # Buscar semana real de la primera fecha asignada en calendario
         sem_key = f"semestre_{normalizar_semestre(grupo.semestre)}"
-        sem_datos = calendario_data.get(sem_key, {})
+        semana_real = calendario.semana(sem_key, grupo.dia, grupo.fechas[0])
 
-        dia_norm = grupo.dia.strip().capitalize()
-        dia_norm = {"Miercoles": "Miércoles", "Sabado": "Sábado"}.get(dia_norm, dia_norm)
-
-        fechas_dia = sorted([
-            info.get("fecha") for info in sem_datos.values()
-            if isinstance(info, dict) and info.get("horario_asignado") == dia_norm and info.get("fecha")
-        ])
-
-        if primera_iso in fechas_dia:
-            semana_real = fechas_dia.index(primera_iso) + 1
+        if semana_real is not None:
             if semana_real < semana_inicio:
                 alertas.append({
                     "grupo": grupo.label,
@@ -222,7 +680,7 @@ class ValidadorDatos:
     Clase responsable de la FASE 1: Carga y Validación de datos.
 
     Realiza las siguientes operaciones:
-        1.1 - Carga de datos desde JSON
+        1.1 - Carga de datos desde JSON (o recepción del diccionario ya cargado)
         1.2 - Validación de asignaturas (semana_inicio, num_sesiones, grupos_lab_posibles)
         1.3 - Validación de horarios (letras usadas vs grupos_lab_posibles)
 
@@ -232,12 +690,27 @@ class ValidadorDatos:
         grupos_lab_posibles: Diccionario con el número de grupos posibles por asignatura
     """
 
-    def __init__(self, config_path: Path):
-        """ Inicializar el validador. """
+    def __init__(self, config_path: Optional[Path] = None, cfg: Optional[Dict] = None,
+                 progreso: Optional[NotificadorProgreso] = None):
+        """
+        Inicializar el validador.
+
+        Args:
+            config_path: Ruta del JSON a cargar (si no se pasa cfg)
+            cfg: Configuración ya cargada en memoria (evita leer el archivo)
+            progreso: Notificador de progreso de la fase (opcional)
+        """
         self.config_path = config_path
+        self.cfg_en_memoria = cfg
+        self.progreso = progreso or NotificadorProgreso()
         self.cfg: Dict = {}
         self.errores: List[ErrorValidacion] = []
         self.grupos_lab_posibles: Dict[Tuple[str, str, str], int] = {}  # (semestre, asignatura, grupo) -> num_grupos
+        self._carga_correcta: Optional[bool] = None
+
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"configuraciones_revisadas": 0, "grupos_horario_revisados": 0,
+                                           "franjas_revisadas": 0}
 
     def ejecutar(self) -> Tuple[bool, Dict, List[ErrorValidacion]]:
         """
@@ -254,14 +727,17 @@ class ValidadorDatos:
         print("=" * 70)
 
         # 1.1 - Cargar datos
-        if not self._cargar_datos():
+        self.progreso.iniciar(3, "Cargando datos")
+        if not self.cargar():
             return False, {}, self.errores
 
         # 1.2 - Validar asignaturas
+        self.progreso.avanzar(1, "Validando asignaturas")
         if not self._validar_asignaturas():
             return False, self.cfg, self.errores
 
         # 1.3 - Validar horarios
+        self.progreso.avanzar(1, "Validando horarios")
         if not self._validar_horarios():
             return False, self.cfg, self.errores
 
@@ -272,6 +748,19 @@ class ValidadorDatos:
         tiene_criticos = any(e.tipo == "CRITICO" for e in self.errores)
         return not tiene_criticos, self.cfg, self.errores
 
+    def cargar(self) -> bool:
+        """
+        1.1 - Cargar la configuración y verificar su estructura, una sola vez por validador.
+
+        Permite leer la configuración antes de decidir si hay que validarla (reorganización incremental).
+
+        Returns:
+            True si la carga fue exitosa, False en caso contrario
+        """
+        if self._carga_correcta is None:
+            self._carga_correcta = self._cargar_datos()
+        return self._carga_correcta
+
     def _cargar_datos(self) -> bool:
         """
         1.1 - Cargar datos desde JSON y verificar estructura básica.
@@ -282,8 +771,12 @@ class ValidadorDatos:
         print("\n[1.1] Cargando datos desde JSON...")
 
         try:
-            self.cfg = load_configuration(self.config_path)
-            print(f"  ✓ Configuración cargada: {self.config_path}")
+            if self.cfg_en_memoria is not None:
+                self.cfg = self.cfg_en_memoria
+                print(f"  ✓ Configuración recibida en memoria")
+            else:
+                self.cfg = load_configuration(self.config_path)
+                print(f"  ✓ Configuración cargada: {self.config_path}")
         except FileNotFoundError:
             self.errores.append(ErrorValidacion(
                 fase="FASE_1.1",
@@ -405,6 +898,7 @@ class ValidadorDatos:
                 num_sesiones = cfg_lab.get("num_sesiones")
 
                 num_total += 1
+                self.contadores["configuraciones_revisadas"] += 1
 
                 # Validación 1: ¿Existen los parámetros?
                 if semana_inicio is None or semana_inicio < 1:
@@ -555,11 +1049,13 @@ class ValidadorDatos:
                 # Validar cada grupo de la asignatura
                 for grupo_codigo in grupos_asociados.keys():
                     num_total += 1
+                    self.contadores["grupos_horario_revisados"] += 1
                     letras_usadas: Set[str] = set()
                     hay_grupos_asignados = False
 
                     # Recorrer horarios_grid para extraer letras y verificar asignaciones
                     for franja, dias in horarios_grid.items():
+                        self.contadores["franjas_revisadas"] += len(dias)
                         for dia, info in dias.items():
                             if not isinstance(info, dict):
                                 continue
@@ -680,15 +1176,22 @@ class CalculadorFechas:
         cfg: Configuración completa
         grupos_lab_posibles: Diccionario con número de grupos posibles por (semestre, asig, grupo)
         mapeo_fechas: Diccionario resultante con fechas por letra
+        calendario: Pools de fechas del calendario compartidos con la Fase 7
     """
 
-    def __init__(self, cfg: Dict, grupos_lab_posibles: Dict[Tuple[str, str, str], int]):
+    def __init__(self, cfg: Dict, grupos_lab_posibles: Dict[Tuple[str, str, str], int],
+                 calendario: Optional[CalendarioFechas] = None):
         """Inicializar el calculador de fechas."""
         self.cfg = cfg
         self.grupos_lab_posibles = grupos_lab_posibles
-        self.mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[str]] = {}
+        self.calendario = calendario or CalendarioFechas(cfg)
+        self.mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]] = {}
+
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"grupos_procesados": 0, "consultas_calendario": 0,
+                                           "fechas_repartidas": 0}
 
-    def ejecutar(self) -> Tuple[bool, Dict[Tuple[str, str, str, str, str], List[str]]]:
+    def ejecutar(self) -> Tuple[bool, Dict[Tuple[str, str, str, str, str], List[int]]]:
         """
         Ejecutar la FASE 2 completa.
 
@@ -710,7 +1213,7 @@ class CalculadorFechas:
 
         return True, self.mapeo_fechas
 
-    def _obtener_fechas_calendario(self, dia: str, semestre: str) -> List[str]:
+    def _obtener_fechas_calendario(self, dia: str, semestre: str) -> List[int]:
         """
         Obtener todas las fechas del calendario para un día y semestre específico.
 
@@ -719,34 +1222,14 @@ class CalculadorFechas:
             semestre: Semestre (ej: "1 Semestre", "2 Semestre")
 
         Returns:
-            Lista de fechas en formato dd/mm/yyyy ordenadas cronológicamente
+            Lista de fechas (ordinales de día) ordenadas cronológicamente
         """
-        calendario_datos = self.cfg.get("configuracion", {}).get("calendario", {}).get("datos", {})
-
         # Determinar qué clave de semestre usar
         semestre_key = "semestre_1" if "1" in semestre else "semestre_2"
-        semestre_datos = calendario_datos.get(semestre_key, {})
-
-        # Normalizar el día
-        dia_normalizado = dia.strip().capitalize()
-        reemplazos = {"Miercoles": "Miércoles", "Sabado": "Sábado"}
-        dia_normalizado = reemplazos.get(dia_normalizado, dia_normalizado)
-
-        # Extraer fechas donde horario_asignado coincida
-        fechas = []
-        for fecha_info in semestre_datos.values():
-            if isinstance(fecha_info, dict):
-                if fecha_info.get("horario_asignado") == dia_normalizado:
-                    fecha_str = fecha_info.get("fecha", "")
-                    if fecha_str:
-                        # Convertir yyyy-mm-dd a dd/mm/yyyy
-                        partes = fecha_str.split("-")
-                        if len(partes) == 3:
-                            fechas.append(f"{partes[2]}/{partes[1]}/{partes[0]}")
 
-        return fechas
+        return self.calendario.fechas_calendario(semestre_key, dia)
 
-    def _filtrar_fechas_desde_semana(self, fechas: List[str], semana_inicio: int) -> List[str]:
+    def _filtrar_fechas_desde_semana(self, fechas: List[int], semana_inicio: int) -> List[int]:
         """
         Filtrar fechas a partir de una semana específica.
 
@@ -765,7 +1248,7 @@ class CalculadorFechas:
 
         return fechas[indice_inicio:]
 
-    def _dividir_fechas_por_letras(self, fechas: List[str], num_letras: int) -> Dict[str, List[str]]:
+    def _dividir_fechas_por_letras(self, fechas: List[int], num_letras: int) -> Dict[str, List[int]]:
         """
         Dividir fechas entre letras de forma intercalada.
 
@@ -873,6 +1356,7 @@ class CalculadorFechas:
                 for dia in dias_usados:
                     # 2.1 - Obtener fechas del calendario para este día
                     fechas_calendario = self._obtener_fechas_calendario(dia, semestre)
+                    self.contadores["consultas_calendario"] += 1
 
                     if not fechas_calendario:
                         print(f"  ⚠ {semestre}:{asig_codigo}:{grupo_codigo} - Sin fechas en calendario para {dia}")
@@ -897,12 +1381,15 @@ class CalculadorFechas:
                         if letra in fechas_por_letra:
                             clave = (semestre, asig_codigo, grupo_codigo, dia, letra)
                             self.mapeo_fechas[clave] = fechas_por_letra[letra]
+                            self.contadores["fechas_repartidas"] += len(fechas_por_letra[letra])
 
                             print(f"  ✓ {semestre}:{asig_codigo}:{grupo_codigo} | {dia} | Letra {letra} → "
-                                  f"{len(fechas_por_letra[letra])} fechas calculadas:{fechas_por_letra[letra]}")
+                                  f"{len(fechas_por_letra[letra])} fechas calculadas:"
+                                  f"{[ordinal_a_ddmmyyyy(f) for f in fechas_por_letra[letra]]}")
 
                 num_grupos_procesados += 1
 
+        self.contadores["grupos_procesados"] = num_grupos_procesados
         print(f"\n  Total grupos procesados: {num_grupos_procesados}")
         print(f"  Total combinaciones (semestre, asig, grupo, dia, letra): {len(self.mapeo_fechas)}")
 
@@ -928,6 +1415,60 @@ class CalculadorFechas:
             print(f"  • Distribución por letra: {dict(sorted(letras_count.items()))}\n")
 
 
+# ========= ÍNDICE DE DISPONIBILIDAD =========
+class IndiceDisponibilidad:
+    """
+    Disponibilidad de profesores y aulas leída una sola vez por ejecución.
+
+    Sustituye a los recorridos de aulas.datos y a las conversiones de fechas y capacidades
+    que las Fases 3, 4, 6 y 7 repetían en cada consulta.
+
+    Attributes:
+        fechas_bloqueadas_prof: prof_id -> fechas no disponibles (ordinales de día)
+        fechas_bloqueadas_aula: aula -> fechas no disponibles (ordinales de día)
+        capacidades: aula -> capacidad (solo las aulas con capacidad numérica)
+        aulas_por_asignatura: asignatura -> [(aula, capacidad)] de las aulas disponibles asociadas,
+                              de mayor a menor capacidad (a igualdad, en el orden del JSON)
+    """
+
+    def __init__(self, cfg: Dict):
+        """Recorrer profesores y aulas una vez y construir los índices."""
+        configuracion = cfg.get("configuracion", {})
+        profesores_data = configuracion.get("profesores", {}).get("datos", {}) or {}
+        aulas_data = configuracion.get("aulas", {}).get("datos", {}) or {}
+
+        self.fechas_bloqueadas_prof: Dict[str, Set[int]] = {
+            prof_id: fechas_no_disponibles(datos) for prof_id, datos in profesores_data.items()
+        }
+        self.fechas_bloqueadas_aula: Dict[str, Set[int]] = {
+            aula: fechas_no_disponibles(datos) for aula, datos in aulas_data.items()
+        }
+
+        self.capacidades: Dict[str, int] = {}
+        for aula, datos in aulas_data.items():
+            try:
+                self.capacidades[aula] = int(datos.get("capacidad"))
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+        self.aulas_por_asignatura: Dict[str, List[Tuple[str, int]]] = {}
+        for aula, datos in aulas_data.items():
+            if not isinstance(datos, dict) or not datos.get("disponible", True):
+                continue
+            for asignatura in dict.fromkeys(datos.get("asignaturas_asociadas", []) or []):
+                self.aulas_por_asignatura.setdefault(asignatura, []).append((aula, self.capacidad(aula)))
+        for aulas in self.aulas_por_asignatura.values():
+            aulas.sort(key=lambda x: x[1], reverse=True)
+
+    def capacidad(self, aula: str, defecto: int = 0) -> int:
+        """Capacidad de un aula, o el valor por defecto si no está configurada o no es numérica"""
+        return self.capacidades.get(aula, defecto)
+
+    def aulas_asignatura(self, asignatura: str) -> List[Tuple[str, int]]:
+        """Aulas disponibles de una asignatura, de mayor a menor capacidad (no modificar)"""
+        return self.aulas_por_asignatura.get(asignatura, [])
+
+
 # ========= FASE 3: AULA PREFERENTE =========
 class AsignadorAulaPreferente:
     """
@@ -943,12 +1484,16 @@ class AsignadorAulaPreferente:
         aulas_preferentes: Diccionario resultante con aula preferente por asignatura
     """
 
-    def __init__(self, cfg: Dict):
+    def __init__(self, cfg: Dict, disponibilidad: Optional[IndiceDisponibilidad] = None):
         """Inicializar el asignador de aulas preferentes."""
         self.cfg = cfg
+        self.disponibilidad = disponibilidad or IndiceDisponibilidad(cfg)
         self.aulas_preferentes: Dict[Tuple[str, str], str] = {}
         self.conflictos_aulas: List[Dict] = []
 
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"asignaturas_procesadas": 0, "aulas_evaluadas": 0}
+
     def ejecutar(self) -> tuple[bool, dict[Any, Any]] | tuple[bool, dict[tuple[str, str], str], list[dict]]:
         """
         Ejecutar la FASE 3 completa.
@@ -979,25 +1524,11 @@ class AsignadorAulaPreferente:
             asignatura: Código de la asignatura (ej: "SII")
 
         Returns:
-            Lista de tuplas (nombre_aula, capacidad) que tienen esta asignatura
+            Lista de tuplas (nombre_aula, capacidad) que tienen esta asignatura (ya ordenada
+            de mayor a menor capacidad en el índice de disponibilidad)
         """
-        aulas_data = self.cfg.get("configuracion", {}).get("aulas", {}).get("datos", {})
-
-        aulas_encontradas = []
-
-        for nombre_aula, aula_info in aulas_data.items():
-            # Verificar que el aula esté disponible
-            if not aula_info.get("disponible", True):
-                continue
-
-            # Obtener asignaturas asociadas
-            asignaturas_asociadas = aula_info.get("asignaturas_asociadas", [])
-
-            # Si esta asignatura está en la lista
-            if asignatura in asignaturas_asociadas:
-                capacidad = aula_info.get("capacidad", 0)
-                aulas_encontradas.append((nombre_aula, capacidad))
-
+        aulas_encontradas = list(self.disponibilidad.aulas_asignatura(asignatura))
+        self.contadores["aulas_evaluadas"] += len(aulas_encontradas)
         return aulas_encontradas
 
     def _seleccionar_aula_mayor_capacidad(self, aulas: List[Tuple[str, int]]) -> Optional[str]:
@@ -1046,6 +1577,7 @@ class AsignadorAulaPreferente:
 
             # 3.1 - Buscar aulas asociadas a esta asignatura
             aulas_disponibles = self._obtener_aulas_por_asignatura(asig_codigo)
+            self.contadores["asignaturas_procesadas"] += 1
 
             if not aulas_disponibles:
                 print(f"  ⚠ {semestre}:{asig_codigo} - Sin aulas asociadas")
@@ -1112,6 +1644,93 @@ class AsignadorAulaPreferente:
             print(f"  • Distribución de uso: {dict(sorted(aulas_count.items()))}\n")
 
 
+# ========= ÍNDICE DE HORARIOS =========
+class IndiceHorarios:
+    """
+    Índice de horarios_grid construido en una sola pasada por ejecución.
+
+    Evita recorrer horarios.datos completo (y normalizar cada franja) en cada consulta
+    de la Fase 4. Conserva el orden de recorrido original: semestres en el orden del JSON
+    y franjas en el orden del horarios_grid.
+
+    Attributes:
+        semestres_asignatura: Claves de semestre de horarios.datos en las que aparece cada asignatura
+        slots: (semestre, asignatura, dia, franja_normalizada) -> info {grupos, letras, mixta} (primera aparición)
+        slots_raw: (semestre, asignatura, dia, franja_sin_normalizar) -> info
+        franjas_grupo_letra: (semestre, asignatura, dia, grupo, letra) -> [franjas normalizadas]
+    """
+
+    def __init__(self, cfg: Dict):
+        """Recorrer horarios.datos una vez y construir los índices."""
+        self.semestres_asignatura: Dict[str, List[str]] = {}
+        self.slots: Dict[Tuple[str, str, str, str], Dict] = {}
+        self.slots_raw: Dict[Tuple[str, str, str, str], Dict] = {}
+        self.franjas_grupo_letra: Dict[Tuple[str, str, str, str, str], List[str]] = {}
+
+        horarios_data = cfg.get("configuracion", {}).get("horarios", {}).get("datos", {}) or {}
+
+        for sem_key, asigs in horarios_data.items():
+            for asignatura, asig_data in asigs.items():
+                self.semestres_asignatura.setdefault(asignatura, []).append(sem_key)
+
+                horarios_grid = asig_data.get("horarios_grid", {})
+                if not isinstance(horarios_grid, dict):
+                    continue
+
+                for franja_raw, dias in horarios_grid.items():
+                    franja_norm = normalize_time_range(franja_raw)
+
+                    for dia, info in dias.items():
+                        if not isinstance(info, dict):
+                            continue
+
+                        self.slots_raw[(sem_key, asignatura, dia, franja_raw)] = info
+                        self.slots.setdefault((sem_key, asignatura, dia, franja_norm), info)
+
+                        for grupo in dict.fromkeys(info.get("grupos") or []):
+                            for letra in dict.fromkeys(info.get("letras", [])):
+                                clave = (sem_key, asignatura, dia, grupo, letra)
+                                self.franjas_grupo_letra.setdefault(clave, []).append(franja_norm)
+
+    def franjas(self, semestre: str, asignatura: str, grupo: str, dia: str, letra: str) -> Optional[List[str]]:
+        """Franjas normalizadas del grupo con esa letra ese día (primer semestre que contiene la asignatura)"""
+        sem_norm = normalizar_semestre(semestre)
+        if sem_norm is None:
+            return None
+
+        for sem_key in self.semestres_asignatura.get(asignatura, []):
+            if sem_norm in sem_key:
+                franjas = self.franjas_grupo_letra.get((sem_key, asignatura, dia, grupo, letra))
+                return list(franjas) if franjas else None
+
+        return None
+
+    def es_mixto(self, asignatura: str, dia: str, franja: str) -> bool:
+        """Valor de 'mixta' del primer slot (día, franja normalizada) de la asignatura"""
+        for sem_key in self.semestres_asignatura.get(asignatura, []):
+            info = self.slots.get((sem_key, asignatura, dia, franja))
+            if info is not None:
+                return bool(info.get("mixta", False))
+        return False
+
+    def grupo_doble(self, asignatura: str, dia: str, franja: str, grupo_simple: str) -> Optional[str]:
+        """Primer grupo distinto de grupo_simple en una franja mixta donde aparece grupo_simple"""
+        for sem_key in self.semestres_asignatura.get(asignatura, []):
+            info = self.slots_raw.get((sem_key, asignatura, dia, franja))
+            if info is None or not bool(info.get("mixta", False)):
+                continue
+
+            grupos = info.get("grupos", [])
+            if grupo_simple not in grupos:
+                continue
+
+            for grupo in grupos:
+                if grupo != grupo_simple:
+                    return grupo
+
+        return None
+
+
 # ========= FASE 4: CREAR GRUPOS DE LABORATORIO =========
 class CreadorGruposLab:
     """
@@ -1131,18 +1750,28 @@ class CreadorGruposLab:
         aulas_preferentes: Diccionario con aulas por asignatura (de FASE 3)
         grupos_creados: Lista de objetos GrupoLab creados
         grupos_por_slot: Diccionario agrupando grupos por (dia, franja)
+        indice_horarios: Índice de horarios_grid para las consultas de franjas, mixtos y dobles
     """
 
-    def __init__(self, cfg: Dict, mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[str]], aulas_preferentes: Dict[Tuple[str, str], str]):
+    def __init__(self, cfg: Dict, mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]], aulas_preferentes: Dict[Tuple[str, str], str],
+                 indice_horarios: Optional[IndiceHorarios] = None,
+                 disponibilidad: Optional[IndiceDisponibilidad] = None):
         """Inicializar el creador de grupos."""
         self.cfg = cfg
         self.mapeo_fechas = mapeo_fechas
         self.aulas_preferentes = aulas_preferentes
+        self.indice_horarios = indice_horarios or IndiceHorarios(cfg)
+        self.disponibilidad = disponibilidad or IndiceDisponibilidad(cfg)
         self.grupos_creados: List[GrupoLab] = []
         self.grupos_por_slot: Dict[Tuple[str, str], List[GrupoLab]] = {}
         self.contador_labels: Dict[Tuple[str, str], int] = {}
         self.conflictos_aulas: List[Dict] = []
 
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"combinaciones_procesadas": 0, "consultas_indice_horarios": 0,
+                                           "slots_indexados": len(self.indice_horarios.slots_raw),
+                                           "grupos_creados": 0}
+
     def ejecutar(self) -> tuple[bool, list[Any], dict[Any, Any]] | tuple[bool, list[GrupoLab], dict[tuple[str, str],
     list[GrupoLab]], list[dict]]:
         """
@@ -1187,54 +1816,7 @@ class CreadorGruposLab:
         Returns:
             Lista de franjas horarias normalizadas (ej: ["09:30-11:30"]) o None si no se encuentra
         """
-        horarios_data = self.cfg.get("configuracion", {}).get("horarios", {}).get("datos", {})
-
-        # Normalizar semestre de entrada
-        sem_norm = normalizar_semestre(semestre)
-        if sem_norm is None:
-            return None
-
-        # Buscar asignatura en el semestre correspondiente
-        asig_data = None
-        for sem_key, asigs in horarios_data.items():
-            if sem_norm not in sem_key:
-                continue
-            if asignatura in asigs:
-                asig_data = asigs[asignatura]
-                break
-
-        if not asig_data:
-            return None
-
-        horarios_grid = asig_data.get("horarios_grid", {})
-        if not isinstance(horarios_grid, dict) or not horarios_grid:
-            return None
-
-        # Recolectar todas las franjas donde aparece este grupo con esta letra en este día
-        franjas = []
-
-        for franja_raw, dias in horarios_grid.items():
-            info = dias.get(dia)
-            if not isinstance(info, dict):
-                continue
-
-            # Verificar que tenga la letra asignada
-            if letra not in info.get("letras", []):
-                continue
-
-            # Verificar que tenga el grupo asignado
-            grupos = info.get("grupos") or []
-            if grupo not in grupos:
-                continue
-
-            # Normalizar y agregar la franja
-            franja_norm = normalize_time_range(franja_raw)
-            franjas.append(franja_norm)
-
-        # Ordenar cronológicamente
-        # franjas = sorted(set(franjas), key=lambda x: time_start_minutes(x))
-
-        return franjas if franjas else None
+        return self.indice_horarios.franjas(semestre, asignatura, grupo, dia, letra)
 
     def _determinar_slot_mixto(self, semestre: str, asignatura: str,
                                grupo: str, dia: str, franja: str) -> bool:
@@ -1257,38 +1839,14 @@ class CreadorGruposLab:
         Returns:
             True si el slot es mixto, False en caso contrario
         """
-        horarios_data = self.cfg.get("configuracion", {}).get("horarios", {}).get("datos", {})
-
-        # Buscar horarios para esta asignatura
-        for sem_key, asigs in horarios_data.items():
-            if asignatura not in asigs:
-                continue
+        return self.indice_horarios.es_mixto(asignatura, dia, franja)
 
-            horarios_grid = asigs[asignatura].get("horarios_grid", {})
+    def _generar_label(self, asignatura: str, grupo: str) -> str:
+        """
+        Generar label único para un grupo (ej: A404-01, A404-02...).
 
-            # Buscar la franja específica
-            for franja_key, dias in horarios_grid.items():
-                if normalize_time_range(franja_key) != franja:
-                    continue
-
-                if dia not in dias:
-                    continue
-
-                info = dias[dia]
-                if not isinstance(info, dict):
-                    continue
-
-                # Verificar si está marcado como mixto
-                return bool(info.get("mixta", False))
-
-        return False
-
-    def _generar_label(self, asignatura: str, grupo: str) -> str:
-        """
-        Generar label único para un grupo (ej: A404-01, A404-02...).
-
-        Generar label único para un grupo dentro de una asignatura.
-        Reinicia numeración al cambiar de asignatura.
+        Generar label único para un grupo dentro de una asignatura.
+        Reinicia numeración al cambiar de asignatura.
 
         Args:
             grupo: Código de grupo base (ej: "A404")
@@ -1313,12 +1871,7 @@ class CreadorGruposLab:
         Returns:
             Capacidad del aula, o 0 si no se encuentra
         """
-        aulas_data = self.cfg.get("configuracion", {}).get("aulas", {}).get("datos", {})
-
-        if nombre_aula in aulas_data:
-            return aulas_data[nombre_aula].get("capacidad", 0)
-
-        return 0
+        return self.disponibilidad.capacidad(nombre_aula, 0)
 
     # new
     def _buscar_grupo_doble_en_mixto(self, asignatura: str, dia: str, franja: str, grupo_simple: str) -> Optional[str]:
@@ -1338,34 +1891,7 @@ class CreadorGruposLab:
         Returns:
             Código del grupo doble encontrado (ej: "EE403"), o None si no hay
         """
-        horarios_data = self.cfg.get("configuracion", {}).get("horarios", {}).get("datos", {})
-
-        for _, asigs in horarios_data.items():
-            if asignatura not in asigs:
-                continue
-
-            horarios_grid = asigs[asignatura].get("horarios_grid", {})
-            if franja not in horarios_grid:
-                continue
-
-            info = horarios_grid[franja].get(dia)
-            if not isinstance(info, dict):
-                continue
-
-            # Solo consideramos franjas marcadas como mixta
-            if not bool(info.get("mixta", False)):
-                continue
-
-            grupos = info.get("grupos", [])
-            if grupo_simple not in grupos:
-                continue
-
-            # Devolver el primer grupo diferente al simple
-            for grupo in grupos:
-                if grupo != grupo_simple:
-                    return grupo
-
-        return None
+        return self.indice_horarios.grupo_doble(asignatura, dia, franja, grupo_simple)
 
     def _crear_grupos_laboratorio(self) -> bool:
         """
@@ -1400,6 +1926,8 @@ class CreadorGruposLab:
 
             # 4.2 - Obtener franja horaria desde horarios_grid
             franjas = self._obtener_franjas_de_horarios_grid(semestre, asignatura, grupo, dia, letra)
+            self.contadores["combinaciones_procesadas"] += 1
+            self.contadores["consultas_indice_horarios"] += 1
 
             if franjas is None:
                 print(f"  ⚠ {semestre}:{asignatura}:{grupo} - No se encontró franja para {dia}")
@@ -1432,6 +1960,7 @@ class CreadorGruposLab:
 
                 # 4.4 - Determinar si es slot mixto
                 is_slot_mixto = self._determinar_slot_mixto(semestre, asignatura, grupo, dia, franja)
+                self.contadores["consultas_indice_horarios"] += 1
 
                 # 4.5 - Generar label único para este grupo de laboratorio
                 label = self._generar_label(asignatura, grupo)
@@ -1446,6 +1975,7 @@ class CreadorGruposLab:
                 # Si es un slot mixto, buscar el grupo doble asociado
                 if is_slot_mixto:
                     grupo_doble = self._buscar_grupo_doble_en_mixto(asignatura, dia, franja, grupo_simple)
+                    self.contadores["consultas_indice_horarios"] += 1
 
                 # 4.1 - Crear objeto GrupoLab con toda la información recopilada
                 grupo_lab = GrupoLab(
@@ -1475,6 +2005,7 @@ class CreadorGruposLab:
                 self.grupos_por_slot[slot_key].append(grupo_lab)
 
                 num_creados += 1
+                self.contadores["grupos_creados"] += 1
 
                 # Log informativo ---------------------------------------------------------------------------------------------------------------------------------------------
                 #dsf
@@ -1562,22 +2093,39 @@ class AsignadorAlumnos:
         avisos: Lista de advertencias generadas durante la asignación
         conflictos_alumnos: Lista de conflictos detectados durante la fase
         ocupacion_global: Índice global de sesiones ocupadas por alumno
-                          Formato: {alumno_id: {("dd/mm/yyyy", "HH:MM-HH:MM"), ...}}
+                          Formato: {alumno_id: máscara de bits sobre bits_sesion}
+        bits_sesion: Posición de bit de cada sesión (fecha, franja) de la ejecución
+        mascaras_grupo: Máscara de sesiones de cada grupo, por id(grupo)
         alumnos_sin_asignar: Registro de alumnos que no pudieron ser asignados durante la fase
+        orden_avisos, orden_conflictos: (etapa, unidad) en que se generó cada aviso y conflicto, para
+                                        unir en el orden secuencial los de la fase en paralelo
+        modo_asignacion: "voraz" o "flujo" (asignación exacta de cada código simple)
+        rng_desempate: Generador para desempatar alumnos con las mismas alternativas (None = orden de entrada)
     """
 
-    def __init__(self, cfg: Dict, grupos_creados: List[GrupoLab]):
+    def __init__(self, cfg: Dict, grupos_creados: List[GrupoLab], progreso: Optional[NotificadorProgreso] = None,
+                 modo_asignacion: str = MODO_ASIGNACION_VORAZ, semilla_desempate: Optional[int] = None):
         self.cfg = cfg
         self.grupos_creados = grupos_creados  # Lista de grupos creados en Fase 4 (objetos GrupoLab)
+        self.progreso = progreso or NotificadorProgreso()
+        self.modo_asignacion = modo_asignacion
+        self.rng_desempate = random.Random(semilla_desempate) if semilla_desempate is not None else None
         self.avisos: List[str] = []
         self.conflictos_alumnos: List[Dict] = []
+        self.orden_avisos: List[Tuple[int, Any]] = []
+        self.orden_conflictos: List[Tuple[int, Any]] = []
 
-        # Índice de ocupación: {alumno_id: {(fecha, franja), ...}}
-        self.ocupacion_global: Dict[str, Set[Tuple[str, str]]] = {}
+        # Índice de ocupación: {alumno_id: máscara de sesiones (fecha, franja) ocupadas}
+        self.ocupacion_global: Dict[str, int] = {}
 
         # Registro de alumnos sin asignar
         self.alumnos_sin_asignar: Dict[str, List[Dict]] = {}
 
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"comprobaciones_conflicto": 0, "asignaciones": 0, "sin_asignar": 0,
+                                           "movimientos_paridad": 0, "candidatos_paridad_evaluados": 0,
+                                           "actualizaciones_prioridad": 0}
+
         # Mapeos: {asignatura: {"simples": {id: codigo}, "dobles": {id: codigo}}}
         self.mapeos_alumnos: Dict[str, Dict[str, Dict[str, str]]] = {}
 
@@ -1595,6 +2143,17 @@ class AsignadorAlumnos:
                 self.grupos_por_asignatura[grupo.asignatura] = []
             self.grupos_por_asignatura[grupo.asignatura].append(grupo)
 
+        # Máscaras de sesiones: un bit por cada (fecha, franja) distinta de la ejecución.
+        # Las fechas de los grupos no cambian en esta fase, así que se calculan una sola vez.
+        self.bits_sesion: Dict[Tuple[int, str], int] = {}
+        self.mascaras_grupo: Dict[int, int] = {}
+        for grupo in self.grupos_creados:
+            mascara = 0
+            for fecha in grupo.fechas:
+                bit = self.bits_sesion.setdefault((fecha, grupo.franja), len(self.bits_sesion))
+                mascara |= 1 << bit
+            self.mascaras_grupo[id(grupo)] = mascara
+
     def ejecutar(self) -> Tuple[bool, List[GrupoLab], List[str], List[Dict]]:
         """Ejecutar la asignación completa de alumnos"""
         print("\n" + "=" * 70)
@@ -1602,10 +2161,13 @@ class AsignadorAlumnos:
         print("=" * 70)
         # print("  Modo: Detección por fechas reales")
         print("  Estrategia: Doble grado primero (todas las asignaturas), luego simples")
+        print(f"  Modo de asignación de simples: {self.modo_asignacion}")
 
         # 5.0 - Construir mapeos de alumnos
         print(f"\n[5.0] Construyendo mapeos de alumnos...")
         self._construir_mapeos()
+        total_matriculas = sum(len(m["dobles"]) + len(m["simples"]) for m in self.mapeos_alumnos.values())
+        self.progreso.iniciar(total_matriculas, f"0/{total_matriculas} matrículas asignadas")
 
         # 5.1 - FASE A: Asignar dobles
         # print("\nFASE A Asignación de los alumnos de doble grado")
@@ -1712,6 +2274,7 @@ class AsignadorAlumnos:
 
         for asignatura, grupos, _ in asignaturas:
             self._asignar_asignatura(asignatura, grupos, es_doble)
+            self._marcar_orden(ETAPA_DOBLES if es_doble else ETAPA_SIMPLES, asignatura)
 
     def _asignar_asignatura(self, asignatura: str, grupos: List[GrupoLab], es_doble: bool) -> None:
         """Asignar alumnos de una asignatura específica"""
@@ -1739,11 +2302,17 @@ class AsignadorAlumnos:
                     self.avisos.append(f"{asignatura}: Sin grupos para {codigo} ({len(lista)} alumnos)")
                     for aid in lista:
                         self._registrar_sin_asignar(aid, asignatura, f"Sin grupos para {codigo}")
+                    self.progreso.avanzar(len(lista))
                     continue
 
-                asignados = self._asignar_grupo_alumnos(
-                    {a: codigo for a in lista}, grupos_codigo, asignatura, es_doble
-                )
+                if self.modo_asignacion == MODO_ASIGNACION_FLUJO:
+                    asignados = self._asignar_codigo_flujo(
+                        {a: codigo for a in lista}, grupos_codigo, asignatura
+                    )
+                else:
+                    asignados = self._asignar_grupo_alumnos(
+                        {a: codigo for a in lista}, grupos_codigo, asignatura, es_doble
+                    )
                 print(f"      {codigo}: {asignados}/{len(lista)}")
                 total += asignados
 
@@ -1756,22 +2325,48 @@ class AsignadorAlumnos:
             asignatura: str,
             es_doble: bool
     ) -> int:
-        """Asignar un conjunto de alumnos a los grupos de laboratorio. Núcleo de la asignación de los alumnos."""
+        """
+        Asignar un conjunto de alumnos a los grupos de laboratorio. Núcleo de la asignación de los alumnos.
 
-        # Ordenar alumnos por las alternativas de franjas que tiene (menos primero)
-        def contar_alt(alumno_id: str) -> int:
-            """Contar las alternativas válidas (grupos de lab disponibles) para un alumno"""
-            return sum(
-                1 for g in grupos                                           # Para cada grupo
+        Orden dinámico "más restringido primero": una cola de prioridad por número de alternativas
+        válidas (grupos con sitio, que aceptan su código y sin conflicto). Dentro de esta llamada
+        solo cambia la ocupación del alumno que se coloca, así que las alternativas de los demás
+        solo bajan cuando un grupo se llena: entonces se actualizan los alumnos pendientes que lo
+        tenían como alternativa. Las entradas antiguas de la cola se descartan al sacarlas.
+        """
+        # Grupos que aceptan cada código (no depende del alumno)
+        aceptan: Dict[str, List[GrupoLab]] = {}
+        ids_aceptan: Dict[str, Set[int]] = {}
+        for codigo in dict.fromkeys(alumnos.values()):
+            aceptan[codigo] = [g for g in grupos if self._grupo_acepta(g, codigo, es_doble)]
+            ids_aceptan[codigo] = {id(g) for g in aceptan[codigo]}
+
+        # Alternativas válidas iniciales de cada alumno (menos primero; empates en orden de entrada,
+        # o en un orden aleatorio con semilla de desempate)
+        desempate = list(range(len(alumnos)))
+        if self.rng_desempate is not None:
+            self.rng_desempate.shuffle(desempate)
+        alternativas: Dict[str, int] = {}
+        cola: List[Tuple[int, int, str]] = []
+        orden: Dict[str, int] = {}
+        for i, (alumno_id, codigo) in zip(desempate, alumnos.items()):
+            alternativas[alumno_id] = sum(
+                1 for g in aceptan[codigo]                                  # Me acepta?
                 if len(g.alumnos) < g.capacidad                             # Tiene sitio?
-                and self._grupo_acepta(g, alumnos[alumno_id], es_doble)     # Me acepta?
                 and not self._tiene_conflicto(alumno_id, g)                 # Sin conflicto?
             )
+            orden[alumno_id] = i
+            cola.append((alternativas[alumno_id], i, alumno_id))
+        heapq.heapify(cola)
 
-        ordenados = sorted(alumnos.keys(), key=contar_alt)
+        pendientes = set(alumnos)
         asignados = 0
 
-        for alumno_id in ordenados:
+        while cola:
+            num_alt, _, alumno_id = heapq.heappop(cola)
+            if alumno_id not in pendientes or num_alt != alternativas[alumno_id]:
+                continue  # Entrada antigua
+            pendientes.discard(alumno_id)
             codigo = alumnos[alumno_id]
             mejor = None
             mejor_carga = float('inf')
@@ -1791,25 +2386,79 @@ class AsignadorAlumnos:
                 mejor.alumnos.append(alumno_id)
                 self._registrar_ocupacion(alumno_id, mejor)
                 asignados += 1
+                self.contadores["asignaciones"] += 1
+
+                # Si el grupo se ha llenado, deja de ser alternativa para los pendientes que lo tenían
+                if len(mejor.alumnos) >= mejor.capacidad:
+                    for otro_id in pendientes:
+                        if id(mejor) in ids_aceptan[alumnos[otro_id]] and not self._tiene_conflicto(otro_id, mejor):
+                            alternativas[otro_id] -= 1
+                            heapq.heappush(cola, (alternativas[otro_id], orden[otro_id], otro_id))
+                            self.contadores["actualizaciones_prioridad"] += 1
             else:
-                semestre = self.semestres.get(asignatura, "1º Semestre")
-                if es_doble:
-                    self.avisos.append(
-                        f"{semestre}:{asignatura} - "
-                        f"Alumno {alumno_id} (doble {codigo}) sin grupo compatible disponible"
-                    )
-                else:
-                    self.avisos.append(
-                        f"{semestre}:{asignatura} - "
-                        f"Alumno {alumno_id} (simple {codigo}) sin grupo compatible disponible"
-                    )
-                self._registrar_sin_asignar(alumno_id, asignatura, "Sin alternativas válidas")
+                self._registrar_sin_grupo(alumno_id, codigo, asignatura, es_doble)
+
+            self.progreso.avanzar(1, f"{self.progreso.paso + 1}/{self.progreso.total} matrículas asignadas")
 
         if es_doble:
             print(f"      ✓ {asignados}/{len(alumnos)} asignados")
 
         return asignados
 
+    def _asignar_codigo_flujo(self, alumnos: Dict[str, str], grupos: List[GrupoLab], asignatura: str) -> int:
+        """
+        Asignar los alumnos de un código simple resolviendo un flujo máximo de coste mínimo.
+
+        Las aristas alumno -> grupo solo existen si el grupo tiene sitio, acepta el código y no
+        hay conflicto con la ocupación ya fijada. El coste creciente por plaza equilibra cargas.
+        Los alumnos de un mismo código no pueden chocar entre sí (cada uno ocupa un solo grupo),
+        así que el problema es bipartito exacto.
+
+        Args:
+            alumnos: {alumno_id: código simple}
+            grupos: Grupos del código
+            asignatura: Código de asignatura
+
+        Returns:
+            Número de alumnos asignados
+        """
+        candidatos = {
+            alumno_id: [
+                i for i, g in enumerate(grupos)
+                if len(g.alumnos) < g.capacidad
+                and self._grupo_acepta(g, codigo, False)
+                and not self._tiene_conflicto(alumno_id, g)
+            ]
+            for alumno_id, codigo in alumnos.items()
+        }
+        asignacion = asignar_por_flujo(candidatos, [len(g.alumnos) for g in grupos],
+                                       [g.capacidad for g in grupos])
+
+        asignados = 0
+        for alumno_id, codigo in alumnos.items():
+            if alumno_id in asignacion:
+                grupo = grupos[asignacion[alumno_id]]
+                grupo.alumnos.append(alumno_id)
+                self._registrar_ocupacion(alumno_id, grupo)
+                asignados += 1
+                self.contadores["asignaciones"] += 1
+            else:
+                self._registrar_sin_grupo(alumno_id, codigo, asignatura, False)
+
+            self.progreso.avanzar(1, f"{self.progreso.paso + 1}/{self.progreso.total} matrículas asignadas")
+
+        return asignados
+
+    def _registrar_sin_grupo(self, alumno_id: str, codigo: str, asignatura: str, es_doble: bool) -> None:
+        """Avisar y registrar un alumno sin ningún grupo compatible disponible"""
+        semestre = self.semestres.get(asignatura, "1º Semestre")
+        tipo = "doble" if es_doble else "simple"
+        self.avisos.append(
+            f"{semestre}:{asignatura} - "
+            f"Alumno {alumno_id} ({tipo} {codigo}) sin grupo compatible disponible"
+        )
+        self._registrar_sin_asignar(alumno_id, asignatura, "Sin alternativas válidas")
+
     def _grupo_acepta(self, grupo: GrupoLab, codigo: str, es_doble: bool) -> bool:
         """Verificar si un grupo puede recibir a un alumno con un código específico"""
         if es_doble:
@@ -1819,26 +2468,21 @@ class AsignadorAlumnos:
     # ========= GESTIÓN DE CONFLICTOS =========
     def _tiene_conflicto(self, alumno_id: str, grupo: GrupoLab) -> bool:
         """Verificar si asignar el alumno al grupo crearía conflicto horario"""
-        if alumno_id not in self.ocupacion_global:
-            return False
-        ocupacion = self.ocupacion_global[alumno_id]
-        return any((fecha, grupo.franja) in ocupacion for fecha in grupo.fechas)
+        self.contadores["comprobaciones_conflicto"] += 1
+        return bool(self.ocupacion_global.get(alumno_id, 0) & self.mascaras_grupo[id(grupo)])
 
     def _registrar_ocupacion(self, alumno_id: str, grupo: GrupoLab) -> None:
         """Marcar fechas como ocupadas después de asignar"""
-        if alumno_id not in self.ocupacion_global:
-            self.ocupacion_global[alumno_id] = set()
-        for fecha in grupo.fechas:
-            self.ocupacion_global[alumno_id].add((fecha, grupo.franja))
+        self.ocupacion_global[alumno_id] = self.ocupacion_global.get(alumno_id, 0) | self.mascaras_grupo[id(grupo)]
 
     def _quitar_ocupacion(self, alumno_id: str, grupo: GrupoLab) -> None:
         """Liberar fechas cuando se mueve un alumno (usado en balanceo)"""
         if alumno_id in self.ocupacion_global:
-            for fecha in grupo.fechas:
-                self.ocupacion_global[alumno_id].discard((fecha, grupo.franja))
+            self.ocupacion_global[alumno_id] &= ~self.mascaras_grupo[id(grupo)]
 
     def _registrar_sin_asignar(self, alumno_id: str, asignatura: str, motivo: str) -> None:
         """Registrar un alumno que no pudo ser asignado"""
+        self.contadores["sin_asignar"] += 1
 
         self.alumnos_sin_asignar.setdefault(asignatura, []).append({
             "alumno_id": alumno_id,
@@ -1852,6 +2496,11 @@ class AsignadorAlumnos:
             "detalle": motivo
         })
 
+    def _marcar_orden(self, etapa: int, unidad: Any) -> None:
+        """Etiquetar con (etapa, unidad) los avisos y conflictos añadidos desde la última marca"""
+        self.orden_avisos.extend([(etapa, unidad)] * (len(self.avisos) - len(self.orden_avisos)))
+        self.orden_conflictos.extend([(etapa, unidad)] * (len(self.conflictos_alumnos) - len(self.orden_conflictos)))
+
     # ========= BALANCEO DE PARIDAD =========
     def _balancear_paridad_global(self) -> None:
         """Intentar que todos los grupos tengan número par de alumnos cuando sea posible"""
@@ -1878,6 +2527,7 @@ class AsignadorAlumnos:
                 continue
 
             cambios, excepcion = self._balancear_codigo(grupos_con_alumnos, asig, codigo)
+            self._marcar_orden(ETAPA_PARIDAD, (asig, codigo))
             cambios_totales += cambios
             if excepcion:
                 excepciones += 1
@@ -1887,35 +2537,32 @@ class AsignadorAlumnos:
             print(f"      ⚠ {excepciones} códigos con paridad subóptima")
 
     def _balancear_codigo(self, grupos: List[GrupoLab], asig: str, codigo: str) -> Tuple[int, bool]:
-        """Balancear paridad para un código específico"""
+        """
+        Balancear paridad para un código específico.
+
+        Mover un alumno de u a v invierte la paridad de los dos grupos; una cadena u -> w -> v
+        invierte la de u y v y deja w igual. Por eso cada par de grupos impares se arregla con
+        un camino en el grafo de movimientos (arista u -> w si algún alumno de u puede pasar a w
+        sin conflicto), y el emparejamiento de impares se elige con el mínimo de movimientos.
+        Las aristas que salen de un grupo solo dependen de sus alumnos, así que tras aplicar un
+        camino solo se recalculan las de los grupos del camino.
+
+        Returns:
+            Tupla (movimientos realizados, True si quedan más impares de los inevitables)
+        """
+        mapeos = self.mapeos_alumnos.get(asig, {})
+        matriculas = {a: (c, False) for a, c in mapeos.get("simples", {}).items()}
+        matriculas.update({a: (c, True) for a, c in mapeos.get("dobles", {}).items()})
         cambios = 0
+        aristas: Dict[int, List[int]] = {}
 
-        for _ in range(50):  # Límite de iteraciones
-            impares = [g for g in grupos if len(g.alumnos) % 2 == 1]
+        while True:
+            impares = [i for i, g in enumerate(grupos) if len(g.alumnos) % 2 == 1]
             if len(impares) <= 1:
                 return cambios, False
 
-            movido = False
-            for i, origen in enumerate(impares):
-                if movido:
-                    break
-                for destino in impares[i + 1:]:
-                    if len(destino.alumnos) >= destino.capacidad:
-                        continue
-
-                    # Buscar alumno que pueda moverse
-                    alumno = self._encontrar_movible(origen, destino)
-                    if alumno:
-                        origen.alumnos.remove(alumno)
-                        destino.alumnos.append(alumno)
-                        self._quitar_ocupacion(alumno, origen)
-                        self._registrar_ocupacion(alumno, destino)
-                        cambios += 1
-                        movido = True
-                        break
-
-            if not movido:
-                # self.avisos.append(f"{asig} ({codigo}): {len(impares)} grupos impares (conflictos)")
+            camino = self._mejor_camino_paridad(grupos, impares, aristas, matriculas)
+            if camino is None:
                 semestre = self.semestres.get(asig, "1º Semestre")
                 self.avisos.append(
                     f"{semestre}:{asig} ({codigo}): "
@@ -1923,20 +2570,132 @@ class AsignadorAlumnos:
                 )
                 return cambios, True
 
-        return cambios, False
+            # Aplicar la cadena desde el final: cada grupo intermedio cede un alumno antes de
+            # recibir otro, así que solo el último necesita plaza libre
+            for i in range(len(camino) - 2, -1, -1):
+                origen, destino = grupos[camino[i]], grupos[camino[i + 1]]
+                alumno = self._encontrar_movible(origen, destino, matriculas)
+                origen.alumnos.remove(alumno)
+                destino.alumnos.append(alumno)
+                self._quitar_ocupacion(alumno, origen)
+                self._registrar_ocupacion(alumno, destino)
+                cambios += 1
+                self.contadores["movimientos_paridad"] += 1
+            for indice in camino:
+                aristas.pop(indice, None)
+
+    def _aristas_movimiento(self, grupos: List[GrupoLab], origen: int, aristas: Dict[int, List[int]],
+                            matriculas: Dict[str, Tuple[str, bool]]) -> List[int]:
+        """
+        Aristas del grafo de movimientos que salen de un grupo (calculadas al pedirlas y cacheadas).
 
-    def _encontrar_movible(self, origen: GrupoLab, destino: GrupoLab) -> Optional[str]:
-        """Encontrar alumno que se pueda mover sin tener conflicto"""
-        for alumno_id in origen.alumnos:
-            if alumno_id not in self.ocupacion_global:
-                return alumno_id
+        Args:
+            grupos: Grupos del (asignatura, código)
+            origen: Índice del grupo
+            aristas: Caché origen -> destinos
+            matriculas: alumno_id -> (código, es_doble) en la asignatura
+
+        Returns:
+            Índices de los grupos a los que puede pasar alguno de los alumnos del origen
+        """
+        if origen not in aristas:
+            grupo = grupos[origen]
+            aristas[origen] = [j for j, destino in enumerate(grupos)
+                               if j != origen and self._encontrar_movible(grupo, destino, matriculas) is not None]
+        return aristas[origen]
+
+    def _mejor_camino_paridad(self, grupos: List[GrupoLab], impares: List[int], aristas: Dict[int, List[int]],
+                              matriculas: Dict[str, Tuple[str, bool]]) -> Optional[List[int]]:
+        """
+        Elegir el primer camino del emparejamiento de grupos impares de menor coste.
+
+        El emparejamiento maximiza los pares arreglados y, a igualdad, minimiza los movimientos:
+        programación dinámica sobre subconjuntos hasta MAX_IMPARES_EMPAREJAMIENTO_EXACTO impares,
+        y por encima se empareja cada impar con el más cercano.
+
+        Args:
+            grupos: Grupos del (asignatura, código)
+            impares: Índices de los grupos con número impar de alumnos
+            aristas: Caché del grafo de movimientos (ver _aristas_movimiento)
+            matriculas: alumno_id -> (código, es_doble) en la asignatura
+
+        Returns:
+            Camino de índices de grupos (origen ... destino), o None si ningún par tiene camino
+        """
+        # Un camino solo puede terminar en un impar con plaza libre
+        con_plaza = {v for v in impares if len(grupos[v].alumnos) < grupos[v].capacidad}
+        if not con_plaza:
+            return None
 
-            # Simular el movimiento
-            ocupacion = self.ocupacion_global[alumno_id].copy()
-            for fecha in origen.fechas:
-                ocupacion.discard((fecha, origen.franja))
+        # Caminos más cortos (BFS) desde cada impar hasta los demás impares con plaza libre
+        caminos: Dict[Tuple[int, int], List[int]] = {}
+        for u in impares:
+            previo = {u: u}
+            cola = deque([u])
+            while cola:
+                x = cola.popleft()
+                for y in self._aristas_movimiento(grupos, x, aristas, matriculas):
+                    if y not in previo:
+                        previo[y] = x
+                        cola.append(y)
+            for v in con_plaza:
+                if v != u and v in previo:
+                    camino = [v]
+                    while camino[-1] != u:
+                        camino.append(previo[camino[-1]])
+                    camino.reverse()
+                    par = (min(u, v), max(u, v))
+                    if par not in caminos or len(camino) < len(caminos[par]):
+                        caminos[par] = camino
+
+        if not caminos:
+            return None
+
+        if len(impares) > MAX_IMPARES_EMPAREJAMIENTO_EXACTO:
+            return min(caminos.values(), key=len)
+
+        # dp(mascara) = (impares sin pareja, movimientos, primer par) para los impares de la máscara
+        @lru_cache(maxsize=None)
+        def dp(mascara: int) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+            if not mascara:
+                return 0, 0, None
+            i = (mascara & -mascara).bit_length() - 1
+            resto = mascara & ~(1 << i)
+            sueltos, movimientos, _ = dp(resto)
+            mejor = (sueltos + 1, movimientos, None)
+            for j in range(i + 1, len(impares)):
+                if not resto >> j & 1:
+                    continue
+                par = (min(impares[i], impares[j]), max(impares[i], impares[j]))
+                if par in caminos:
+                    sueltos, movimientos, _ = dp(resto & ~(1 << j))
+                    opcion = (sueltos, movimientos + len(caminos[par]) - 1, par)
+                    if opcion[:2] < mejor[:2]:
+                        mejor = opcion
+            return mejor
+
+        mascara = (1 << len(impares)) - 1
+        while mascara:
+            _, _, par = dp(mascara)
+            if par is not None:
+                return caminos[par]
+            mascara &= mascara - 1  # el impar más bajo se queda sin pareja
+        return None
+
+    def _encontrar_movible(self, origen: GrupoLab, destino: GrupoLab,
+                           matriculas: Dict[str, Tuple[str, bool]]) -> Optional[str]:
+        """Encontrar alumno del origen que el destino acepte y que se pueda mover sin conflicto"""
+        mascara_origen = self.mascaras_grupo[id(origen)]
+        mascara_destino = self.mascaras_grupo[id(destino)]
+        for alumno_id in origen.alumnos:
+            self.contadores["candidatos_paridad_evaluados"] += 1
+            datos = matriculas.get(alumno_id)
+            if datos is None or not self._grupo_acepta(destino, *datos):
+                continue
 
-            if not any((fecha, destino.franja) in ocupacion for fecha in destino.fechas):
+            # Simular el movimiento con máscaras: quitar origen y comprobar destino
+            ocupacion = self.ocupacion_global.get(alumno_id, 0) & ~mascara_origen
+            if not ocupacion & mascara_destino:
                 return alumno_id
 
         return None
@@ -1962,7 +2721,7 @@ class AsignadorAlumnos:
         """Verificación de seguridad para detectar conflictos de fechas."""
 
         # Construir mapa de sesiones
-        sesiones: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        sesiones: Dict[str, List[Tuple[str, str, int, str]]] = {}
         for g in self.grupos_creados:
             for alumno in g.alumnos:
                 sesiones.setdefault(alumno, []).extend(
@@ -1972,7 +2731,7 @@ class AsignadorAlumnos:
         # Detectar conflictos
         conflictos = 0
         for alumno, lista in sesiones.items():
-            slots: Dict[Tuple[str, str], List[str]] = {}
+            slots: Dict[Tuple[int, str], List[str]] = {}
             for asig, label, fecha, franja in lista:
                 slots.setdefault((fecha, franja), []).append(f"{asig}:{label}")
 
@@ -1980,7 +2739,7 @@ class AsignadorAlumnos:
                 if len(grupos) > 1:
                     conflictos += 1
                     if conflictos <= 5:
-                        print(f"        • {alumno}: {fecha} {franja} -> {grupos}")
+                        print(f"        • {alumno}: {ordinal_a_ddmmyyyy(fecha)} {franja} -> {grupos}")
 
         if conflictos == 0:
             print(f"        ✓ No se detectaron conflictos")
@@ -2012,7 +2771,7 @@ class AsignadorAlumnos:
         print(f"  • Grupos pares:               {pares}")
         print(f"  • Grupos impares:             {impares}")
 
-        sesiones = sum(len(s) for s in self.ocupacion_global.values())
+        sesiones = sum(bin(mascara).count("1") for mascara in self.ocupacion_global.values())
         print(f"\n  OCUPACIÓN HORARIA:")
         print(f"  {'─' * 50}")
         print(f"  • Total sesiones registradas: {sesiones}")
@@ -2051,6 +2810,7 @@ class AsignadorAlumnos:
                         f"{semestre}:{asignatura} - "
                         f"{count} alumno(s) sin asignar por capacidad insuficiente"
                     )
+            self._marcar_orden(ETAPA_CAPACIDAD, asignatura)
 
 
 # ========= FASE 6: ASIGNADOR DE PROFESORES =========
@@ -2068,18 +2828,33 @@ class AsignadorProfesores:
         profesores_data: Datos de profesores desde configuración
         prof_carga_total: Carga total de grupos por profesor
         prof_carga_por_asig: Carga de grupos por profesor y asignatura
+        profesores_por_asignatura: Índice invertido asignatura -> profesores que la imparten
+        profesores_por_dia: Índice invertido día -> profesores que trabajan ese día
+        franjas_bloqueadas: Por profesor, (día, franja normalizada) bloqueados
+        heaps_candidatos: Por (asignatura, día), montículo de (carga_total, carga_asig, desempate, prof_id)
+        claves_desempate: Por profesor, su nombre (o una posición aleatoria con semilla de desempate)
+        fechas_bloqueadas_prof: Por profesor, fechas no disponibles (ordinales de día)
+        sesiones_profesor: Por profesor, sesiones (fecha, franja) de los grupos que ya tiene
     """
 
-    def __init__(self, cfg: Dict, grupos_creados: List['GrupoLab']):
+    def __init__(self, cfg: Dict, grupos_creados: List['GrupoLab'], progreso: Optional[NotificadorProgreso] = None,
+                 disponibilidad: Optional[IndiceDisponibilidad] = None, semilla_desempate: Optional[int] = None):
         """
         Inicializar el asignador de profesores.
 
         Args:
             cfg: Configuración completa del sistema
             grupos_creados: Lista de grupos con alumnos (de Fase 5)
+            progreso: Notificador de progreso de la fase (opcional)
+            disponibilidad: Índice de disponibilidad compartido (se construye si no se pasa)
+            semilla_desempate: Semilla para desempatar candidatos igual de cargados al azar
+                               en lugar de por nombre (opcional)
         """
         self.cfg = cfg
+        self.semilla_desempate = semilla_desempate
+        self.disponibilidad = disponibilidad or IndiceDisponibilidad(cfg)
         self.grupos_creados = grupos_creados
+        self.progreso = progreso or NotificadorProgreso()
         self.avisos: List[str] = []
         self.conflictos_profesores: List[Dict] = []
 
@@ -2094,6 +2869,30 @@ class AsignadorProfesores:
         self.prof_carga_total: Dict[str, int] = {}  # prof_id -> número total de grupos
         self.prof_carga_por_asig: Dict[Tuple[str, str], int] = {}  # (prof_id, asignatura) -> número grupos
 
+        # Índices de elegibilidad (6.1) y montículos de candidatos por (asignatura, día)
+        self.profesores_por_asignatura: Dict[str, Set[str]] = {}
+        self.profesores_por_dia: Dict[str, Set[str]] = {}
+        self.nombres_profesores: Dict[str, str] = {}
+        self.claves_desempate: Dict[str, Union[str, int]] = {}
+        self.heaps_candidatos: Dict[Tuple[str, str], List[Tuple[int, int, Union[str, int], str]]] = {}
+        self.heaps_de_profesor: Dict[str, List[Tuple[str, str]]] = {}
+
+        # Franjas bloqueadas ya normalizadas: prof_id -> {(día, franja)}
+        self.franjas_bloqueadas: Dict[str, Set[Tuple[str, str]]] = {
+            prof_id: self._leer_franjas_bloqueadas(prof_data)
+            for prof_id, prof_data in self.profesores_data.items()
+        }
+
+        # Fechas reales: bloqueos del profesor y sesiones ya asignadas, para desempatar
+        # entre candidatos igual de cargados evitando los choques que tendría que resolver la Fase 7
+        self.fechas_bloqueadas_prof: Dict[str, Set[int]] = self.disponibilidad.fechas_bloqueadas_prof
+        self.sesiones_profesor: Dict[str, Set[Tuple[int, str]]] = {}
+
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"profesores_evaluados": 0, "entradas_obsoletas": 0,
+                                           "empates_por_fechas": 0, "choques_fecha_asignados": 0,
+                                           "grupos_asignados": 0, "grupos_sin_profesor": 0}
+
     def ejecutar(self) -> tuple[bool, list[GrupoLab], list[str], list[dict]]:
         """
         Ejecutar la FASE 6 completa.
@@ -2129,11 +2928,23 @@ class AsignadorProfesores:
         """
         print("\n[6.1] Construyendo índices de profesores...")
 
-        # Inicializar cargas en 0
-        for prof_id in self.profesores_data.keys():
+        # Inicializar cargas en 0 (la carga por asignatura se lee con .get, sin rellenar)
+        for prof_id, prof_data in self.profesores_data.items():
             self.prof_carga_total[prof_id] = 0
-            for grupo in self.grupos_creados:
-                self.prof_carga_por_asig[(prof_id, grupo.asignatura)] = 0
+            self.nombres_profesores[prof_id] = self._get_nombre_profesor(prof_id)
+
+            # Índices invertidos asignatura -> profesores y día -> profesores
+            for asignatura in prof_data.get("asignaturas_imparte", []) or []:
+                self.profesores_por_asignatura.setdefault(asignatura, set()).add(prof_id)
+            for dia in prof_data.get("dias_trabajo", []) or []:
+                self.profesores_por_dia.setdefault(dia, set()).add(prof_id)
+
+        # Desempate entre candidatos con las mismas cargas: por nombre, o al azar con semilla
+        self.claves_desempate = dict(self.nombres_profesores)
+        if self.semilla_desempate is not None:
+            orden = list(self.profesores_data)
+            random.Random(self.semilla_desempate).shuffle(orden)
+            self.claves_desempate = {prof_id: i for i, prof_id in enumerate(orden)}
 
         print(f"    ✓ Profesores disponibles: {len(self.profesores_data)}")
 
@@ -2148,13 +2959,17 @@ class AsignadorProfesores:
 
         grupos_asignados = 0
         grupos_sin_profesor = 0
+        self.progreso.iniciar(len(self.grupos_creados), "Asignando profesores")
 
         for grupo in self.grupos_creados:
+            self.progreso.avanzar(1, f"Grupo {grupo.label}")
+
             # Buscar mejor profesor para este grupo
             profesor_id = self._pick_profesor_para_grupo(
                 asignatura=grupo.asignatura,
                 dia=grupo.dia,
-                franja=grupo.franja
+                franja=grupo.franja,
+                fechas=grupo.fechas
             )
 
             if profesor_id:
@@ -2163,8 +2978,13 @@ class AsignadorProfesores:
                 grupo.profesor = self._get_nombre_profesor(profesor_id)
                 grupos_asignados += 1
 
-                # Actualizar cargas
+                # Actualizar cargas y sesiones ocupadas
                 self._actualizar_carga(profesor_id, grupo.asignatura)
+                self.contadores["choques_fecha_asignados"] += self._choques_fecha(profesor_id, grupo.fechas,
+                                                                                  grupo.franja)
+                self.sesiones_profesor.setdefault(profesor_id, set()).update(
+                    (fecha, grupo.franja) for fecha in grupo.fechas
+                )
             else:
                 # No hay profesor disponible
                 grupo.profesor_id = None
@@ -2189,6 +3009,8 @@ class AsignadorProfesores:
                     "detalle": f"No hay profesores disponibles para {grupo.dia} {grupo.franja}"
                 })
 
+        self.contadores["grupos_asignados"] = grupos_asignados
+        self.contadores["grupos_sin_profesor"] = grupos_sin_profesor
         print(f"    ✓ Grupos con profesor: {grupos_asignados}/{len(self.grupos_creados)}")
         if grupos_sin_profesor > 0:
             print(f"    ⚠ Grupos sin profesor: {grupos_sin_profesor}")
@@ -2197,60 +3019,109 @@ class AsignadorProfesores:
         self,
         asignatura: str,
         dia: str,
-        franja: str
+        franja: str,
+        fechas: Optional[List[int]] = None
     ) -> Optional[str]:
         """
         Seleccionar mejor profesor disponible para un grupo.
 
         Implementa heurística de mínima carga:
-            1. Filtrar profesores elegibles (imparte asignatura, trabaja día, sin bloqueo)
-            2. Ordenar por: carga total, carga en asignatura, nombre
-            3. Seleccionar el menos cargado
+            1. Candidatos: montículo del (asignatura, día), ordenado por carga total,
+               carga en asignatura, desempate (nombre) e ID
+            2. Sacar el menos cargado que no tenga la franja bloqueada
+            3. Entre los de igual carga total, preferir el que menos sesiones del grupo tenga
+               ocupadas o en fechas no disponibles (después, carga en asignatura, desempate e ID)
 
         Args:
             asignatura: Código de la asignatura
             dia: Día de la semana
             franja: Franja horaria (formato HH:MM-HH:MM)
+            fechas: Fechas de las sesiones del grupo (ordinales de día)
 
         Returns:
             ID del profesor seleccionado, o None si no hay ninguno disponible
         """
-        # Normalizar franja
         franja_norm = self._normalize_time_range(franja)
+        heap = self._heap_candidatos(asignatura, dia)
+
+        # Sacar entradas vigentes (cargas actuales) hasta tener todos los candidatos sin la franja
+        # bloqueada con la carga total mínima; todas se devuelven al montículo al terminar
+        sacadas = []
+        empatados = []
+        while heap:
+            carga_total, carga_asig, _, prof_id = heap[0]
+            if empatados and carga_total != empatados[0][0][0]:
+                break
+            entrada = heapq.heappop(heap)
+            self.contadores["profesores_evaluados"] += 1
+            if (carga_total != self.prof_carga_total.get(prof_id, 0)
+                    or carga_asig != self.prof_carga_por_asig.get((prof_id, asignatura), 0)):
+                self.contadores["entradas_obsoletas"] += 1
+                continue
+            sacadas.append(entrada)
+            if (dia, franja_norm) not in self.franjas_bloqueadas.get(prof_id, ()):
+                empatados.append((entrada, self._choques_fecha(prof_id, fechas or [], franja)))
 
-        # Lista de candidatos: (carga_total, carga_asignatura, nombre, prof_id)
-        candidatos = []
+        for entrada in sacadas:
+            heapq.heappush(heap, entrada)
 
-        # FASE 1: Filtrar profesores elegibles
-        for prof_id, prof_data in self.profesores_data.items():
-            # ¿Imparte la asignatura?
-            if not self._prof_imparte_asignatura(prof_id, asignatura):
-                continue
+        if not empatados:
+            return None
 
-            # ¿Trabaja ese día?
-            if not self._prof_trabaja_dia(prof_id, dia):
-                continue
+        # Menos choques de fecha; a igualdad, el resto del orden del montículo (carga_asig, desempate, ID)
+        entrada, choques = min(empatados, key=lambda e: (e[1], e[0][1:]))
+        if choques < empatados[0][1]:
+            self.contadores["empates_por_fechas"] += 1
+        return entrada[3]
 
-            # ¿Tiene bloqueada la franja?
-            if self._prof_bloqueado_slot(prof_id, dia, franja_norm):
-                continue
+    def _choques_fecha(self, prof_id: str, fechas: List[int], franja: str) -> int:
+        """
+        Contar las sesiones de un grupo que chocarían con el profesor: fecha no disponible
+        o ya tiene otro grupo en esa fecha y franja.
 
-            # Es elegible → agregar a candidatos
-            nombre = self._get_nombre_profesor(prof_id)
-            carga_total = self.prof_carga_total.get(prof_id, 0)
-            carga_asig = self.prof_carga_por_asig.get((prof_id, asignatura), 0)
+        Args:
+            prof_id: ID del profesor
+            fechas: Fechas de las sesiones del grupo (ordinales de día)
+            franja: Franja horaria del grupo
 
-            candidatos.append((carga_total, carga_asig, nombre, prof_id))
+        Returns:
+            Número de sesiones con choque
+        """
+        bloqueadas = self.fechas_bloqueadas_prof.get(prof_id, ())
+        ocupadas = self.sesiones_profesor.get(prof_id, ())
+        return sum(1 for fecha in fechas if fecha in bloqueadas or (fecha, franja) in ocupadas)
 
-        # Si no hay candidatos, retornar None
-        if not candidatos:
-            return None
+    def _heap_candidatos(self, asignatura: str, dia: str) -> List[Tuple[int, int, Union[str, int], str]]:
+        """
+        Montículo de candidatos de un (asignatura, día): profesores que imparten la asignatura
+        y trabajan ese día (intersección de los índices invertidos), con sus cargas actuales.
 
-        # FASE 2: Seleccionar el menos cargado
-        candidatos.sort()  # Ordena por: (carga_total, carga_asig, nombre, prof_id)
-        profesor_id = candidatos[0][3]
+        Se crea la primera vez que se pide. Cuando cambia la carga de un profesor se añade
+        una entrada nueva a sus montículos y la antigua queda obsoleta (se descarta al salir).
 
-        return profesor_id
+        Args:
+            asignatura: Código de la asignatura
+            dia: Día de la semana
+
+        Returns:
+            Montículo de (carga_total, carga_asig, desempate, prof_id)
+        """
+        clave = (asignatura, dia)
+        heap = self.heaps_candidatos.get(clave)
+        if heap is None:
+            elegibles = (self.profesores_por_asignatura.get(asignatura, set())
+                         & self.profesores_por_dia.get(dia, set()))
+            heap = [self._entrada_candidato(prof_id, asignatura) for prof_id in elegibles]
+            heapq.heapify(heap)
+            self.heaps_candidatos[clave] = heap
+            for prof_id in elegibles:
+                self.heaps_de_profesor.setdefault(prof_id, []).append(clave)
+        return heap
+
+    def _entrada_candidato(self, prof_id: str, asignatura: str) -> Tuple[int, int, Union[str, int], str]:
+        """Clave de orden de un candidato: (carga_total, carga_asig, desempate, prof_id)"""
+        return (self.prof_carga_total.get(prof_id, 0), self.prof_carga_por_asig.get((prof_id, asignatura), 0),
+                self.claves_desempate[prof_id], prof_id)
 
     def _actualizar_carga(self, profesor_id: str, asignatura: str) -> None:
         """
@@ -2267,8 +3138,30 @@ class AsignadorProfesores:
         key = (profesor_id, asignatura)
         self.prof_carga_por_asig[key] = self.prof_carga_por_asig.get(key, 0) + 1
 
+        # Entradas con las cargas nuevas en los montículos del profesor
+        for asig, dia in self.heaps_de_profesor.get(profesor_id, []):
+            heapq.heappush(self.heaps_candidatos[(asig, dia)], self._entrada_candidato(profesor_id, asig))
+
     # ========= MÉTODOS DE VALIDACIÓN =========
 
+    def _prof_elegible(self, prof_id: str, asignatura: str, dia: str, franja: str) -> bool:
+        """
+        Verificar si un profesor puede dar un grupo: imparte la asignatura, trabaja ese día
+        y no tiene bloqueada la franja.
+
+        Args:
+            prof_id: ID del profesor
+            asignatura: Código de la asignatura
+            dia: Día de la semana
+            franja: Franja horaria (se normaliza)
+
+        Returns:
+            True si el profesor es elegible para el grupo
+        """
+        return (self._prof_imparte_asignatura(prof_id, asignatura)
+                and self._prof_trabaja_dia(prof_id, dia)
+                and not self._prof_bloqueado_slot(prof_id, dia, self._normalize_time_range(franja)))
+
     def _prof_imparte_asignatura(self, prof_id: str, asignatura: str) -> bool:
         """
         Verificar si un profesor imparte una asignatura.
@@ -2311,22 +3204,25 @@ class AsignadorProfesores:
         Returns:
             True si el profesor tiene el slot bloqueado
         """
-        prof_data = self.profesores_data.get(prof_id, {})
-        bloques = prof_data.get("horarios_bloqueados", {}) or {}
+        return (dia, franja_norm) in self.franjas_bloqueadas.get(prof_id, ())
 
-        # Obtener franjas bloqueadas para ese día
-        franjas_dia = bloques.get(dia)
+    def _leer_franjas_bloqueadas(self, prof_data: Dict) -> Set[Tuple[str, str]]:
+        """
+        Leer los horarios bloqueados de un profesor como (día, franja normalizada).
 
-        if isinstance(franjas_dia, list):
-            # Lista de franjas
-            franjas_norm = [self._normalize_time_range(f) for f in franjas_dia]
-        elif isinstance(franjas_dia, dict):
-            # Diccionario de franjas
-            franjas_norm = [self._normalize_time_range(f) for f in franjas_dia.keys()]
-        else:
-            franjas_norm = []
+        Args:
+            prof_data: Datos del profesor en la configuración
 
-        return franja_norm in franjas_norm
+        Returns:
+            Conjunto de (día, franja) bloqueados
+        """
+        bloques = prof_data.get("horarios_bloqueados", {}) or {}
+        franjas = set()
+        for dia, franjas_dia in bloques.items():
+            if isinstance(franjas_dia, (list, dict)):
+                # Lista o diccionario de franjas
+                franjas.update((dia, self._normalize_time_range(f)) for f in franjas_dia)
+        return franjas
 
     # ========= MÉTODOS AUXILIARES =========
 
@@ -2432,10 +3328,13 @@ class ProgramadorFechas:
         cfg: Configuración completa del sistema
         grupos_creados: Lista de grupos con alumnos y profesores (Fases 5 y 6)
         mapeo_fechas: Mapeo de fechas calculado en Fase 2
+        calendario: Pools de fechas del calendario (compartidos con la Fase 2)
         conflictos_profesores: Lista de conflictos de profesores detectados
         conflictos_aulas: Lista de conflictos de aulas detectados
         prof_ocupado_fecha: Índice de ocupación de profesores por fecha
         aula_ocupada_fecha: Índice de ocupación de aulas por fecha
+        grupos_franja_aula: Índice (fecha, franja, aula) -> {label: nº grupos} con las fechas de cada grupo
+        grupos_franja_profesor: Índice (fecha, franja, profesor_id) -> {label: nº grupos}
         profesores_data: Datos de profesores desde configuración
         aulas_data: Datos de aulas desde configuración
     """
@@ -2444,7 +3343,11 @@ class ProgramadorFechas:
             self,
             cfg: Dict,
             grupos_creados: List['GrupoLab'],
-            mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[str]]
+            mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]],
+            progreso: Optional[NotificadorProgreso] = None,
+            calendario: Optional[CalendarioFechas] = None,
+            disponibilidad: Optional[IndiceDisponibilidad] = None,
+            semilla_desempate: Optional[int] = None
     ):
         """
         Inicializar el programador de fechas.
@@ -2453,18 +3356,36 @@ class ProgramadorFechas:
             cfg: Configuración completa del sistema
             grupos_creados: Lista de grupos con alumnos y profesores
             mapeo_fechas: Mapeo de fechas de Fase 2 (semestre, asig, grupo, dia, letra) -> [fechas]
+            progreso: Notificador de progreso de la fase (opcional)
+            calendario: Pools de fechas del calendario (opcional, se construye si no se pasa)
+            disponibilidad: Índice de disponibilidad compartido (opcional, se construye si no se pasa)
+            semilla_desempate: Semilla para validar los grupos en un orden aleatorio (opcional;
+                               sin ella, en el orden de grupos_creados)
         """
         self.cfg = cfg
         self.grupos_creados = grupos_creados
         self.mapeo_fechas = mapeo_fechas
+        self.semilla_desempate = semilla_desempate
+        self.progreso = progreso or NotificadorProgreso()
+        self.calendario = calendario or CalendarioFechas(cfg)
 
         # Listas de conflictos
         self.conflictos_profesores: List[Dict[str, Any]] = []
         self.conflictos_aulas: List[Dict[str, Any]] = []
 
-        # Índices de ocupación por fecha (fecha_iso + franja)
-        self.prof_ocupado_fecha: Dict[Tuple[str, str, str], bool] = {}  # (prof_id, fecha_iso, franja)
-        self.aula_ocupada_fecha: Dict[Tuple[str, str, str], bool] = {}  # (aula, fecha_iso, franja)
+        # Índices de ocupación por fecha (ordinal de día + franja)
+        self.prof_ocupado_fecha: Dict[Tuple[str, int, str], bool] = {}  # (prof_id, fecha, franja)
+        self.aula_ocupada_fecha: Dict[Tuple[str, int, str], bool] = {}  # (aula, fecha, franja)
+
+        # Índices de grupos por fecha y franja (sustituyen al recorrido de todos los grupos)
+        self.grupos_franja_aula: Dict[Tuple[int, str, Any], Dict[str, int]] = {}  # (fecha, franja, aula)
+        self.grupos_franja_profesor: Dict[Tuple[int, str, Any], Dict[str, int]] = {}  # (fecha, franja, prof_id)
+        self._claves_indexadas: Dict[int, List[Tuple[int, str, Any, Any]]] = {}  # id(grupo) -> [(fecha, franja, aula, prof_id)]
+
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"comprobaciones_fecha": 0, "consultas_indice_franja": 0,
+                                           "fechas_alternativas_probadas": 0, "cambios_aula": 0,
+                                           "conflictos_resueltos": 0, "conflictos_sin_resolver": 0}
 
         # Datos auxiliares
         self.profesores_data = (
@@ -2479,6 +3400,11 @@ class ProgramadorFechas:
                               .get("datos", {})
                           ) or {}
 
+        # Fechas bloqueadas (ordinales), aulas por asignatura y capacidades, leídas una sola vez
+        self.disponibilidad = disponibilidad or IndiceDisponibilidad(cfg)
+        self.fechas_bloqueadas_prof: Dict[str, Set[int]] = self.disponibilidad.fechas_bloqueadas_prof
+        self.fechas_bloqueadas_aula: Dict[str, Set[int]] = self.disponibilidad.fechas_bloqueadas_aula
+
     def ejecutar(self) -> Tuple[bool, List['GrupoLab'], List[Dict[str, Any]], List[Dict[str, Any]]]:
         """
         Ejecutar la FASE 7 completa.
@@ -2554,6 +3480,10 @@ class ProgramadorFechas:
                     "detalle": f"Sin fechas calculadas en Fase 2 para letra {grupo.letra}"
                 })
 
+        # Indexar las fechas iniciales de todos los grupos por (fecha, franja)
+        for grupo in self.grupos_creados:
+            self._indexar_grupo(grupo)
+
         print(f"    ✓ Grupos con fechas asignadas: {grupos_con_fechas}/{len(self.grupos_creados)}")
         if grupos_sin_fechas > 0:
             print(f"    ⚠ Grupos sin fechas: {grupos_sin_fechas}")
@@ -2563,7 +3493,8 @@ class ProgramadorFechas:
         7.2 - Validar cada fecha asignada y resolver conflictos.
 
         Para cada fecha de cada grupo verifica disponibilidad de profesor y aula.
-        Si hay conflicto, busca fecha alternativa o cambia de aula.
+        Si hay conflicto, busca fecha alternativa o cambia de aula. Los primeros grupos
+        validados se quedan sus fechas, así que el orden decide quién tiene que moverse.
         """
         print("\n[7.2] Validando conflictos y buscando alternativas...")
 
@@ -2571,8 +3502,14 @@ class ProgramadorFechas:
         conflictos_resueltos = 0
         conflictos_sin_solucion = 0
         cambios_realizados = []
+        self.progreso.iniciar(len(self.grupos_creados), "Validando fechas")
 
-        for grupo in self.grupos_creados:
+        orden_grupos = list(self.grupos_creados)
+        if self.semilla_desempate is not None:
+            random.Random(self.semilla_desempate).shuffle(orden_grupos)
+
+        for grupo in orden_grupos:
+            self.progreso.avanzar(1, f"Grupo {grupo.label}")
             if not grupo.fechas:
                 continue
 
@@ -2580,25 +3517,26 @@ class ProgramadorFechas:
             fechas_validadas = []
             conflictos_grupo = 0
 
-            for fecha_dd in grupo.fechas:
-                fecha_iso = self._ddmmyyyy_to_iso(fecha_dd)
-
+            for fecha in grupo.fechas:
                 # Verificar si esta fecha ya está ocupada o bloqueada
-                if self._fecha_valida_para_grupo(grupo, fecha_dd, fecha_iso):
+                if self._fecha_valida_para_grupo(grupo, fecha):
                     # Fecha válida, marcar como ocupada
-                    fechas_validadas.append(fecha_dd)
-                    self._ocupar_fecha(grupo, fecha_iso, fecha_dd)
+                    fechas_validadas.append(fecha)
+                    self._ocupar_fecha(grupo, fecha)
                 else:
                     total_conflictos += 1
                     conflictos_grupo += 1
+                    fecha_dd = ordinal_a_ddmmyyyy(fecha)
 
                     # Conflicto, buscar alternativa
-                    fecha_alternativa = self._buscar_fecha_alternativa(grupo, fecha_dd, fecha_iso)
+                    fecha_alternativa = self._buscar_fecha_alternativa(grupo, fecha)
 
-                    if fecha_alternativa:
+                    if fecha_alternativa is not None:
                         conflictos_resueltos += 1
                         fechas_validadas.append(fecha_alternativa)
-                        cambios_realizados.append(f"{grupo.label}: {fecha_dd} → {fecha_alternativa} ({grupo.aula}) - {grupo.asignatura} - {grupo.franja} - {grupo.profesor} - {grupo.fechas}")
+                        if len(cambios_realizados) < 300:
+                            fechas_grupo = [ordinal_a_ddmmyyyy(f) for f in grupo.fechas]
+                            cambios_realizados.append(f"{grupo.label}: {fecha_dd} → {ordinal_a_ddmmyyyy(fecha_alternativa)} ({grupo.aula}) - {grupo.asignatura} - {grupo.franja} - {grupo.profesor} - {fechas_grupo}")
                     else:
                         conflictos_sin_solucion += 1
                         # No se encontró alternativa
@@ -2614,8 +3552,12 @@ class ProgramadorFechas:
                             "detalle": f"Conflicto sin resolver (profesor o aula no disponible en {fecha_dd})"
                         })
 
-            # Actualizar fechas del grupo con las validadas
+            # Actualizar fechas del grupo con las validadas (y su aula definitiva en el índice)
             grupo.fechas = fechas_validadas
+            self._reindexar_grupo(grupo)
+
+        self.contadores["conflictos_resueltos"] = conflictos_resueltos
+        self.contadores["conflictos_sin_resolver"] = conflictos_sin_solucion
 
         # === LOG RESUMEN ===
         print(f"    ✓ Total conflictos detectados: {total_conflictos}")
@@ -2626,43 +3568,38 @@ class ProgramadorFechas:
             for cambio in cambios_realizados[:300]:
                 print(f"       - {cambio}")
 
-    def _fecha_valida_para_grupo(self, grupo: 'GrupoLab', fecha_dd: str, fecha_iso: str) -> bool:
+    def _fecha_valida_para_grupo(self, grupo: 'GrupoLab', fecha: int) -> bool:
         """
         Verificar si una fecha es válida para un grupo.
 
         Args:
             grupo: Grupo a verificar
-            fecha_dd: Fecha en formato dd/mm/yyyy
-            fecha_iso: Fecha en formato yyyy-mm-dd
+            fecha: Fecha (ordinal de día)
 
         Returns:
             True si la fecha es válida (profesor y aula disponibles)
         """
+        self.contadores["comprobaciones_fecha"] += 1
 
         # Verificar profesor
         if grupo.profesor_id:
-            if self._prof_fecha_no_disponible(grupo.profesor_id, fecha_dd):
+            if self._prof_fecha_no_disponible(grupo.profesor_id, fecha):
                 return False
-            if self._prof_ocupado_en_fecha(grupo.profesor_id, fecha_iso, grupo.franja):
+            if self._prof_ocupado_en_fecha(grupo.profesor_id, fecha, grupo.franja):
                 return False
 
         # Verificar aula
         if grupo.aula and grupo.aula != "—":
-            if not self._aula_disponible_en_fecha(grupo.aula, fecha_dd, fecha_iso, grupo.franja):
+            if not self._aula_disponible_en_fecha(grupo.aula, fecha, grupo.franja):
                 return False
 
         # Verificar si ya hay otro grupo de laboratorio en esta franja
-        if self._franja_ocupada_por_otro_grupo(grupo, fecha_iso):
+        if self._franja_ocupada_por_otro_grupo(grupo, fecha):
             return False
 
         return True
 
-    def _buscar_fecha_alternativa(
-            self,
-            grupo: 'GrupoLab',
-            fecha_original_dd: str,
-            fecha_original_iso: str
-    ) -> Optional[str]:
+    def _buscar_fecha_alternativa(self, grupo: 'GrupoLab', fecha_original: int) -> Optional[int]:
         """
         Buscar una fecha alternativa cuando hay conflicto.
 
@@ -2674,11 +3611,10 @@ class ProgramadorFechas:
 
         Args:
             grupo: Grupo con conflicto
-            fecha_original_dd: Fecha original con conflicto
-            fecha_original_iso: Fecha original en ISO
+            fecha_original: Fecha original con conflicto (ordinal de día)
 
         Returns:
-            Fecha alternativa (dd/mm/yyyy) o None
+            Fecha alternativa (ordinal de día) o None
         """
         # Obtener pool de fechas para ese día
         pool = self._obtener_pool_fechas(grupo.semestre, grupo.dia)
@@ -2687,10 +3623,7 @@ class ProgramadorFechas:
             return None
 
         # Índice de la fecha original dentro del pool
-        try:
-            idx = pool.index(fecha_original_dd)
-        except ValueError:
-            idx = -1
+        idx = self.calendario.posicion(self._clave_semestre(grupo.semestre), grupo.dia, fecha_original)
 
         # Ordenar prioridades: primero posteriores, luego anteriores
         fechas_reordenadas = []
@@ -2701,51 +3634,48 @@ class ProgramadorFechas:
         else:
             fechas_reordenadas = pool  # si no se encuentra, mantener orden normal
 
-        # Buscar fecha alternativa cercana
-        for fecha_dd in fechas_reordenadas:
-            # Saltar la fecha original
-            #if fecha_dd == fecha_original_dd:
-            #    continue
+        # Aulas alternativas de la asignatura (de mayor a menor capacidad)
+        aulas_alt = self._obtener_aulas_asignatura(grupo.asignatura)
 
-            fecha_iso = self._ddmmyyyy_to_iso(fecha_dd)
+        # Buscar fecha alternativa cercana
+        for fecha in fechas_reordenadas:
+            self.contadores["fechas_alternativas_probadas"] += 1
 
             # Verificar si es válida con aula actual
-            if self._fecha_valida_para_grupo(grupo, fecha_dd, fecha_iso):
-                self._ocupar_fecha(grupo, fecha_iso, fecha_dd)
-                return fecha_dd
+            if self._fecha_valida_para_grupo(grupo, fecha):
+                self._ocupar_fecha(grupo, fecha)
+                return fecha
 
             # Si no funciona con aula actual, intentar alternativas
-            aulas_alt = self._obtener_aulas_asignatura(grupo.asignatura)
-
             for aula_alt in aulas_alt:
                 if aula_alt == grupo.aula:
                     continue
 
-                if self._aula_disponible_en_fecha(aula_alt, fecha_dd, fecha_iso, grupo.franja):
+                if self._aula_disponible_en_fecha(aula_alt, fecha, grupo.franja):
                     # Cambiar aula y asignar fecha
+                    self.contadores["cambios_aula"] += 1
                     grupo.aula = aula_alt
                     grupo.capacidad = self._get_capacidad_aula(aula_alt)
-                    self._ocupar_fecha(grupo, fecha_iso, fecha_dd)
-                    return fecha_dd
+                    self._ocupar_fecha(grupo, fecha)
+                    return fecha
 
         return None
 
-    def _ocupar_fecha(self, grupo: 'GrupoLab', fecha_iso: str, fecha_dd: str) -> None:
+    def _ocupar_fecha(self, grupo: 'GrupoLab', fecha: int) -> None:
         """
         Marcar fecha como ocupada para profesor y aula.
 
         Args:
             grupo: Grupo al que se asigna la fecha
-            fecha_iso: Fecha en formato ISO (yyyy-mm-dd)
-            fecha_dd: Fecha en formato dd/mm/yyyy (no usado, mantiene firma)
+            fecha: Fecha (ordinal de día)
         """
         # Marcar profesor como ocupado
         if grupo.profesor_id:
-            self.prof_ocupado_fecha[(grupo.profesor_id, fecha_iso, grupo.franja)] = True
+            self.prof_ocupado_fecha[(grupo.profesor_id, fecha, grupo.franja)] = True
 
         # Marcar aula como ocupada
         if grupo.aula and grupo.aula != "—":
-            self.aula_ocupada_fecha[(grupo.aula, fecha_iso, grupo.franja)] = True
+            self.aula_ocupada_fecha[(grupo.aula, fecha, grupo.franja)] = True
 
     def _ordenar_fechas(self) -> None:
         """
@@ -2755,217 +3685,161 @@ class ProgramadorFechas:
 
         for grupo in self.grupos_creados:
             if grupo.fechas:
-                grupo.fechas = self._sort_ddmmyyyy_asc(grupo.fechas)
+                grupo.fechas = sorted(grupo.fechas)
 
         print(f"    ✓ Fechas ordenadas para {len(self.grupos_creados)} grupos")
 
     # ========= MÉTODOS DE VALIDACIÓN =========
 
-    def _prof_fecha_no_disponible(self, prof_id: str, fecha_dd: str) -> bool:
+    def _prof_fecha_no_disponible(self, prof_id: str, fecha: int) -> bool:
         """
         Verificar si profesor tiene fecha bloqueada.
 
         Args:
             prof_id: ID del profesor
-            fecha_dd: Fecha en formato dd/mm/yyyy
+            fecha: Fecha (ordinal de día)
 
         Returns:
             True si el profesor tiene bloqueada la fecha
         """
-        prof_data = self.profesores_data.get(prof_id, {})
-        fechas_no_disp = [f.strip() for f in (prof_data.get("fechas_no_disponibles") or [])]
-        return fecha_dd in fechas_no_disp
+        return fecha in self.fechas_bloqueadas_prof.get(prof_id, ())
 
-    def _prof_ocupado_en_fecha(self, prof_id: str, fecha_iso: str, franja: str) -> bool:
+    def _prof_ocupado_en_fecha(self, prof_id: str, fecha: int, franja: str) -> bool:
         """
         Verificar si profesor está ocupado en fecha y franja.
 
         Args:
             prof_id: ID del profesor
-            fecha_iso: Fecha en formato yyyy-mm-dd
+            fecha: Fecha (ordinal de día)
             franja: Franja horaria
 
         Returns:
             True si el profesor está ocupado
         """
-        return self.prof_ocupado_fecha.get((prof_id, fecha_iso, franja), False)
+        return self.prof_ocupado_fecha.get((prof_id, fecha, franja), False)
 
-    def _aula_disponible_en_fecha(self, aula: str, fecha_dd: str, fecha_iso: str, franja: str) -> bool:
+    def _aula_disponible_en_fecha(self, aula: str, fecha: int, franja: str) -> bool:
         """
         Verificar si aula está disponible en fecha y franja.
 
         Args:
             aula: Código del aula
-            fecha_dd: Fecha en formato dd/mm/yyyy
-            fecha_iso: Fecha en formato yyyy-mm-dd
+            fecha: Fecha (ordinal de día)
             franja: Franja horaria
 
         Returns:
             True si el aula está disponible
         """
-        aula_data = self.aulas_data.get(aula, {})
-        fechas_no_disp = [f.strip() for f in (aula_data.get("fechas_no_disponibles") or [])]
-        if fecha_dd in fechas_no_disp:
+        if fecha in self.fechas_bloqueadas_aula.get(aula, ()):
             return False
 
-        return not self.aula_ocupada_fecha.get((aula, fecha_iso, franja), False)
+        return not self.aula_ocupada_fecha.get((aula, fecha, franja), False)
 
-    def _franja_ocupada_por_otro_grupo(self, grupo: 'GrupoLab', fecha_iso: str) -> bool:
+    def _franja_ocupada_por_otro_grupo(self, grupo: 'GrupoLab', fecha: int) -> bool:
         """
         Verificar si ya hay otro grupo de laboratorio ocupando esta franja en la fecha.
 
         Args:
             grupo: Grupo que queremos asignar
-            fecha_iso: Fecha en formato yyyy-mm-dd
+            fecha: Fecha (ordinal de día)
 
         Returns:
             True si la franja ya está ocupada por otro grupo
         """
-        # Recorrer todos los grupos ya creados
-        for otro_grupo in self.grupos_creados:
-            # Saltar el mismo grupo
-            if otro_grupo.label == grupo.label:
-                continue
+        self.contadores["consultas_indice_franja"] += 1
 
-            # Verificar si el otro grupo tiene esta fecha asignada
-            fecha_dd = self._iso_to_ddmmyyyy(fecha_iso)
-            if fecha_dd in otro_grupo.fechas:
-                # Verificar si coinciden en franja horaria
-                if otro_grupo.franja == grupo.franja:
-                    # Solo es conflicto si comparten aula o profesor
-                    if otro_grupo.aula == grupo.aula:
-                        return True  # Mismo aula - conflicto
-                    if otro_grupo.profesor_id == grupo.profesor_id:
-                        return True  # Mismo profesor - conflicto
-                    # Si no, NO hay conflicto
+        # Solo es conflicto si otro grupo (otro label) comparte fecha, franja y aula o profesor
+        for indice, valor in ((self.grupos_franja_aula, grupo.aula),
+                              (self.grupos_franja_profesor, grupo.profesor_id)):
+            labels = indice.get((fecha, grupo.franja, valor))
+            if labels and len(labels) > (1 if grupo.label in labels else 0):
+                return True
 
         return False
 
-    # ========= MÉTODOS AUXILIARES =========
-
-    def _obtener_pool_fechas(self, semestre: str, dia: str) -> List[str]:
+    def _indexar_grupo(self, grupo: 'GrupoLab') -> None:
         """
-        Obtener pool de fechas disponibles para un día del semestre.
+        Añadir las fechas actuales del grupo a los índices por (fecha, franja).
 
-        Args:
-            semestre: Código del semestre (ej: "semestre_1")
-            dia: Día de la semana
+        Guarda aula y profesor_id del momento; en esta fase solo cambian mientras se procesa
+        el propio grupo (que se salta a sí mismo), por eso basta con reindexarlo al terminar.
 
-        Returns:
-            Lista de fechas en formato dd/mm/yyyy
+        Args:
+            grupo: Grupo a indexar
         """
-        cal = self.cfg.get("configuracion", {}).get("calendario", {}).get("datos", {}) or {}
+        claves = [(fecha, grupo.franja) for fecha in dict.fromkeys(grupo.fechas or [])]
+        for fecha, franja in claves:
+            for indice, valor in ((self.grupos_franja_aula, grupo.aula),
+                                  (self.grupos_franja_profesor, grupo.profesor_id)):
+                labels = indice.setdefault((fecha, franja, valor), {})
+                labels[grupo.label] = labels.get(grupo.label, 0) + 1
 
-        sem_norm=normalizar_semestre(semestre)
+        self._claves_indexadas[id(grupo)] = [(fecha, franja, grupo.aula, grupo.profesor_id)
+                                             for fecha, franja in claves]
 
-        key = sem_norm if sem_norm.startswith("semestre_") else f"semestre_{sem_norm}"
-        semestre_datos = cal.get(key, {})
-
-        dia_normalizado = dia.strip().capitalize()
-        reemplazos = {"Miercoles": "Miércoles", "Sabado": "Sábado"}
-        dia_normalizado = reemplazos.get(dia_normalizado, dia_normalizado)
-
-        dias_filtrados = [d for d in semestre_datos.values()
-                          if isinstance(d, dict) and d.get("horario_asignado") == dia_normalizado]
-
-        dias_filtrados.sort(key=lambda d: d.get("fecha", ""))
-
-        fechas = []
-        for d in dias_filtrados:
-            fecha = d.get("fecha", "")
-            if re.match(r"^\d{4}-\d{2}-\d{2}$", fecha):
-                fechas.append(self._iso_to_ddmmyyyy(fecha))
-
-        return fechas
-
-    def _obtener_aulas_asignatura(self, asignatura: str) -> List[str]:
+    def _reindexar_grupo(self, grupo: 'GrupoLab') -> None:
         """
-        Obtener lista de aulas disponibles para una asignatura.
+        Quitar del índice las fechas indexadas del grupo y volver a indexar las actuales.
 
         Args:
-            asignatura: Código de la asignatura
-
-        Returns:
-            Lista de códigos de aulas
+            grupo: Grupo cuyas fechas o aula han cambiado
         """
-        aulas = []
-
-        for nombre, aula_data in self.aulas_data.items():
-            if not aula_data.get("disponible", False):
-                continue
-
-            asigs = aula_data.get("asignaturas_asociadas", []) or []
-            if asignatura in asigs:
-                aulas.append(nombre)
+        for fecha, franja, aula, profesor_id in self._claves_indexadas.pop(id(grupo), []):
+            for indice, valor in ((self.grupos_franja_aula, aula),
+                                  (self.grupos_franja_profesor, profesor_id)):
+                clave = (fecha, franja, valor)
+                labels = indice[clave]
+                labels[grupo.label] -= 1
+                if not labels[grupo.label]:
+                    del labels[grupo.label]
+                    if not labels:
+                        del indice[clave]
+
+        self._indexar_grupo(grupo)
 
-        return aulas
+    # ========= MÉTODOS AUXILIARES =========
 
-    def _get_capacidad_aula(self, aula: str) -> int:
+    def _obtener_pool_fechas(self, semestre: str, dia: str) -> List[int]:
         """
-        Obtener capacidad de un aula.
+        Obtener pool de fechas disponibles para un día del semestre.
 
         Args:
-            aula: Código del aula
+            semestre: Código del semestre (ej: "semestre_1")
+            dia: Día de la semana
 
         Returns:
-            Capacidad del aula
+            Lista de fechas como ordinales de día (cacheada en el calendario; no modificar)
         """
-        try:
-            return int(self.aulas_data.get(aula, {}).get("capacidad", 10000))
-        except:
-            return 10000
+        return self.calendario.pool(self._clave_semestre(semestre), dia)
 
-    def _ddmmyyyy_to_iso(self, fecha: str) -> str:
-        """
-        Convertir fecha de formato dd/mm/yyyy a yyyy-mm-dd.
-
-        Args:
-            fecha: Fecha en formato dd/mm/yyyy
-
-        Returns:
-            Fecha en formato yyyy-mm-dd
-        """
-        m = re.match(r"^(\d{2})/(\d{2})/(\d{4})$", fecha.strip())
-        if not m:
-            return fecha
-        d, mo, y = m.groups()
-        return f"{y}-{mo}-{d}"
+    def _clave_semestre(self, semestre: str) -> str:
+        """Clave del calendario para un semestre (ej: "1 Semestre" -> "semestre_1")"""
+        sem_norm = normalizar_semestre(semestre)
+        return sem_norm if sem_norm.startswith("semestre_") else f"semestre_{sem_norm}"
 
-    def _iso_to_ddmmyyyy(self, fecha: str) -> str:
+    def _obtener_aulas_asignatura(self, asignatura: str) -> List[str]:
         """
-        Convertir fecha de formato yyyy-mm-dd a dd/mm/yyyy.
+        Obtener lista de aulas disponibles para una asignatura.
 
         Args:
-            fecha: Fecha en formato yyyy-mm-dd
+            asignatura: Código de la asignatura
 
         Returns:
-            Fecha en formato dd/mm/yyyy
+            Lista de códigos de aulas, de mayor a menor capacidad
         """
-        m = re.match(r"^(\d{4})-(\d{2})-(\d{2})$", fecha.strip())
-        if not m:
-            return fecha
-        y, mo, d = m.groups()
-        return f"{d}/{mo}/{y}"
+        return [aula for aula, _ in self.disponibilidad.aulas_asignatura(asignatura)]
 
-    def _sort_ddmmyyyy_asc(self, fechas: List[str]) -> List[str]:
+    def _get_capacidad_aula(self, aula: str) -> int:
         """
-        Ordenar fechas de más cercana a más tardía.
+        Obtener capacidad de un aula.
 
         Args:
-            fechas: Lista de fechas en formato dd/mm/yyyy
+            aula: Código del aula
 
         Returns:
-            Lista ordenada de fechas
+            Capacidad del aula (10000 si no está configurada o no es numérica)
         """
-
-        def key_fun(s: str):
-            m = re.match(r"^(\d{2})/(\d{2})/(\d{4})$", s.strip())
-            if not m:
-                return (9999, 99, 99)
-            d, mo, y = map(int, m.groups())
-            return (y, mo, d)
-
-        return sorted(fechas, key=key_fun)
+        return self.disponibilidad.capacidad(aula, 10000)
 
     def _mostrar_resumen(self) -> None:
         """7.4 - Mostrar resumen de la programación de fechas."""
@@ -3041,6 +3915,9 @@ class GeneradorOutputs:
         self.avisos = avisos or []
         self.alertas_semana_inicio = alertas_semana_inicio or []
 
+        # Contadores de trabajo (métricas de la fase)
+        self.contadores: Dict[str, int] = {"grupos_serializados": 0, "sesiones_serializadas": 0}
+
     def ejecutar(self, output_path: Path) -> Tuple[bool, Dict]:
         """
         Ejecutar la FASE 8 completa.
@@ -3053,15 +3930,8 @@ class GeneradorOutputs:
                 - bool: True si se guardó correctamente
                 - Dict: Configuración actualizada
         """
-        print("\n" + "=" * 70)
-        print("FASE 8: OUTPUTS - GENERACIÓN DE RESULTADOS")
-        print("=" * 70)
-
-        # 9.1 - Convertir grupos a formato JSON
-        grupos_json = self._convertir_grupos_a_json()
-
-        # 9.2 - Estructurar resultados_organizacion
-        resultados = self._estructurar_resultados(grupos_json)
+        # 9.1 y 9.2 - Generar resultados_organizacion
+        resultados = self.generar()
 
         # 9.3 - Actualizar configuración
         self._actualizar_configuracion(resultados)
@@ -3074,6 +3944,23 @@ class GeneradorOutputs:
 
         return exito, self.cfg
 
+    def generar(self) -> Dict:
+        """
+        Generar la sección resultados_organizacion en memoria (9.1 y 9.2), sin tocar cfg ni disco.
+
+        Returns:
+            Diccionario con la estructura completa de resultados
+        """
+        print("\n" + "=" * 70)
+        print("FASE 8: OUTPUTS - GENERACIÓN DE RESULTADOS")
+        print("=" * 70)
+
+        # 9.1 - Convertir grupos a formato JSON
+        grupos_json = self._convertir_grupos_a_json()
+
+        # 9.2 - Estructurar resultados_organizacion
+        return self._estructurar_resultados(grupos_json)
+
     def _convertir_grupos_a_json(self) -> List[Dict]:
         """
         9.1 - Convertir lista de GrupoLab a diccionarios JSON.
@@ -3095,7 +3982,7 @@ class GeneradorOutputs:
                 'dia': grupo.dia,
                 'franja': grupo.franja,
                 'letra': grupo.letra,
-                'fechas': grupo.fechas or [],
+                'fechas': [ordinal_a_ddmmyyyy(fecha) for fecha in grupo.fechas or []],
                 'alumnos': list(grupo.alumnos) if grupo.alumnos else [],
                 'capacidad': grupo.capacidad,
                 'mixta': bool(grupo.is_slot_mixto),
@@ -3103,7 +3990,9 @@ class GeneradorOutputs:
                 'grupo_doble': grupo.grupo_doble or ""
             }
             grupos_json.append(grupo_dict)
+            self.contadores["sesiones_serializadas"] += len(grupo_dict['fechas'])
 
+        self.contadores["grupos_serializados"] = len(grupos_json)
         print(f"  ✓ Convertidos {len(grupos_json)} grupos a formato JSON")
         return grupos_json
 
@@ -3238,8 +4127,7 @@ class GeneradorOutputs:
         print("\n[9.4] Guardando archivo JSON...")
 
         try:
-            with output_path.open("w", encoding="utf-8") as fh:
-                json.dump(self.cfg, fh, ensure_ascii=False, indent=2)
+            save_configuration(self.cfg, output_path)
 
             # Verificar tamaño del archivo
             size_mb = output_path.stat().st_size / (1024 * 1024)
@@ -3296,27 +4184,34 @@ class PopupManager:
     Utilidades para mostrar pop-ups informativos y de error.
 
     Si no existe un QApplication activo (ejecución en consola),
-    los mensajes se muestran por terminal.
+    los mensajes se muestran por terminal. PyQt6 solo se importa
+    cuando la GUI ya lo ha cargado, así el motor puede ejecutarse
+    en servidores sin pantalla ni Qt instalado.
     """
 
     @staticmethod
     def _hay_app() -> bool:
         """Comprobar si hay un QApplication activo"""
+        if "PyQt6.QtWidgets" not in sys.modules:
+            return False
         try:
+            from PyQt6.QtWidgets import QApplication
             return QApplication.instance() is not None
         except Exception:
             return False
 
     @staticmethod
     def _mostrar_qmessagebox(
-        icono: QMessageBox.Icon,
+        icono: str,
         titulo: str,
         mensaje: str,
         detalle: Optional[str] = None
     ) -> None:
-        """Mostrar un QMessageBox con el estilo indicado"""
+        """Mostrar un QMessageBox con el estilo indicado (icono: "Critical", "Warning", "Information")"""
+        from PyQt6.QtWidgets import QMessageBox
+
         box = QMessageBox()
-        box.setIcon(icono)
+        box.setIcon(getattr(QMessageBox.Icon, icono))
         box.setWindowTitle(titulo)
         box.setText(mensaje)
         if detalle:
@@ -3327,7 +4222,7 @@ class PopupManager:
     def show_critical(titulo: str, mensaje: str, detalle: Optional[str] = None) -> None:
         """Mostrar un mensaje de error crítico"""
         if PopupManager._hay_app():
-            PopupManager._mostrar_qmessagebox(QMessageBox.Icon.Critical, titulo, mensaje, detalle)
+            PopupManager._mostrar_qmessagebox("Critical", titulo, mensaje, detalle)
         else:
             # Modo consola
             print("\n" + "=" * 70)
@@ -3342,7 +4237,7 @@ class PopupManager:
     def show_warning(titulo: str, mensaje: str, detalle: Optional[str] = None) -> None:
         """Mostrar una advertencia no crítica"""
         if PopupManager._hay_app():
-            PopupManager._mostrar_qmessagebox(QMessageBox.Icon.Warning, titulo, mensaje, detalle)
+            PopupManager._mostrar_qmessagebox("Warning", titulo, mensaje, detalle)
         else:
             print("\n" + "-" * 70)
             print(f"ADVERTENCIA: {titulo}")
@@ -3356,7 +4251,7 @@ class PopupManager:
     def show_info(titulo: str, mensaje: str, detalle: Optional[str] = None) -> None:
         """Mostrar un mensaje informativo"""
         if PopupManager._hay_app():
-            PopupManager._mostrar_qmessagebox(QMessageBox.Icon.Information, titulo, mensaje, detalle)
+            PopupManager._mostrar_qmessagebox("Information", titulo, mensaje, detalle)
         else:
             print("\n" + "-" * 70)
             print(titulo)
@@ -3367,37 +4262,734 @@ class PopupManager:
             print("-" * 70)
 
 
-# ========= MAIN - TESTING DE FASE 8/8 =========
-def main():
+# ========= MENSAJES DE ERROR POR FASE =========
+MENSAJES_ERROR_FASE: Dict[int, Tuple[str, str]] = {
+    1: (
+        "❌ Error en Fase 1",
+        "La Fase 1 (Carga y Validación de Datos) no se ha podido completar.\n\n"
+        "Esta fase verifica que el archivo de configuración contiene toda "
+        "la información necesaria para continuar con el proceso. "
+        "Los fallos más habituales son:\n\n"
+        " • Faltan secciones obligatorias en el archivo JSON.\n"
+        " • Alguna asignatura no tiene parámetros básicos definidos.\n"
+        " • Grupos, horarios o aulas están incompletos o mal configurados.\n"
+        " • Revisar si es compatible el número de sesiones en Asignaturas y el número de letras en Horarios.\n"
+        " • Valores vacíos o inconsistentes (semana_inicio, num_sesiones, letras de grupos...) revisa calendario.\n\n"
+        "Revisa el panel de errores y corrige las configuraciones indicadas."
+    ),
+    2: (
+        "❌ Error en Fase 2",
+        "La Fase 2 (Cálculo de fechas) no ha podido completarse.\n\n"
+        "Esto suele ocurrir cuando:\n"
+        " • No se definió correctamente la semana de inicio.\n"
+        " • El número de sesiones no coincide con la duración del semestre.\n"
+        " • Hay huecos en el calendario o semanas fuera de rango.\n\n"
+        "Revisa la configuración del calendario en el módulo correspondiente."
+    ),
+    3: (
+        "❌ Error en Fase 3",
+        "La Fase 3 (Asignación de Aula Preferente) ha fallado.\n\n"
+        "Generalmente ocurre cuando:\n"
+        " • No existen aulas registradas en el sistema.\n"
+        " • La asignatura no tiene definida un aula válida.\n"
+        " • La capacidad del aula es insuficiente.\n\n"
+        "Revisa la configuración de Aulas y las Asignaturas afectadas."
+    ),
+    4: (
+        "❌ Error en Fase 4",
+        "La Fase 4 (Creación de Grupos de laboratorio) no se ha completado.\n\n"
+        "Posibles causas:\n"
+        " • La asignatura no tiene configurados los grupos correctamente.\n"
+        " • El horario tiene grupos con demasiadas letras o inconsistencias.\n\n"
+        "Revisa el módulo 'Grupos' y 'Horarios' para corregir la configuración."
+    ),
+    5: (
+        "❌ Error en Fase 5",
+        "La Fase 5 (Asignación de alumnos) no pudo realizarse.\n\n"
+        "Esto suele deberse a:\n"
+        " • Alumnos matriculados en asignaturas sin grupos configurados.\n"
+        " • Grupos saturados que no admiten más alumnos.\n"
+        " • Datos incompletos en la matrícula de alumnos.\n"
+        " • Existen alumnos sin información completa o con datos incorrectos.\n\n"
+        "Revisa el módulo 'Alumnos' y asegúrate de que los grupos tienen capacidad."
+    ),
+    6: (
+        "❌ Error en Fase 6",
+        "La Fase 6 (Asignación de profesores) ha fallado.\n\n"
+        "Causas frecuentes:\n"
+        " • Profesores sin disponibilidad compatible con los grupos.\n"
+        " • Falta de profesores asignados a ciertas asignaturas.\n"
+        " • Conflictos entre múltiples grupos asignados al mismo profesor.\n\n"
+        "Revisa el módulo 'Profesores' y asegúrate de que todos tienen horarios válidos."
+    ),
+    7: (
+        "❌ Error en Fase 7",
+        "La Fase 7 (Programación de Fechas del laboratorio) no pudo completarse.\n\n"
+        "Suele producirse cuando:\n"
+        " • Existen conflictos de disponibilidad entre profesores y grupos.\n"
+        " • No hay aulas libres para algunas sesiones.\n"
+        " • Las fechas generadas no encajan en el calendario configurado.\n"
+        " • Hay grupos que quedaron sin sesión/fecha asignada.\n\n"
+        "Revisa conflictos de profesores, aulas y disponibilidad del calendario."
+    ),
+    8: (
+        "❌ Error en Fase 8",
+        "La Fase 8 (Generación del archivo final) ha fallado.\n\n"
+        "Esto puede deberse a:\n"
+        " • Falta de permisos para guardar el archivo.\n"
+        " • La ruta de destino no es válida o está bloqueada.\n"
+        " • El JSON resultante es inconsistente.\n"
+        " • El archivo está siendo usado por otro programa.\n\n"
+        "Revisa la ruta de guardado y asegúrate de que el archivo no está bloqueado."
+    ),
+}
+
+
+def _fase_fallida(numero: int, errores: List[ErrorValidacion], medidor: Optional[MedidorFases] = None) -> ResultadoMotor:
+    """Registrar en el log el fallo de una fase y construir el resultado correspondiente"""
+    print("\n" + "=" * 70)
+    if numero == 1:
+        print("✗ FASE 1 FALLÓ - Corrija los errores críticos antes de continuar")
+    else:
+        print(f"✗ FASE {numero} FALLÓ")
+    print("=" * 70)
+    metricas = medidor.metricas() if medidor else {}
+    return ResultadoMotor(exito=False, fase_fallida=numero, errores=errores, metricas=metricas)
+
+
+# ========= BÚSQUEDA LOCAL =========
+def _crear_busqueda_local(
+        cfg: Dict,
+        opciones: OpcionesMotor,
+        grupos: List[GrupoLab],
+        asignador_alumnos: 'AsignadorAlumnos',
+        asignador_profesores: 'AsignadorProfesores',
+        programador_fechas: 'ProgramadorFechas'
+) -> BusquedaLocal:
     """
-    Función principal para ejecución completa del Motor de Organización.
+    Preparar la búsqueda local con las reglas de las Fases 5-7 (compatibilidad de códigos,
+    elegibilidad de profesores, pools de fechas desde semana_inicio, fechas de la Fase 2 y fechas
+    no disponibles).
 
-    Ejecuta las 8 fases del sistema:
-        FASE 1: Carga y Validación
-        FASE 2: Cálculo de Fechas por Letra
-        FASE 3: Aula Preferente
-        FASE 4: Crear Grupos de Laboratorio
-        FASE 5: Asignar Alumnos
-        FASE 6: Asignar Profesores
-        FASE 7: Programar Fechas
-        FASE 8: Outputs (Generación JSON)
+    Args:
+        cfg: Configuración completa (semana_inicio de cada código)
+        opciones: Opciones de la ejecución (presupuesto, iteraciones y semilla)
+        grupos: Grupos tras la Fase 7
+        asignador_alumnos: Asignador de la Fase 5 (matrículas y regla de códigos)
+        asignador_profesores: Asignador de la Fase 6 (elegibilidad y nombres de profesores)
+        programador_fechas: Programador de la Fase 7 (calendario, mapeo de la Fase 2 y fechas bloqueadas)
+
+    Returns:
+        BusquedaLocal lista para ejecutar
     """
+    asignaturas_data = cfg.get("configuracion", {}).get("asignaturas", {}).get("datos", {}) or {}
+    pools: Dict[Tuple[str, str, Optional[int]], List[int]] = {}
+
+    def pool_fechas(grupo: GrupoLab) -> List[int]:
+        # Como en la Fase 2: las fechas del día a partir de la semana semana_inicio
+        semana_inicio = semana_inicio_grupo(asignaturas_data, grupo)
+        clave = (grupo.semestre, grupo.dia, semana_inicio)
+        if clave not in pools:
+            pool = programador_fechas._obtener_pool_fechas(grupo.semestre, grupo.dia)
+            pools[clave] = pool[int(semana_inicio) - 1:] if semana_inicio else pool
+        return pools[clave]
+
+    matriculas: Dict[str, Dict[str, Tuple[str, bool]]] = {}
+    for asignatura, mapeo in asignador_alumnos.mapeos_alumnos.items():
+        alumnos = matriculas.setdefault(asignatura, {})
+        for alumno_id, codigo in mapeo["simples"].items():
+            alumnos[alumno_id] = (codigo, False)
+        for alumno_id, codigo in mapeo["dobles"].items():
+            alumnos[alumno_id] = (codigo, True)
+
+    return BusquedaLocal(
+        grupos,
+        matriculas,
+        grupo_acepta=asignador_alumnos._grupo_acepta,
+        profesor_elegible=asignador_profesores._prof_elegible,
+        nombre_profesor=asignador_profesores._get_nombre_profesor,
+        profesores=list(asignador_profesores.profesores_data),
+        pool_fechas=pool_fechas,
+        fechas_previstas=lambda g: programador_fechas.mapeo_fechas.get(
+            (g.semestre, g.asignatura, g.grupo_simple, g.dia, g.letra), []),
+        fechas_bloqueadas_prof=programador_fechas.fechas_bloqueadas_prof,
+        fechas_bloqueadas_aula=programador_fechas.fechas_bloqueadas_aula,
+        presupuesto_s=opciones.presupuesto_busqueda_s,
+        iteraciones_max=opciones.iteraciones_busqueda,
+        semilla=opciones.semilla
+    )
 
-    # Buscar configuración por defecto
-    config_path = get_config_path()
 
-    if not config_path.exists():
-        print(f"ERROR: No se encontró el archivo de configuración en: {config_path}")
-        PopupManager.show_critical(
-            "❌ Error",
-            "No se encuentra el archivo de configuración configuracion_labs.json.\n\n"
-            f"Revisa que el archivo exista en la ruta esperada: {config_path}."
-        )
+def _quitar_sin_asignar_colocados(
+        colocados: Set[Tuple[str, str]],
+        asignador_alumnos: 'AsignadorAlumnos',
+        avisos: List[str],
+        conflictos_alumnos: List[Dict]
+) -> None:
+    """
+    Quitar los avisos y conflictos SIN_ASIGNAR de los alumnos que la búsqueda local ha colocado.
+
+    Args:
+        colocados: (asignatura, alumno_id) colocados por la búsqueda
+        asignador_alumnos: Asignador de la Fase 5 (semestres de cada asignatura)
+        avisos: Avisos de la Fase 5 (se modifican en su sitio)
+        conflictos_alumnos: Conflictos de alumnos de la Fase 5 (se modifican en su sitio)
+    """
+    if not colocados:
         return
 
+    prefijos = tuple(
+        f"{asignador_alumnos.semestres.get(asignatura, '1º Semestre')}:{asignatura} - Alumno {alumno_id} ("
+        for asignatura, alumno_id in colocados
+    )
+    avisos[:] = [a for a in avisos if not a.startswith(prefijos)]
+    conflictos_alumnos[:] = [
+        c for c in conflictos_alumnos
+        if not (c.get("tipo") == "SIN_ASIGNAR" and (c.get("asignatura"), c.get("alumno")) in colocados)
+    ]
+
+
+def _actualizar_conflictos_busqueda(
+        busqueda: BusquedaLocal,
+        conflictos_profesores: List[List[Dict]],
+        conflictos_profesores_fecha: List[Dict],
+        conflictos_aulas_fecha: List[Dict]
+) -> None:
+    """
+    Ajustar los conflictos de profesores y aulas de las Fases 6 y 7 a los grupos tras la búsqueda local.
+
+    La búsqueda no quita ni añade sesiones ni profesores a los grupos, así que los grupos sin
+    profesor, sin fechas o con sesiones sin resolver siguen igual; sí puede cambiar el profesor
+    de un grupo (se actualiza su nombre en los conflictos) y mover sesiones. Las reservas dobles
+    que deja y no estaban antes se añaden a la Fase 7 con tipo CONFLICTO_DOBLE_RESERVA.
+
+    Args:
+        busqueda: Búsqueda local ya ejecutada
+        conflictos_profesores: Listas de conflictos de profesores de las Fases 6 y 7 (se modifican en su sitio)
+        conflictos_profesores_fecha: Conflictos de profesores de la Fase 7 (se añaden las reservas dobles)
+        conflictos_aulas_fecha: Conflictos de aulas de la Fase 7 (se añaden las reservas dobles)
+    """
+    grupos_sesion: Dict[Tuple[str, str], GrupoLab] = {}
+    for grupo in busqueda.grupos:
+        grupos_sesion.setdefault((grupo.asignatura, grupo.label), grupo)
+
+    for lista in conflictos_profesores:
+        for conflicto in lista:
+            grupo = grupos_sesion.get((conflicto.get("asignatura"), conflicto.get("grupo")))
+            if grupo is not None and grupo.profesor_id and conflicto.get("profesor") != "SIN ASIGNAR":
+                conflicto["profesor"] = grupo.profesor
+
+    for (tipo, recurso, fecha, franja), sesiones in sorted(busqueda.reservas_creadas.items()):
+        lista, nombre = (conflictos_profesores_fecha, "Profesor") if tipo == "profesor" else \
+            (conflictos_aulas_fecha, "Aula")
+        # El primer grupo de la sesión se queda la reserva; se lista cada uno de los demás
+        for sesion in sesiones[1:]:
+            grupo = grupos_sesion[sesion]
+            otros = ", ".join(f"{asig}:{label}" for asig, label in sesiones if (asig, label) != sesion)
+            lista.append({
+                "semestre": grupo.semestre,
+                "asignatura": grupo.asignatura,
+                "grupo": grupo.label,
+                "dia": grupo.dia,
+                "franja": franja,
+                "fecha": ordinal_a_ddmmyyyy(fecha),
+                "aula": grupo.aula or "—",
+                "profesor": grupo.profesor or "—",
+                "tipo": CONFLICTO_DOBLE_RESERVA,
+                "detalle": f"{nombre} {recurso} reservado a la vez para {otros} (búsqueda local)"
+            })
+
+
+# ========= EJECUCIÓN EN PARALELO =========
+def _clave_particion(semestre: Any) -> str:
+    """Semestre de un grupo o de una clave de mapeo_fechas (ej: "1º Semestre" -> "semestre_1")"""
+    return f"semestre_{normalizar_semestre(semestre)}"
+
+
+def _particionar_grupos(grupos: List[GrupoLab]) -> Dict[str, List[int]]:
+    """Posiciones de los grupos de cada semestre dentro de la lista, por orden de semestre"""
+    particiones: Dict[str, List[int]] = {}
+    for i, grupo in enumerate(grupos):
+        particiones.setdefault(_clave_particion(grupo.semestre), []).append(i)
+    return dict(sorted(particiones.items()))
+
+
+def componentes_asignaturas(asignador: 'AsignadorAlumnos') -> List[List[str]]:
+    """
+    Componentes conexas del grafo de interacción entre asignaturas de la Fase 5.
+
+    Dos asignaturas interactúan si algún alumno está matriculado en las dos y sus grupos comparten
+    alguna sesión (fecha, franja): solo entonces la asignación de una puede cambiar lo que cabe
+    en la otra. Las asignaturas de componentes distintas se pueden asignar por separado con el
+    mismo resultado. Como los semestres no comparten fechas, nunca hay una componente con
+    asignaturas de los dos.
+
+    Args:
+        asignador: AsignadorAlumnos con los mapeos ya construidos (_construir_mapeos)
+
+    Returns:
+        Componentes (listas de asignaturas en el orden de grupos_por_asignatura), en el orden de su
+        primera asignatura
+    """
+    mascaras: Dict[str, int] = {}
+    for asignatura, grupos in asignador.grupos_por_asignatura.items():
+        mascara = 0
+        for grupo in grupos:
+            mascara |= asignador.mascaras_grupo[id(grupo)]
+        mascaras[asignatura] = mascara
+
+    padre = {asignatura: asignatura for asignatura in mascaras}
+
+    def raiz(asignatura: str) -> str:
+        while padre[asignatura] != asignatura:
+            padre[asignatura] = padre[padre[asignatura]]
+            asignatura = padre[asignatura]
+        return asignatura
+
+    asignaturas_alumno: Dict[str, List[str]] = {}
+    for asignatura, mapeo in asignador.mapeos_alumnos.items():
+        for tipo in ("dobles", "simples"):
+            for alumno_id in mapeo[tipo]:
+                asignaturas_alumno.setdefault(alumno_id, []).append(asignatura)
+
+    revisados: Set[Tuple[str, str]] = set()
+    for asignaturas in asignaturas_alumno.values():
+        for i, asig_a in enumerate(asignaturas):
+            for asig_b in asignaturas[i + 1:]:
+                par = (asig_a, asig_b) if asig_a < asig_b else (asig_b, asig_a)
+                if par in revisados:
+                    continue
+                revisados.add(par)
+                raiz_a, raiz_b = raiz(asig_a), raiz(asig_b)
+                if raiz_a != raiz_b and mascaras[asig_a] & mascaras[asig_b]:
+                    padre[raiz_b] = raiz_a
+
+    componentes: Dict[str, List[str]] = {}
+    for asignatura in mascaras:
+        componentes.setdefault(raiz(asignatura), []).append(asignatura)
+    return list(componentes.values())
+
+
+def _particionar_componentes(cfg: Dict, grupos: List[GrupoLab], opciones: OpcionesMotor
+                             ) -> Tuple[Dict[str, List[int]], int, 'AsignadorAlumnos']:
+    """
+    Repartir las componentes de la Fase 5 en tantos bloques como procesos.
+
+    Cada proceso recibe un bloque (no una componente) para no pagar el envío por cada componente
+    pequeña. Se reparten de mayor a menor número de matrículas al bloque menos cargado, así que el
+    reparto es siempre el mismo para la misma entrada.
+
+    Returns:
+        Tupla con las posiciones de los grupos de cada bloque, el número de componentes y el
+        asignador de toda la configuración con los mapeos construidos (para _ordenar_como_secuencial)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        asignador = AsignadorAlumnos(cfg, grupos, modo_asignacion=opciones.modo_asignacion)
+        asignador._construir_mapeos()
+    componentes = componentes_asignaturas(asignador)
+
+    def matriculas(componente: List[str]) -> int:
+        return sum(len(asignador.mapeos_alumnos[a]["dobles"]) + len(asignador.mapeos_alumnos[a]["simples"])
+                   for a in componente) + 1
+
+    num_bloques = min(opciones.procesos, len(componentes))
+    cargas = [0] * num_bloques
+    bloque_asignatura: Dict[str, int] = {}
+    for componente in sorted(componentes, key=matriculas, reverse=True):
+        bloque = min(range(num_bloques), key=lambda b: (cargas[b], b))
+        cargas[bloque] += matriculas(componente)
+        for asignatura in componente:
+            bloque_asignatura[asignatura] = bloque
+
+    particiones: Dict[str, List[int]] = {}
+    for i, grupo in enumerate(grupos):
+        particiones.setdefault(f"bloque_{bloque_asignatura[grupo.asignatura] + 1}", []).append(i)
+    return (dict(sorted(particiones.items(), key=lambda x: int(x[0].split("_")[1]))), len(componentes),
+            asignador)
+
+
+def _ordenar_como_secuencial(asignador: 'AsignadorAlumnos', avisos: List[str], conflictos: List[Dict],
+                             orden_avisos: List[Tuple[int, Any]], orden_conflictos: List[Tuple[int, Any]]
+                             ) -> Tuple[List[str], List[Dict]]:
+    """
+    Poner los avisos y conflictos de la Fase 5 en paralelo en el orden en que los da la secuencial.
+
+    En secuencial se generan por etapas (5.1 dobles, 5.2 simples, 5.3 paridad, 5.4 capacidad) y,
+    dentro de cada una, por unidades (asignatura o código) en un orden fijo. Cada unidad está entera
+    en un bloque y sus entradas salen en el mismo orden que en secuencial, así que basta una
+    ordenación estable por (etapa, posición de la unidad en el orden secuencial).
+
+    Args:
+        asignador: AsignadorAlumnos de toda la configuración con los mapeos construidos
+        avisos, conflictos: Listas unidas de todos los bloques
+        orden_avisos, orden_conflictos: (etapa, unidad) de cada entrada (ver _marcar_orden)
+
+    Returns:
+        Tupla con los avisos y los conflictos en el orden secuencial
+    """
+    posiciones: Dict[Tuple[int, Any], int] = {}
+    for etapa, es_doble in ((ETAPA_DOBLES, True), (ETAPA_SIMPLES, False)):
+        for i, (asignatura, _, _) in enumerate(asignador._ordenar_asignaturas(es_doble)):
+            posiciones[(etapa, asignatura)] = i
+    for grupo in asignador.grupos_creados:
+        posiciones.setdefault((ETAPA_PARIDAD, (grupo.asignatura, grupo.grupo_simple)), len(posiciones))
+
+    def clave(marca: Tuple[int, Any]) -> Tuple[int, int]:
+        return marca[0], posiciones.get(marca, 0)
+
+    indices = sorted(range(len(conflictos)), key=lambda i: clave(orden_conflictos[i]))
+    conflictos = [conflictos[i] for i in indices]
+
+    # 5.4 recorre alumnos_sin_asignar, que se llena en el orden de los conflictos
+    for conflicto in conflictos:
+        posiciones.setdefault((ETAPA_CAPACIDAD, conflicto["asignatura"]), len(posiciones))
+
+    indices = sorted(range(len(avisos)), key=lambda i: clave(orden_avisos[i]))
+    return [avisos[i] for i in indices], conflictos
+
+
+def _cfg_alumnos_asignaturas(cfg: Dict, asignaturas: Set[str]) -> Dict:
+    """Configuración mínima de la Fase 5 para unas asignaturas: sus datos y las matrículas en ellas"""
+    configuracion = cfg.get("configuracion", {})
+    asignaturas_data = configuracion.get("asignaturas", {}).get("datos", {}) or {}
+    alumnos_data = configuracion.get("alumnos", {}).get("datos", {}) or {}
+
+    alumnos: Dict[str, Dict] = {}
+    for alumno_id, alumno_data in alumnos_data.items():
+        matriculas = {asig: info for asig, info in (alumno_data.get("asignaturas_matriculadas", {}) or {}).items()
+                      if asig in asignaturas}
+        if matriculas:
+            alumnos[alumno_id] = {"asignaturas_matriculadas": matriculas}
+
+    return {"configuracion": {
+        "asignaturas": {"datos": {a: d for a, d in asignaturas_data.items() if a in asignaturas}},
+        "alumnos": {"datos": alumnos}
+    }}
+
+
+def _cfg_fechas_semestre(cfg: Dict) -> Dict:
+    """Configuración mínima de la Fase 7: profesores, aulas y calendario"""
+    configuracion = cfg.get("configuracion", {})
+    return {"configuracion": {s: configuracion.get(s, {}) for s in ("profesores", "aulas", "calendario")}}
+
+
+def _fase5_particion(cfg: Dict, grupos: List[GrupoLab], modo_asignacion: str) -> Tuple[Any, ...]:
+    """Fase 5 de un bloque de asignaturas (en un proceso del pool); devuelve también su log"""
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        asignador = AsignadorAlumnos(cfg, grupos, modo_asignacion=modo_asignacion)
+        exito, grupos, avisos, conflictos = asignador.ejecutar()
+    return (exito, grupos, avisos, conflictos, asignador.orden_avisos, asignador.orden_conflictos,
+            asignador.contadores, log.getvalue())
+
+
+def _fase7_semestre(cfg: Dict, grupos: List[GrupoLab],
+                    mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]]) -> Tuple[Any, ...]:
+    """Fase 7 de un semestre (en un proceso del pool); devuelve también su log"""
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        programador = ProgramadorFechas(cfg, grupos, mapeo_fechas)
+        exito, grupos, conflictos_profesores, conflictos_aulas = programador.ejecutar()
+    return exito, grupos, conflictos_profesores, conflictos_aulas, programador.contadores, log.getvalue()
+
+
+def _por_semestre(opciones: OpcionesMotor, grupos: List[GrupoLab]) -> bool:
+    """Si compensa repartir una fase por semestres (hay procesos y más de un semestre)"""
+    return opciones.procesos > 1 and len({_clave_particion(g.semestre) for g in grupos}) > 1
+
+
+def _ejecutar_en_paralelo(
+        funcion: Callable[..., Tuple[Any, ...]],
+        grupos: List[GrupoLab],
+        particiones: Dict[str, List[int]],
+        argumentos: Callable[[str, List[GrupoLab]], Tuple[Any, ...]],
+        procesos: int,
+        progreso: NotificadorProgreso
+) -> Tuple[bool, List[GrupoLab], List[List[Any]], Dict[str, int]]:
+    """
+    Ejecutar una fase por particiones independientes en un pool de procesos y unir los resultados.
+
+    La unión no depende del orden en que terminan los procesos: cada grupo vuelve a su posición
+    en la lista y las listas de avisos y conflictos se concatenan en el orden de las particiones
+    (la Fase 5 las reordena después con _ordenar_como_secuencial).
+
+    Args:
+        funcion: _fase5_particion o _fase7_semestre
+        grupos: Todos los grupos (no se modifican; los procesos trabajan sobre copias)
+        particiones: Clave -> posiciones en grupos (semestres o bloques de componentes), no vacío
+        argumentos: (clave, grupos de la partición) -> argumentos de funcion
+        procesos: Número máximo de procesos
+        progreso: Notificador de la fase (avanza un paso por partición terminada)
+
+    Returns:
+        Tupla con:
+            - bool: True si la fase terminó bien en todas las particiones
+            - List[GrupoLab]: Grupos resultantes, en el orden de entrada
+            - List[List]: Cada lista adicional del resultado (avisos, conflictos...) unida
+            - Dict: Contadores de trabajo sumados
+    """
+    progreso.iniciar(len(particiones), f"0/{len(particiones)} partes")
+
+    resultados: Dict[str, Tuple[Any, ...]] = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(procesos, len(particiones)))) as pool:
+        futuros = {
+            pool.submit(funcion, *argumentos(clave, [grupos[i] for i in posiciones])): clave
+            for clave, posiciones in particiones.items()
+        }
+        for futuro in as_completed(futuros):
+            resultados[futuros[futuro]] = futuro.result()
+            progreso.avanzar(1, f"{len(resultados)}/{len(particiones)} partes")
+
+    exito = True
+    grupos_resultado = list(grupos)
+    listas: List[List[Any]] = []
+    contadores: Dict[str, int] = {}
+    for clave, posiciones in particiones.items():
+        exito_parte, grupos_parte, *extras, contadores_parte, log = resultados[clave]
+        print(f"\n{'#' * 70}\n# {clave.upper()} ({len(posiciones)} grupos)\n{'#' * 70}")
+        print(log, end="")
+        exito = exito and exito_parte
+        for i, grupo in zip(posiciones, grupos_parte):
+            grupos_resultado[i] = grupo
+        if not listas:
+            listas = [[] for _ in extras]
+        for lista, extra in zip(listas, extras):
+            lista.extend(extra)
+        for nombre, valor in contadores_parte.items():
+            contadores[nombre] = contadores.get(nombre, 0) + valor
+
+    return exito, grupos_resultado, listas, contadores
+
+
+# ========= MULTIARRANQUE =========
+def puntuacion_arranque(
+        grupos: List[GrupoLab],
+        conflictos_alumnos: List[Dict],
+        conflictos_profesores: List[Dict],
+        conflictos_aulas: List[Dict]
+) -> Tuple[int, Dict[str, int]]:
+    """
+    Puntuación de una ejecución de las Fases 5-7 (menor es mejor; ver calidad.medir_calidad).
+
+    Args:
+        grupos: Grupos tras la Fase 7
+        conflictos_alumnos: Conflictos de la Fase 5
+        conflictos_profesores: Conflictos de profesores de las Fases 6 y 7
+        conflictos_aulas: Conflictos de aulas de la Fase 7
+
+    Returns:
+        Tupla con la puntuación y el valor de cada criterio
+    """
+    calidad = medir_calidad(grupos, conflictos_alumnos, conflictos_profesores, conflictos_aulas)
+    return calidad.puntuacion, calidad.criterios()
+
+
+def _cfg_arranque(cfg: Dict) -> Dict:
+    """Configuración mínima de las Fases 5-7 (sin horarios ni resultados anteriores)"""
+    configuracion = cfg.get("configuracion", {})
+    return {"configuracion": {s: configuracion.get(s, {})
+                              for s in ("asignaturas", "alumnos", "profesores", "aulas", "calendario")}}
+
+
+def _arranque(
+        cfg: Dict,
+        grupos: List[GrupoLab],
+        mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]],
+        modo_asignacion: str,
+        semilla: Optional[int]
+) -> Tuple[Any, ...]:
+    """
+    Fases 5-7 con los desempates de una semilla (en un proceso del pool o en este, sobre una copia).
+
+    Returns:
+        Tupla con la fase fallida (o None), la puntuación, sus criterios, las salidas de cada
+        fase {5: [grupos, avisos, conflictos], 6: [...], 7: [...]}, los contadores y el log
+    """
+    salidas: Dict[int, List[Any]] = {}
+    contadores: Dict[str, int] = {}
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        disponibilidad = IndiceDisponibilidad(cfg)
+        fases = (
+            (5, lambda g: AsignadorAlumnos(cfg, g, modo_asignacion=modo_asignacion, semilla_desempate=semilla)),
+            (6, lambda g: AsignadorProfesores(cfg, g, disponibilidad=disponibilidad, semilla_desempate=semilla)),
+            (7, lambda g: ProgramadorFechas(cfg, g, mapeo_fechas, disponibilidad=disponibilidad,
+                                            semilla_desempate=semilla))
+        )
+        for fase, crear in fases:
+            ejecutor = crear(grupos)
+            exito, *salidas[fase] = ejecutor.ejecutar()
+            for nombre, valor in ejecutor.contadores.items():
+                contadores[f"fase{fase}_{nombre}"] = valor
+            if not exito:
+                return fase, None, {}, salidas, contadores, log.getvalue()
+            grupos = salidas[fase][0]
+
+    puntuacion, criterios = puntuacion_arranque(grupos, salidas[5][2], salidas[6][2] + salidas[7][1],
+                                                salidas[7][2])
+    return None, puntuacion, criterios, salidas, contadores, log.getvalue()
+
+
+def _multiarranque(
+        cfg: Dict,
+        grupos: List[GrupoLab],
+        mapeo_fechas: Dict[Tuple[str, str, str, str, str], List[int]],
+        opciones: OpcionesMotor,
+        progreso: NotificadorProgreso
+) -> Tuple[Optional[int], Dict[int, List[Any]], Dict[str, int], List[Dict[str, Any]]]:
+    """
+    Ejecutar las Fases 5-7 opciones.arranques veces y quedarse con la de menor puntuación.
+
+    El arranque 0 no perturba nada (es la ejecución normal) y el arranque n desempata con la
+    semilla opciones.semilla + n el orden de los alumnos con las mismas alternativas (Fase 5),
+    los profesores con las mismas cargas (Fase 6) y el orden de validación de los grupos (Fase 7).
+    Con varios procesos los arranques se reparten en un pool; a igual puntuación gana el de menor
+    número (y si fallan todos se informa la fase del de menor número), así que el resultado no
+    depende del orden en que terminan.
+
+    Args:
+        cfg: Configuración completa
+        grupos: Grupos de la Fase 4 (no se modifican; cada arranque trabaja sobre una copia)
+        mapeo_fechas: Mapeo de fechas de la Fase 2
+        opciones: Opciones de la ejecución (arranques, semilla, procesos y modo de asignación)
+        progreso: Notificador (avanza un paso por arranque terminado)
+
+    Returns:
+        Tupla con:
+            - Optional[int]: Fase que falló en todos los arranques (None si alguno terminó bien)
+            - Dict: Salidas de las Fases 5, 6 y 7 del mejor arranque
+            - Dict: Contadores del multiarranque y de las fases del mejor arranque
+            - List[Dict]: Semilla, puntuación y criterios de cada arranque
+    """
+    semillas = [None] + [opciones.semilla + n for n in range(1, opciones.arranques)]
+    cfg_arranque = _cfg_arranque(cfg)
+    argumentos = (cfg_arranque, grupos, mapeo_fechas, opciones.modo_asignacion)
+    print(f"\n  Multiarranque: {len(semillas)} ejecuciones de las Fases 5-7 ({opciones.procesos} procesos)")
+    progreso.iniciar(len(semillas), f"0/{len(semillas)} arranques")
+
+    registro: List[Optional[Dict[str, Any]]] = [None] * len(semillas)
+    mejor: Optional[Tuple[int, Tuple[Any, ...]]] = None
+
+    def recoger(n: int, resultado: Tuple[Any, ...]) -> None:
+        nonlocal mejor
+        fallida, puntuacion, criterios = resultado[:3]
+        registro[n] = {"arranque": n, "semilla": semillas[n], "puntuacion": puntuacion, **criterios}
+        if fallida is not None:
+            registro[n]["fase_fallida"] = fallida
+        elif mejor is None or (puntuacion, n) < (mejor[1][1], mejor[0]):
+            mejor = (n, resultado)
+        progreso.avanzar(1, f"{sum(r is not None for r in registro)}/{len(semillas)} arranques")
+
+    if opciones.procesos > 1:
+        with ProcessPoolExecutor(max_workers=min(opciones.procesos, len(semillas))) as pool:
+            futuros = {pool.submit(_arranque, *argumentos, semilla): n for n, semilla in enumerate(semillas)}
+            for futuro in as_completed(futuros):
+                recoger(futuros[futuro], futuro.result())
+    else:
+        # Mismo aislamiento que en el pool: cada arranque sobre su copia de los grupos
+        copia = pickle.dumps(grupos, protocol=pickle.HIGHEST_PROTOCOL)
+        for n, semilla in enumerate(semillas):
+            recoger(n, _arranque(cfg_arranque, pickle.loads(copia), mapeo_fechas,
+                                 opciones.modo_asignacion, semilla))
+
+    for entrada in registro:
+        estado = f"falla la Fase {entrada['fase_fallida']}" if "fase_fallida" in entrada else \
+            ", ".join(f"{c}={entrada[c]}" for c in PESOS_PUNTUACION)
+        print(f"    {entrada['arranque']:>3}. semilla={entrada['semilla']}  "
+              f"puntuación={entrada['puntuacion']}  ({estado})")
+
+    if mejor is None:
+        fase_fallida = next(entrada["fase_fallida"] for entrada in registro if "fase_fallida" in entrada)
+        return fase_fallida, {}, {"arranques": len(semillas)}, registro
+
+    n, (_, puntuacion, _, salidas, contadores_fases, log) = mejor
+    print(f"    ✓ Se conserva el arranque {n} (puntuación {puntuacion})")
+    print(f"\n{'#' * 70}\n# ARRANQUE {n}\n{'#' * 70}")
+    print(log, end="")
+
+    contadores = {"arranques": len(semillas), "arranque_elegido": n, "puntuacion": puntuacion, **contadores_fases}
+    return None, salidas, contadores, registro
+
+
+# ========= EJECUCIÓN DEL MOTOR =========
+def _salida_reutilizada(cache: Optional[CacheFases], huellas: Dict[int, str], fase: int,
+                        medidor: MedidorFases, desde_fase: Optional[int] = None) -> Optional[Any]:
+    """
+    Salida de una ejecución anterior si la entrada de la fase no ha cambiado (y registrar la fase).
+
+    Las fases a partir de desde_fase se recalculan siempre aunque haya salida guardada.
+    """
+    if cache is None or (desde_fase is not None and fase >= desde_fase):
+        return None
+    salida = cache.obtener(fase, huellas[fase])
+    if salida is not None:
+        print(f"\n  ↻ FASE {fase} ({NOMBRES_FASES[fase]}): sin cambios, se reutiliza la ejecución anterior")
+        medidor.terminar(fase, {"reutilizada": 1})
+    return salida
+
+
+def _guardar_salida(cache: Optional[CacheFases], huellas: Dict[int, str], fase: int, salida: Any) -> None:
+    """Guardar en la cache la salida de una fase recalculada"""
+    if cache is not None:
+        cache.guardar(fase, huellas[fase], salida)
+
+
+def _ejecutar_fases(
+        config_path: Optional[Path] = None,
+        cfg: Optional[Dict] = None,
+        progreso: Optional[CallbackProgreso] = None,
+        opciones: Optional[OpcionesMotor] = None,
+        cache: Optional[CacheFases] = None
+) -> Tuple[ResultadoMotor, Dict]:
+    """
+    Ejecutar las 8 fases del Motor de Organización en memoria.
+
+    La Fase 8 solo genera 'resultados_organizacion'; guardar el archivo es cosa del llamador.
+    Con cache, las Fases 1-7 cuya entrada no ha cambiado desde la ejecución anterior se
+    reutilizan en lugar de recalcularse (ver reorganizacion_incremental).
+
+    Args:
+        config_path: Ruta del JSON a cargar en la Fase 1 (si no se pasa cfg)
+        cfg: Configuración ya cargada en memoria
+        progreso: Callback que recibe un EventoProgreso por fase y por sub-paso (opcional)
+        opciones: Opciones de la ejecución (por defecto, OpcionesMotor())
+        cache: Salidas de la ejecución anterior (se actualiza con las fases recalculadas)
+
+    Returns:
+        Tupla con el ResultadoMotor y la configuración cargada en la Fase 1
+    """
+    opciones = opciones or OpcionesMotor()
+    notificadores = {fase: NotificadorProgreso(progreso, fase) for fase in NOMBRES_FASES}
+    medidor = MedidorFases()
+    huellas: Dict[int, str] = {}
+    fases_reutilizadas: List[int] = []
+
     # ===== FASE 1: CARGA Y VALIDACIÓN =====
-    validador = ValidadorDatos(config_path)
-    exito_fase1, cfg, errores = validador.ejecutar()
+    medidor.iniciar(1)
+    validador = ValidadorDatos(config_path, cfg, progreso=notificadores[1])
+    salida_fase1 = None
+    if cache is not None:
+        # La configuración se carga siempre: las huellas salen de sus secciones
+        if not validador.cargar():
+            medidor.terminar(1, validador.contadores)
+            return _fase_fallida(1, validador.errores, medidor), validador.cfg
+        cfg = validador.cfg
+        secciones = huellas_secciones(cfg)
+        cambiadas = cache.secciones_cambiadas(secciones)
+        print(f"\n  Secciones modificadas: {', '.join(cambiadas) or 'ninguna'}"
+              f" -> fases a recalcular: {', '.join(map(str, fases_afectadas(cambiadas))) or 'ninguna'}")
+        huellas = huellas_fases(secciones, {5: opciones.modo_asignacion})
+        cache.guardar_secciones(secciones)
+        salida_fase1 = _salida_reutilizada(cache, huellas, 1, medidor, opciones.desde_fase)
+
+    if salida_fase1 is not None:
+        fases_reutilizadas.append(1)
+        exito_fase1 = True
+        grupos_lab_posibles, errores = salida_fase1
+    else:
+        exito_fase1, cfg, errores = validador.ejecutar()
+        grupos_lab_posibles = validador.grupos_lab_posibles
+        medidor.terminar(1, validador.contadores)
+        if exito_fase1:
+            _guardar_salida(cache, huellas, 1, (grupos_lab_posibles, errores))
+    notificadores[1].terminar()
 
     # Mostrar errores detallados si los hay
     if errores:
@@ -3413,147 +5005,192 @@ def main():
 
     # Si FASE 1 falla, detener
     if not exito_fase1:
-        print("\n" + "=" * 70)
-        print("✗ FASE 1 FALLÓ - Corrija los errores críticos antes de continuar")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 1",
-            "La Fase 1 (Carga y Validación de Datos) no se ha podido completar.\n\n"
-            "Esta fase verifica que el archivo de configuración contiene toda "
-            "la información necesaria para continuar con el proceso. "
-            "Los fallos más habituales son:\n\n"
-            " • Faltan secciones obligatorias en el archivo JSON.\n"
-            " • Alguna asignatura no tiene parámetros básicos definidos.\n"
-            " • Grupos, horarios o aulas están incompletos o mal configurados.\n"
-            " • Revisar si es compatible el número de sesiones en Asignaturas y el número de letras en Horarios.\n"
-            " • Valores vacíos o inconsistentes (semana_inicio, num_sesiones, letras de grupos...) revisa calendario.\n\n"
-            "Revisa el panel de errores y corrige las configuraciones indicadas."
-        )
-        return
+        return _fase_fallida(1, errores, medidor), cfg
 
     # ===== FASE 2: CÁLCULO DE FECHAS =====
-    calculador = CalculadorFechas(cfg, validador.grupos_lab_posibles)
-    exito_fase2, mapeo_fechas = calculador.ejecutar()
+    notificadores[2].iniciar(1)
+    medidor.iniciar(2)
+    calendario = CalendarioFechas(cfg)
+    disponibilidad = IndiceDisponibilidad(cfg)
+    mapeo_fechas = _salida_reutilizada(cache, huellas, 2, medidor, opciones.desde_fase)
+    if mapeo_fechas is not None:
+        fases_reutilizadas.append(2)
+    else:
+        calculador = CalculadorFechas(cfg, grupos_lab_posibles, calendario=calendario)
+        exito_fase2, mapeo_fechas = calculador.ejecutar()
+        medidor.terminar(2, calculador.contadores)
 
-    # Si FASE 2 falla, detener
-    if not exito_fase2:
-        print("\n" + "=" * 70)
-        print("✗ FASE 2 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 2",
-            "La Fase 2 (Cálculo de fechas) no ha podido completarse.\n\n"
-            "Esto suele ocurrir cuando:\n"
-            " • No se definió correctamente la semana de inicio.\n"
-            " • El número de sesiones no coincide con la duración del semestre.\n"
-            " • Hay huecos en el calendario o semanas fuera de rango.\n\n"
-            "Revisa la configuración del calendario en el módulo correspondiente."
-        )
-        return
+        if not exito_fase2:
+            return _fase_fallida(2, errores, medidor), cfg
+        _guardar_salida(cache, huellas, 2, mapeo_fechas)
+    notificadores[2].terminar()
 
     # ===== FASE 3: AULA PREFERENTE =====
-    asignador_aulas = AsignadorAulaPreferente(cfg)
-    exito_fase3, aulas_preferentes, conflictos_aulas_fase3 = asignador_aulas.ejecutar()
+    notificadores[3].iniciar(1)
+    medidor.iniciar(3)
+    salida_fase3 = _salida_reutilizada(cache, huellas, 3, medidor, opciones.desde_fase)
+    if salida_fase3 is not None:
+        fases_reutilizadas.append(3)
+    else:
+        asignador_aulas = AsignadorAulaPreferente(cfg, disponibilidad=disponibilidad)
+        resultado_fase3 = asignador_aulas.ejecutar()
+        medidor.terminar(3, asignador_aulas.contadores)
 
-    # Si FASE 3 falla, detener
-    if not exito_fase3:
-        print("\n" + "=" * 70)
-        print("✗ FASE 3 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 3",
-            "La Fase 3 (Asignación de Aula Preferente) ha fallado.\n\n"
-            "Generalmente ocurre cuando:\n"
-            " • No existen aulas registradas en el sistema.\n"
-            " • La asignatura no tiene definida un aula válida.\n"
-            " • La capacidad del aula es insuficiente.\n\n"
-            "Revisa la configuración de Aulas y las Asignaturas afectadas."
-        )
-        return
+        if not resultado_fase3[0]:
+            return _fase_fallida(3, errores, medidor), cfg
+        salida_fase3 = resultado_fase3[1:]
+        _guardar_salida(cache, huellas, 3, salida_fase3)
+    aulas_preferentes, conflictos_aulas_fase3 = salida_fase3
+    notificadores[3].terminar()
 
     # ===== FASE 4: CREAR GRUPOS =====
-    creador_grupos = CreadorGruposLab(cfg, mapeo_fechas, aulas_preferentes)
-    exito_fase4, grupos_creados, grupos_por_slot, conflictos_aulas_fase4 = creador_grupos.ejecutar()
-
-    # Si FASE 4 falla, detener
-    if not exito_fase4:
-        print("\n" + "=" * 70)
-        print("✗ FASE 4 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 4",
-            "La Fase 4 (Creación de Grupos de laboratorio) no se ha completado.\n\n"
-            "Posibles causas:\n"
-            " • La asignatura no tiene configurados los grupos correctamente.\n"
-            " • El horario tiene grupos con demasiadas letras o inconsistencias.\n\n"
-            "Revisa el módulo 'Grupos' y 'Horarios' para corregir la configuración."
-        )
-        return
+    notificadores[4].iniciar(1)
+    medidor.iniciar(4)
+    salida_fase4 = _salida_reutilizada(cache, huellas, 4, medidor, opciones.desde_fase)
+    if salida_fase4 is not None:
+        fases_reutilizadas.append(4)
+    else:
+        creador_grupos = CreadorGruposLab(cfg, mapeo_fechas, aulas_preferentes, disponibilidad=disponibilidad)
+        resultado_fase4 = creador_grupos.ejecutar()
+        medidor.terminar(4, creador_grupos.contadores)
+
+        if not resultado_fase4[0]:
+            return _fase_fallida(4, errores, medidor), cfg
+        salida_fase4 = resultado_fase4[1:]
+        _guardar_salida(cache, huellas, 4, salida_fase4)
+    grupos_creados, grupos_por_slot, conflictos_aulas_fase4 = salida_fase4
+    notificadores[4].terminar()
+
+    # ===== FASES 5-7: MULTIARRANQUE (OPCIONAL) =====
+    # Sustituye a las Fases 5-7 y no usa su cache: la ejecución elegida depende de las tres
+    salidas_arranque: Dict[int, List[Any]] = {}
+    registro_arranques: List[Dict[str, Any]] = []
+    if opciones.arranques > 1:
+        medidor.iniciar(FASE_MULTIARRANQUE)
+        fase_fallida, salidas_arranque, contadores_arranque, registro_arranques = _multiarranque(
+            cfg, grupos_creados, mapeo_fechas, opciones, notificadores[5])
+        medidor.terminar(FASE_MULTIARRANQUE, contadores_arranque, NOMBRE_MULTIARRANQUE)
+
+        if fase_fallida is not None:
+            return _fase_fallida(fase_fallida, errores, medidor), cfg
 
     # ===== FASE 5: ASIGNAR ALUMNOS =====
-    asignador_alumnos = AsignadorAlumnos(cfg, grupos_creados)
-    exito_fase5, grupos_con_alumnos, avisos_fase5, conflictos_alumnos_fase5 = asignador_alumnos.ejecutar()
+    notificadores[5].iniciar(1)
+    medidor.iniciar(5)
+    asignador_alumnos = None
+    salida_fase5 = None if salidas_arranque else _salida_reutilizada(cache, huellas, 5, medidor, opciones.desde_fase)
+    if salidas_arranque:
+        salida_fase5 = salidas_arranque[5]
+    elif salida_fase5 is not None:
+        fases_reutilizadas.append(5)
+    elif opciones.procesos > 1 and grupos_creados:
+        # Componentes independientes de asignaturas (nunca mezclan semestres), repartidas en bloques
+        particiones, num_componentes, asignador_completo = _particionar_componentes(cfg, grupos_creados, opciones)
+        print(f"\n  Fase 5 en paralelo: {num_componentes} componentes de asignaturas en {len(particiones)} bloques")
+        exito_fase5, grupos_fase5, listas_fase5, contadores_fase5 = _ejecutar_en_paralelo(
+            _fase5_particion, grupos_creados, particiones,
+            lambda clave, grupos: (_cfg_alumnos_asignaturas(cfg, {g.asignatura for g in grupos}), grupos,
+                                   opciones.modo_asignacion),
+            opciones.procesos, notificadores[5])
+        contadores_fase5["componentes_asignaturas"] = num_componentes
+        medidor.terminar(5, contadores_fase5)
+
+        if not exito_fase5:
+            return _fase_fallida(5, errores, medidor), cfg
+        salida_fase5 = [grupos_fase5, *_ordenar_como_secuencial(asignador_completo, *listas_fase5)]
+        _guardar_salida(cache, huellas, 5, salida_fase5)
+    else:
+        asignador_alumnos = AsignadorAlumnos(cfg, grupos_creados, progreso=notificadores[5],
+                                             modo_asignacion=opciones.modo_asignacion)
+        exito_fase5, *salida_fase5 = asignador_alumnos.ejecutar()
+        medidor.terminar(5, asignador_alumnos.contadores)
 
-    # Si FASE 5 falla, detener
-    if not exito_fase5:
-        print("\n" + "=" * 70)
-        print("✗ FASE 5 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 5",
-            "La Fase 5 (Asignación de alumnos) no pudo realizarse.\n\n"
-            "Esto suele deberse a:\n"
-            " • Alumnos matriculados en asignaturas sin grupos configurados.\n"
-            " • Grupos saturados que no admiten más alumnos.\n"
-            " • Datos incompletos en la matrícula de alumnos.\n"
-            " • Existen alumnos sin información completa o con datos incorrectos.\n\n"
-            "Revisa el módulo 'Alumnos' y asegúrate de que los grupos tienen capacidad."
-        )
-        return
+        if not exito_fase5:
+            return _fase_fallida(5, errores, medidor), cfg
+        _guardar_salida(cache, huellas, 5, salida_fase5)
+    grupos_con_alumnos, avisos_fase5, conflictos_alumnos_fase5 = salida_fase5
+    notificadores[5].terminar()
 
     # ===== FASE 6: ASIGNAR PROFESORES =====
-    asignador_profesores = AsignadorProfesores(cfg, grupos_con_alumnos)
-    exito_fase6, grupos_con_profesores, avisos_fase6, conflictos_prof_fase6 = asignador_profesores.ejecutar()
+    notificadores[6].iniciar(1)
+    medidor.iniciar(6)
+    asignador_profesores = None
+    salida_fase6 = None if salidas_arranque else _salida_reutilizada(cache, huellas, 6, medidor, opciones.desde_fase)
+    if salidas_arranque:
+        salida_fase6 = salidas_arranque[6]
+    elif salida_fase6 is not None:
+        fases_reutilizadas.append(6)
+    else:
+        asignador_profesores = AsignadorProfesores(cfg, grupos_con_alumnos, progreso=notificadores[6],
+                                                   disponibilidad=disponibilidad)
+        exito_fase6, *salida_fase6 = asignador_profesores.ejecutar()
+        medidor.terminar(6, asignador_profesores.contadores)
 
-    # Si FASE 6 falla, detener
-    if not exito_fase6:
-        print("\n" + "=" * 70)
-        print("✗ FASE 6 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 6",
-            "La Fase 6 (Asignación de profesores) ha fallado.\n\n"
-            "Causas frecuentes:\n"
-            " • Profesores sin disponibilidad compatible con los grupos.\n"
-            " • Falta de profesores asignados a ciertas asignaturas.\n"
-            " • Conflictos entre múltiples grupos asignados al mismo profesor.\n\n"
-            "Revisa el módulo 'Profesores' y asegúrate de que todos tienen horarios válidos."
-        )
-        return
+        if not exito_fase6:
+            return _fase_fallida(6, errores, medidor), cfg
+        _guardar_salida(cache, huellas, 6, salida_fase6)
+    grupos_con_profesores, avisos_fase6, conflictos_prof_fase6 = salida_fase6
+    notificadores[6].terminar()
 
     # ===== FASE 7: PROGRAMAR FECHAS =====
     # IMPORTANTE: Pasar mapeo_fechas de Fase 2
-    programador_fechas = ProgramadorFechas(cfg, grupos_con_profesores, mapeo_fechas)
-    exito_fase7, grupos_con_fechas, conflictos_profes_fase7, conflictos_aulas_fase7 = programador_fechas.ejecutar()
-
-    # Si FASE 7 falla, detener
-    if not exito_fase7:
-        print("\n" + "=" * 70)
-        print("✗ FASE 7 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 7",
-            "La Fase 7 (Programación de Fechas del laboratorio) no pudo completarse.\n\n"
-            "Suele producirse cuando:\n"
-            " • Existen conflictos de disponibilidad entre profesores y grupos.\n"
-            " • No hay aulas libres para algunas sesiones.\n"
-            " • Las fechas generadas no encajan en el calendario configurado.\n"
-            " • Hay grupos que quedaron sin sesión/fecha asignada.\n\n"
-            "Revisa conflictos de profesores, aulas y disponibilidad del calendario."
-        )
-        return
-
-    # ===== FASE 8: OUTPUTS (GENERACIÓN JSON) =====
+    notificadores[7].iniciar(1)
+    medidor.iniciar(7)
+    programador_fechas = None
+    salida_fase7 = None if salidas_arranque else _salida_reutilizada(cache, huellas, 7, medidor, opciones.desde_fase)
+    if salidas_arranque:
+        salida_fase7 = salidas_arranque[7]
+    elif salida_fase7 is not None:
+        fases_reutilizadas.append(7)
+    elif _por_semestre(opciones, grupos_con_profesores):
+        cfg_fechas = _cfg_fechas_semestre(cfg)
+        exito_fase7, grupos_fase7, listas_fase7, contadores_fase7 = _ejecutar_en_paralelo(
+            _fase7_semestre, grupos_con_profesores, _particionar_grupos(grupos_con_profesores),
+            lambda clave, grupos: (cfg_fechas, grupos,
+                                   {k: v for k, v in mapeo_fechas.items() if _clave_particion(k[0]) == clave}),
+            opciones.procesos, notificadores[7])
+        medidor.terminar(7, contadores_fase7)
+
+        if not exito_fase7:
+            return _fase_fallida(7, errores, medidor), cfg
+        salida_fase7 = [grupos_fase7, *listas_fase7]
+        _guardar_salida(cache, huellas, 7, salida_fase7)
+    else:
+        programador_fechas = ProgramadorFechas(cfg, grupos_con_profesores, mapeo_fechas, progreso=notificadores[7],
+                                               calendario=calendario, disponibilidad=disponibilidad)
+        exito_fase7, *salida_fase7 = programador_fechas.ejecutar()
+        medidor.terminar(7, programador_fechas.contadores)
+
+        if not exito_fase7:
+            return _fase_fallida(7, errores, medidor), cfg
+        _guardar_salida(cache, huellas, 7, salida_fase7)
+    grupos_con_fechas, conflictos_profes_fase7, conflictos_aulas_fase7 = salida_fase7
+    notificadores[7].terminar()
+
+    # ===== BÚSQUEDA LOCAL (OPCIONAL) =====
+    if opciones.presupuesto_busqueda_s > 0:
+        medidor.iniciar(FASE_BUSQUEDA_LOCAL)
+        # Las fases reutilizadas no tienen asignador: se reconstruyen sus índices sin ejecutarlas
+        if asignador_alumnos is None:
+            asignador_alumnos = AsignadorAlumnos(cfg, grupos_con_fechas, modo_asignacion=opciones.modo_asignacion)
+            asignador_alumnos._construir_mapeos()
+        if asignador_profesores is None:
+            asignador_profesores = AsignadorProfesores(cfg, grupos_con_fechas, disponibilidad=disponibilidad)
+        if programador_fechas is None:
+            programador_fechas = ProgramadorFechas(cfg, grupos_con_fechas, mapeo_fechas,
+                                                   calendario=calendario, disponibilidad=disponibilidad)
+        busqueda = _crear_busqueda_local(cfg, opciones, grupos_con_fechas, asignador_alumnos,
+                                         asignador_profesores, programador_fechas)
+        busqueda.ejecutar()
+        _quitar_sin_asignar_colocados(busqueda.colocados, asignador_alumnos, avisos_fase5,
+                                      conflictos_alumnos_fase5)
+        _actualizar_conflictos_busqueda(busqueda, [conflictos_prof_fase6, conflictos_profes_fase7],
+                                        conflictos_profes_fase7, conflictos_aulas_fase7)
+        medidor.terminar(FASE_BUSQUEDA_LOCAL, busqueda.contadores, NOMBRE_BUSQUEDA_LOCAL)
+
+    # ===== FASE 8: OUTPUTS (GENERACIÓN EN MEMORIA) =====
+    notificadores[8].iniciar(1)
+    medidor.iniciar(8)
     # Combinar todos los avisos de las fases anteriores
     avisos_totales = avisos_fase5 + avisos_fase6
 
@@ -3562,7 +5199,7 @@ def main():
     conflictos_profesores_totales = conflictos_prof_fase6 + conflictos_profes_fase7
     conflictos_alumnos_totales = conflictos_alumnos_fase5
     # Detectar alertas de semana_inicio
-    alertas_semana = detectar_grupos_antes_semana_inicio(cfg, grupos_con_fechas)
+    alertas_semana = detectar_grupos_antes_semana_inicio(cfg, grupos_con_fechas, calendario)
 
     # Crear generador de outputs
     generador = GeneradorOutputs(
@@ -3575,24 +5212,41 @@ def main():
         alertas_semana_inicio=alertas_semana
     )
 
-    # Ejecutar generación y guardar
-    exito_fase8, cfg_actualizada = generador.ejecutar(config_path)
-
-    if not exito_fase8:
-        print("\n" + "=" * 70)
-        print("✗ FASE 8 FALLÓ")
-        print("=" * 70)
-        PopupManager.show_critical(
-            "❌ Error en Fase 8",
-            "La Fase 8 (Generación del archivo final) ha fallado.\n\n"
-            "Esto puede deberse a:\n"
-            " • Falta de permisos para guardar el archivo.\n"
-            " • La ruta de destino no es válida o está bloqueada.\n"
-            " • El JSON resultante es inconsistente.\n"
-            " • El archivo está siendo usado por otro programa.\n\n"
-            "Revisa la ruta de guardado y asegúrate de que el archivo no está bloqueado."
-        )
-        return
+    # Generar resultados_organizacion (sin guardar)
+    resultados = generador.generar()
+    medidor.terminar(8, generador.contadores)
+    notificadores[8].terminar()
+
+    # Calidad del horario final, comparable entre ejecuciones
+    calidad = medir_calidad(grupos_con_fechas, conflictos_alumnos_totales, conflictos_profesores_totales,
+                            conflictos_aulas_totales, mapeo_fechas)
+
+    # Métricas por fase junto a la versión, para seguir qué fase empeora al crecer la matrícula
+    metricas = medidor.metricas()
+    metricas["calidad"] = calidad.a_dict()
+    if cache is not None:
+        metricas["fases_reutilizadas"] = fases_reutilizadas
+    if registro_arranques:
+        metricas["arranques"] = registro_arranques
+    resultados["_metadata"].update(metricas)
+
+    estadisticas = {
+        "grupos_validados": len(grupos_lab_posibles),
+        "combinaciones_fechas": len(mapeo_fechas),
+        "aulas_preferentes": len(aulas_preferentes),
+        "grupos_creados": len(grupos_creados),
+        "slots_unicos": len(grupos_por_slot),
+        "alumnos_asignados": sum(len(g.alumnos) for g in grupos_con_fechas),
+        "grupos_con_profesor": sum(1 for g in grupos_con_fechas if g.profesor_id),
+        "grupos_con_fechas": sum(1 for g in grupos_con_fechas if g.fechas),
+        "sesiones_programadas": sum(len(g.fechas) for g in grupos_con_fechas),
+        "avisos": len(avisos_totales),
+        "conflictos_profesores": len(conflictos_profesores_totales),
+        "conflictos_aulas": len(conflictos_aulas_totales),
+        "conflictos_alumnos": len(conflictos_alumnos_totales),
+        "alertas_semana_inicio": len(alertas_semana),
+        "puntuacion": calidad.puntuacion
+    }
 
     # ===== RESULTADO FINAL =====
     print("\n" + "=" * 70)
@@ -3601,15 +5255,19 @@ def main():
 
     print(f"\n  ESTADÍSTICAS FINALES:")
     print(f"  {'─' * 66}")
-    print(f"\n  • Grupos validados: {len(validador.grupos_lab_posibles)}")
-    print(f"  • Combinaciones de fechas: {len(mapeo_fechas)}")
-    print(f"  • Aulas preferentes asignadas: {len(aulas_preferentes)}")
-    print(f"  • Grupos de laboratorio creados: {len(grupos_creados)}")
-    print(f"  • Slots únicos (dia, franja): {len(grupos_por_slot)}")
-    print(f"  • Total alumnos asignados: {sum(len(g.alumnos) for g in grupos_con_alumnos)}")
-    print(f"  • Grupos con profesor: {sum(1 for g in grupos_con_profesores if g.profesor_id)}/{len(grupos_con_profesores)}")
-    print(f"  • Grupos con fechas: {sum(1 for g in grupos_con_fechas if g.fechas)}/{len(grupos_con_fechas)}")
-    print(f"  • Total sesiones programadas: {sum(len(g.fechas) for g in grupos_con_fechas)}")
+    print(f"\n  • Grupos validados: {estadisticas['grupos_validados']}")
+    print(f"  • Combinaciones de fechas: {estadisticas['combinaciones_fechas']}")
+    print(f"  • Aulas preferentes asignadas: {estadisticas['aulas_preferentes']}")
+    print(f"  • Grupos de laboratorio creados: {estadisticas['grupos_creados']}")
+    print(f"  • Slots únicos (dia, franja): {estadisticas['slots_unicos']}")
+    print(f"  • Total alumnos asignados: {estadisticas['alumnos_asignados']}")
+    print(f"  • Grupos con profesor: {estadisticas['grupos_con_profesor']}/{len(grupos_con_profesores)}")
+    print(f"  • Grupos con fechas: {estadisticas['grupos_con_fechas']}/{len(grupos_con_fechas)}")
+    print(f"  • Total sesiones programadas: {estadisticas['sesiones_programadas']}")
+    print(f"  • Puntuación de calidad: {calidad.puntuacion} "
+          f"({', '.join(f'{c}={v}' for c, v in calidad.criterios().items())})")
+    print(f"  • Ocupación de aulas: {calidad.utilizacion_aulas:.1%} · "
+          f"Fechas desplazadas en Fase 7: {calidad.fechas_desplazadas}")
 
     # Mostrar avisos y conflictos si existen
     if avisos_totales:
@@ -3625,10 +5283,102 @@ def main():
         if conflictos_aulas_fase7:
             print(f"  ⚠ Conflictos de aulas: {len(conflictos_aulas_fase7)}")
 
+    resultado = ResultadoMotor(
+        exito=True,
+        errores=errores,
+        estadisticas=estadisticas,
+        resultados=resultados,
+        metricas=metricas
+    )
+    return resultado, cfg
+
+
+def organizar(cfg: Dict, progreso: Optional[CallbackProgreso] = None,
+              opciones: Optional[OpcionesMotor] = None, cache: Optional[CacheFases] = None) -> ResultadoMotor:
+    """
+    API en memoria del motor: organizar a partir de la configuración ya cargada.
+
+    No lee ni escribe ningún archivo y no modifica cfg; el llamador decide si guarda
+    resultado.resultados en cfg["resultados_organizacion"] y cuándo persistirlo.
+
+    Args:
+        cfg: Configuración completa (mismo formato que configuracion_labs.json)
+        progreso: Callback que recibe un EventoProgreso por fase y por sub-paso (opcional)
+        opciones: Opciones de la ejecución (modo de asignación, ...)
+        cache: CacheFases de la ejecución anterior para recalcular solo las fases afectadas (opcional)
+
+    Returns:
+        ResultadoMotor con resultados_organizacion (incluye conflictos) y estadísticas
+    """
+    resultado, _ = _ejecutar_fases(cfg=cfg, progreso=progreso, opciones=opciones, cache=cache)
+    return resultado
+
+
+def ejecutar_motor(
+        config_path: Path,
+        output_path: Optional[Path] = None,
+        progreso: Optional[CallbackProgreso] = None,
+        opciones: Optional[OpcionesMotor] = None,
+        cache: Optional[CacheFases] = None,
+        resultados_aparte: bool = False
+) -> ResultadoMotor:
+    """
+    Ejecutar el Motor de Organización sobre un archivo y guardar los resultados en disco.
+
+    Ejecuta:
+        FASE 1: Carga y Validación
+        FASE 2: Cálculo de Fechas por Letra
+        FASE 3: Aula Preferente
+        FASE 4: Crear Grupos de Laboratorio
+        FASE 5: Asignar Alumnos
+        FASE 6: Asignar Profesores
+        FASE 7: Programar Fechas
+        FASE 8: Outputs (Generación JSON)
+
+    Args:
+        config_path: Ruta del configuracion_labs.json de entrada
+        output_path: Ruta donde guardar el JSON con los resultados (por defecto, la misma de entrada)
+        progreso: Callback que recibe un EventoProgreso por fase y por sub-paso (opcional)
+        opciones: Opciones de la ejecución (modo de asignación, ...)
+        cache: CacheFases de la ejecución anterior para recalcular solo las fases afectadas (opcional)
+        resultados_aparte: Guardar los resultados en un archivo aparte (JSON compacto) y dejar
+            en la configuración solo un puntero (ver archivo_resultados)
+
+    Returns:
+        ResultadoMotor con el éxito, la fase fallida (si la hay) y las estadísticas finales
+    """
+    output_path = output_path or config_path
+
+    resultado, cfg = _ejecutar_fases(config_path=config_path, progreso=progreso, opciones=opciones, cache=cache)
+    if not resultado.exito:
+        return resultado
+
+    # 9.3 y 9.4 - Volcar resultados (o su puntero) en la configuración y guardar
+    try:
+        if resultados_aparte and not es_ruta_sqlite(output_path):
+            puntero = guardar_resultados(resultado.resultados, output_path)
+            cfg["resultados_organizacion"] = puntero
+            resultado.resultados_path = output_path.with_name(puntero["archivo"])
+        else:
+            cfg["resultados_organizacion"] = resultado.resultados
+        save_configuration(cfg, output_path)
+    except Exception as e:
+        print(f"  ✗ Error al guardar archivo: {e}")
+        return _fase_fallida(8, resultado.errores)
+
+    # Solo ahora, con la configuración apuntando al archivo nuevo, sobran los anteriores
+    if not es_ruta_sqlite(output_path):
+        podar_resultados(output_path, resultado.resultados_path.name if resultado.resultados_path else None)
+    resultado.output_path = output_path
+
     print(f"\n  ARCHIVO ACTUALIZADO:")
     print(f"  {'─' * 66}")
-    print(f"  {config_path}")
-    print(f"  ✓ Sección 'resultados_organizacion' actualizada")
+    print(f"  {output_path}")
+    if resultado.resultados_path:
+        print(f"  {resultado.resultados_path} ({puntero['tamano_bytes'] / (1024 * 1024):.2f} MB)")
+        print(f"  ✓ Sección 'resultados_organizacion' apunta al archivo de resultados")
+    else:
+        print(f"  ✓ Sección 'resultados_organizacion' actualizada")
     print(f"  ✓ Compatible con ver_resultados.py")
 
     print("\n" + "=" * 70)
@@ -3636,6 +5386,134 @@ def main():
     print("Puedes visualizar los resultados con ver_resultados.py")
     print("=" * 70 + "\n")
 
+    return resultado
+
+
+# ========= MAIN - EJECUCIÓN DESDE LA GUI =========
+def main() -> Optional[ResultadoMotor]:
+    """
+    Función principal para ejecución completa del Motor de Organización desde la GUI.
+
+    Usa el configuracion_labs.json por defecto (get_config_path), guarda los resultados
+    en ese mismo archivo y muestra un pop-up con la causa si alguna fase falla.
+
+    Returns:
+        ResultadoMotor de la ejecución, o None si no existe el archivo de configuración
+    """
+
+    # Buscar configuración por defecto
+    config_path = get_config_path()
+
+    if not config_path.exists():
+        print(f"ERROR: No se encontró el archivo de configuración en: {config_path}")
+        PopupManager.show_critical(
+            "❌ Error",
+            "No se encuentra el archivo de configuración configuracion_labs.json.\n\n"
+            f"Revisa que el archivo exista en la ruta esperada: {config_path}."
+        )
+        return None
+
+    resultado = ejecutar_motor(config_path)
+
+    if not resultado.exito:
+        titulo, mensaje = MENSAJES_ERROR_FASE[resultado.fase_fallida]
+        PopupManager.show_critical(titulo, mensaje)
+
+    return resultado
+
+
+# ========= CLI - EJECUCIÓN SIN INTERFAZ =========
+def cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de línea de comandos (sin Qt), pensado para cron y scripts.
+
+    Ejemplo (desde src/):
+        python -m modules.organizador.motor_organizacion --config X.json --out Y.json --quiet
+
+    El log del motor se escribe en stderr (o se descarta con --quiet) y en stdout
+    solo se imprime un resumen JSON de la ejecución.
+
+    Códigos de salida:
+        0: Todas las fases completadas
+        1: Error inesperado
+        2: Argumentos inválidos
+        11-18: Falló la fase (código - 10)
+
+    Args:
+        argv: Argumentos (por defecto sys.argv[1:])
+
+    Returns:
+        Código de salida
+    """
+    parser = argparse.ArgumentParser(
+        prog="motor_organizacion",
+        description="OPTIM - Motor de organización de laboratorios (ejecución sin interfaz)"
+    )
+    parser.add_argument("--config", type=Path, default=None,
+                        help="configuracion_labs.json de entrada, o almacén SQLite .db (por defecto, el de la aplicación)")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="archivo JSON de salida (por defecto, el mismo de entrada)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="no mostrar el log de las fases (solo el resumen JSON)")
+    parser.add_argument("--modo-asignacion", choices=MODOS_ASIGNACION, default=MODO_ASIGNACION_VORAZ,
+                        help="algoritmo de asignación de alumnos de grado simple (por defecto: voraz)")
+    parser.add_argument("--busqueda-local", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="segundos de búsqueda local tras la Fase 7 (por defecto: 0, desactivada)")
+    parser.add_argument("--iteraciones-busqueda", type=int, default=None,
+                        help="límite de iteraciones de la búsqueda local (resultado reproducible)")
+    parser.add_argument("--semilla", type=int, default=OpcionesMotor.semilla,
+                        help="semilla de la búsqueda local y de los arranques")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="directorio de checkpoints de las Fases 1-7 (reutiliza las fases cuya entrada no cambió)")
+    parser.add_argument("--desde-fase", "--from-phase", type=int, choices=sorted(NOMBRES_FASES), default=None,
+                        help="recalcular desde esta fase; las anteriores salen de los checkpoints "
+                             f"(sin --cache-dir se usa {DIRECTORIO_CACHE_POR_DEFECTO}/ junto a la configuración)")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos para ejecutar en paralelo la Fase 5 (por componentes de asignaturas) "
+                             "y la Fase 7 (por semestre) (por defecto: 1)")
+    parser.add_argument("--arranques", type=int, default=1,
+                        help="ejecuciones de las Fases 5-7 con desempates aleatorios (semilla + n) de las que "
+                             "se conserva la mejor; se reparten entre --procesos (por defecto: 1)")
+    parser.add_argument("--resultados-aparte", action="store_true",
+                        help="guardar los resultados en un archivo JSON compacto junto a la configuración "
+                             "(<config>.resultados.<hash>.json) y dejar en ella solo un puntero")
+    args = parser.parse_args(argv)
+    opciones = OpcionesMotor(modo_asignacion=args.modo_asignacion,
+                             presupuesto_busqueda_s=args.busqueda_local,
+                             iteraciones_busqueda=args.iteraciones_busqueda,
+                             semilla=args.semilla,
+                             desde_fase=args.desde_fase,
+                             procesos=args.procesos,
+                             arranques=args.arranques)
+
+    config_path = args.config or get_config_path()
+    log = io.StringIO() if args.quiet else sys.stderr
+
+    directorio_cache = args.cache_dir
+    if directorio_cache is None and args.desde_fase is not None:
+        directorio_cache = config_path.parent / DIRECTORIO_CACHE_POR_DEFECTO
+    cache = CacheFases(directorio_cache) if directorio_cache is not None else None
+
+    try:
+        with contextlib.redirect_stdout(log):
+            resultado = ejecutar_motor(config_path, args.out, opciones=opciones, cache=cache,
+                                       resultados_aparte=args.resultados_aparte)
+    except Exception as e:
+        resumen = {
+            "exito": False,
+            "fase_fallida": None,
+            "codigo_salida": CODIGO_SALIDA_ERROR_INESPERADO,
+            "error": f"{type(e).__name__}: {e}"
+        }
+        print(json.dumps(resumen, ensure_ascii=False))
+        return CODIGO_SALIDA_ERROR_INESPERADO
+
+    print(json.dumps(resultado.resumen(), ensure_ascii=False))
+    return resultado.codigo_salida
+
 
 if __name__ == "__main__":
-    main()
+    # Ejecutar desde el módulo importado (no desde __main__) para que los checkpoints
+    # guardados con pickle referencien modules.organizador.motor_organizacion.GrupoLab
+    from modules.organizador import motor_organizacion
+    sys.exit(motor_organizacion.cli())
@@ -0,0 +1,287 @@
+"""
+Reorganización Incremental - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Autor: Javier Robles Molina - SoftVier
+Universidad: ETSIDI (UPM)
+
+Permite volver a organizar recalculando solo las fases afectadas por los cambios de la
+configuración y reutilizando las salidas intermedias de la ejecución anterior.
+
+Cada sección de 'configuracion' se resume en una huella (hash del JSON en su orden, porque el
+orden de las claves también cambia el resultado). La huella de una fase combina las de las
+secciones que lee, las de las fases cuya salida consume y los parámetros que la afectan, así que
+cambiar una sección invalida sus fases y, en cadena, todas las posteriores:
+
+    FASE 1: calendario, asignaturas, horarios
+    FASE 2: calendario, asignaturas, horarios + Fase 1
+    FASE 3: asignaturas, aulas
+    FASE 4: horarios, aulas + Fases 2 y 3
+    FASE 5: asignaturas, alumnos + Fase 4 (+ modo de asignación)
+    FASE 6: profesores + Fase 5
+    FASE 7: calendario, profesores, aulas + Fases 2 y 6
+
+La Fase 8 (y la búsqueda local opcional) se ejecutan siempre: son baratas o dependen de opciones
+que no forman parte de la salida guardada.
+
+Con un directorio, cada salida se guarda además en disco en cuanto termina su fase (pickle
+comprimido con zlib, escrito en un temporal y renombrado), de modo que otra ejecución, o la
+siguiente tras un fallo en una fase tardía, puede continuar desde la primera fase que falte.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Any, Iterable
+
+# ========= CONSTANTES =========
+# Secciones de 'configuracion' que lee el motor
+SECCIONES_CONFIGURACION = ("calendario", "asignaturas", "horarios", "alumnos", "aulas", "profesores")
+
+# Fase -> (secciones que lee, fases cuya salida consume)
+DEPENDENCIAS_FASES: Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...]]] = {
+    1: (("calendario", "asignaturas", "horarios"), ()),
+    2: (("calendario", "asignaturas", "horarios"), (1,)),
+    3: (("asignaturas", "aulas"), ()),
+    4: (("horarios", "aulas"), (2, 3)),
+    5: (("asignaturas", "alumnos"), (4,)),
+    6: (("profesores",), (5,)),
+    7: (("calendario", "profesores", "aulas"), (2, 6)),
+}
+
+# Cambiar al modificar el formato de las salidas guardadas o el algoritmo de una fase
+VERSION_HUELLAS = 1
+
+HUELLA_SECCION_AUSENTE = "ausente"
+
+# Cache en disco: cabecera de los archivos, nivel de compresión y entradas que se conservan por fase
+CABECERA_CHECKPOINT = b"OPTIMCK1"
+NIVEL_COMPRESION = 1  # zlib: reduce ~5x los grupos con alumnos y tarda milisegundos
+MAX_CHECKPOINTS_POR_FASE = 3
+ARCHIVO_SECCIONES = "secciones.bin"
+
+
+# ========= HUELLAS =========
+def huella_seccion(cfg: Dict, seccion: str) -> str:
+    """
+    Huella (sha256) de una sección de 'configuracion'.
+
+    Args:
+        cfg: Configuración completa
+        seccion: Nombre de la sección (ej: "profesores")
+
+    Returns:
+        Hash hexadecimal del JSON de la sección, o HUELLA_SECCION_AUSENTE si no existe
+    """
+    configuracion = cfg.get("configuracion", {}) if isinstance(cfg, dict) else {}
+    if seccion not in configuracion:
+        return HUELLA_SECCION_AUSENTE
+    texto = json.dumps(configuracion[seccion], ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def huellas_secciones(cfg: Dict) -> Dict[str, str]:
+    """Huella de cada sección de SECCIONES_CONFIGURACION"""
+    return {seccion: huella_seccion(cfg, seccion) for seccion in SECCIONES_CONFIGURACION}
+
+
+def huellas_fases(secciones: Dict[str, str], parametros: Optional[Dict[int, Any]] = None) -> Dict[int, str]:
+    """
+    Huella de la entrada de cada fase reutilizable.
+
+    Args:
+        secciones: Huellas de las secciones (huellas_secciones)
+        parametros: Por fase, parámetros de la ejecución que cambian su salida (se usa su repr)
+
+    Returns:
+        Diccionario fase -> hash hexadecimal
+    """
+    parametros = parametros or {}
+    huellas: Dict[int, str] = {}
+    for fase in sorted(DEPENDENCIAS_FASES):
+        secciones_fase, previas = DEPENDENCIAS_FASES[fase]
+        h = hashlib.sha256(f"v{VERSION_HUELLAS}:fase{fase}".encode("utf-8"))
+        for seccion in secciones_fase:
+            h.update(f"|{seccion}={secciones[seccion]}".encode("utf-8"))
+        for previa in previas:
+            h.update(f"|fase{previa}={huellas[previa]}".encode("utf-8"))
+        if fase in parametros:
+            h.update(f"|{parametros[fase]!r}".encode("utf-8"))
+        huellas[fase] = h.hexdigest()
+    return huellas
+
+
+def fases_afectadas(secciones_cambiadas: Iterable[str]) -> List[int]:
+    """
+    Fases que hay que recalcular si cambian unas secciones (incluidas las que dependen de ellas).
+
+    Args:
+        secciones_cambiadas: Nombres de las secciones modificadas
+
+    Returns:
+        Números de fase ordenados
+    """
+    cambiadas = set(secciones_cambiadas)
+    afectadas: List[int] = []
+    for fase in sorted(DEPENDENCIAS_FASES):
+        secciones_fase, previas = DEPENDENCIAS_FASES[fase]
+        if cambiadas.intersection(secciones_fase) or any(p in afectadas for p in previas):
+            afectadas.append(fase)
+    return afectadas
+
+
+# ========= ESCRITURA ATÓMICA =========
+def escribir_atomico(ruta: Path, datos: bytes, permisos: Optional[int] = None) -> None:
+    """
+    Escribir un archivo de forma atómica: temporal en el mismo directorio, fsync y os.replace.
+
+    Un fallo a mitad de escritura deja el archivo anterior intacto (o ninguno), nunca uno truncado.
+
+    Args:
+        ruta: Archivo de destino
+        datos: Contenido completo
+        permisos: Modo del archivo final (por defecto, el 0600 del temporal)
+    """
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(prefix=f".{ruta.name}.", suffix=".tmp", dir=ruta.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(datos)
+            fh.flush()
+            if permisos is not None:
+                os.fchmod(fh.fileno(), permisos)
+            os.fsync(fh.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporal)
+        raise
+
+
+# ========= CACHE DE FASES =========
+class CacheFases:
+    """
+    Salidas de las Fases 1-7 de la última ejecución, indexadas por la huella de su entrada.
+
+    Las fases posteriores modifican los GrupoLab en su sitio, así que cada salida se guarda
+    serializada con pickle (bastante más rápido que copy.deepcopy y conserva las referencias
+    compartidas, como grupos_creados y grupos_por_slot) y se entrega siempre una copia nueva.
+    Una sola instancia por llamador (la GUI guarda la suya entre ejecuciones).
+
+    Con directorio, cada salida también se escribe en disco como fase{N}_{huella}.bin y se
+    busca allí si no está en memoria. Solo se conservan las MAX_CHECKPOINTS_POR_FASE más
+    recientes de cada fase.
+
+    Attributes:
+        directorio: Directorio de checkpoints (None = solo en memoria)
+        entradas: fase -> (huella, salida serializada)
+        secciones: Huellas de las secciones en la última ejecución
+        contadores: Fases reutilizadas y recalculadas desde que se creó la cache
+    """
+
+    def __init__(self, directorio: Optional[Path] = None):
+        self.directorio = Path(directorio) if directorio is not None else None
+        self.entradas: Dict[int, Tuple[str, bytes]] = {}
+        self.secciones: Dict[str, str] = {}
+        self.contadores: Dict[str, int] = {"fases_reutilizadas": 0, "fases_recalculadas": 0,
+                                           "checkpoints_leidos": 0, "checkpoints_escritos": 0}
+
+        if self.directorio is not None:
+            secciones = self._leer(self.directorio / ARCHIVO_SECCIONES)
+            if isinstance(secciones, dict):
+                self.secciones = secciones
+
+    def obtener(self, fase: int, huella: str) -> Optional[Any]:
+        """
+        Salida guardada de una fase si su entrada no ha cambiado.
+
+        Args:
+            fase: Número de fase (1-7)
+            huella: Huella actual de la entrada de la fase
+
+        Returns:
+            Copia de la salida guardada, o None si no hay o está invalidada
+        """
+        entrada = self.entradas.get(fase)
+        if entrada is not None and entrada[0] == huella:
+            self.contadores["fases_reutilizadas"] += 1
+            return pickle.loads(entrada[1])
+
+        if self.directorio is not None:
+            salida = self._leer(self._ruta(fase, huella))
+            if salida is not None:
+                self.contadores["fases_reutilizadas"] += 1
+                self.contadores["checkpoints_leidos"] += 1
+                return salida
+
+        self.contadores["fases_recalculadas"] += 1
+        return None
+
+    def guardar(self, fase: int, huella: str, salida: Any) -> None:
+        """Guardar (una copia de) la salida de una fase que ha terminado bien, y su checkpoint si hay directorio"""
+        datos = pickle.dumps(salida, protocol=pickle.HIGHEST_PROTOCOL)
+        self.entradas[fase] = (huella, datos)
+
+        if self.directorio is not None:
+            self._escribir(self._ruta(fase, huella), datos)
+            self.contadores["checkpoints_escritos"] += 1
+            self._podar(fase)
+
+    def guardar_secciones(self, secciones: Dict[str, str]) -> None:
+        """Recordar las huellas de las secciones de esta ejecución (para informar de lo que cambió)"""
+        self.secciones = dict(secciones)
+        if self.directorio is not None:
+            self._escribir(self.directorio / ARCHIVO_SECCIONES,
+                           pickle.dumps(self.secciones, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def secciones_cambiadas(self, secciones: Dict[str, str]) -> List[str]:
+        """Secciones cuya huella ha cambiado respecto a la última ejecución (todas si no hubo)"""
+        return [s for s in SECCIONES_CONFIGURACION if self.secciones.get(s) != secciones.get(s)]
+
+    def vaciar(self) -> None:
+        """Olvidar todas las salidas guardadas, también las del disco (la próxima ejecución será completa)"""
+        self.entradas.clear()
+        self.secciones.clear()
+        if self.directorio is not None and self.directorio.is_dir():
+            for ruta in [*self.directorio.glob("fase*_*.bin"), self.directorio / ARCHIVO_SECCIONES]:
+                with contextlib.suppress(OSError):
+                    ruta.unlink()
+
+    # ========= CHECKPOINTS EN DISCO =========
+    def _ruta(self, fase: int, huella: str) -> Path:
+        return self.directorio / f"fase{fase}_{huella}.bin"
+
+    @staticmethod
+    def _escribir(ruta: Path, datos: bytes) -> None:
+        escribir_atomico(ruta, CABECERA_CHECKPOINT + zlib.compress(datos, NIVEL_COMPRESION))
+
+    @staticmethod
+    def _leer(ruta: Path) -> Optional[Any]:
+        """Contenido de un checkpoint, o None si no existe o no se puede leer (se recalcula la fase)"""
+        try:
+            datos = ruta.read_bytes()
+            if not datos.startswith(CABECERA_CHECKPOINT):
+                return None
+            salida = pickle.loads(zlib.decompress(datos[len(CABECERA_CHECKPOINT):]))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(ruta)  # Marca de uso para la poda
+        return salida
+
+    def _podar(self, fase: int) -> None:
+        """Borrar los checkpoints más antiguos de una fase por encima de MAX_CHECKPOINTS_POR_FASE"""
+        try:
+            rutas = sorted(self.directorio.glob(f"fase{fase}_*.bin"), key=lambda r: r.stat().st_mtime, reverse=True)
+        except OSError:
+            return
+        for ruta in rutas[MAX_CHECKPOINTS_POR_FASE:]:
+            with contextlib.suppress(OSError):
+                ruta.unlink()
@@ -0,0 +1,38 @@
+"""
+Pruebas de la búsqueda local - OPTIM - Sistema de Programación Automática de Laboratorios
+Desarrollado por SoftVier para ETSIDI (UPM)
+
+Ejecutar desde src/:  python -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import unittest
+
+from benchmarks.generador_configuracion import ParametrosGenerador, generar_configuracion
+from modules.organizador.motor_organizacion import organizar, OpcionesMotor
+
+
+def _organizar(presupuesto_s: float):
+    """Organizar la configuración sintética de escala 1 (con o sin búsqueda local)"""
+    cfg = generar_configuracion(ParametrosGenerador().escalar(1))
+    opciones = OpcionesMotor(presupuesto_busqueda_s=presupuesto_s, iteraciones_busqueda=20000, semilla=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return organizar(cfg, opciones=opciones)
+
+
+class TestBusquedaLocal(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sin_busqueda = _organizar(0)
+        cls.con_busqueda = _organizar(30)
+
+    def test_no_crea_alertas_semana_inicio(self):
+        antes = {(a["asignatura"], a["grupo"]) for a in self.sin_busqueda.resultados["alertas_semana_inicio"]}
+        despues = {(a["asignatura"], a["grupo"]) for a in self.con_busqueda.resultados["alertas_semana_inicio"]}
+        self.assertEqual(despues - antes, set())
+
+
+if __name__ == "__main__":
+    unittest.main()